@@ -78,6 +78,12 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": True,
         },
+        # a pdfminer tokenenként DEBUG-ol: ez a PDF feldolgozás idejét többszörözi
+        "pdfminer": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
         "django.request": {
             "handlers": ["console"],
             "level": "DEBUG",
@@ -254,5 +260,40 @@ CORS_ALLOW_HEADERS = (
     "x-csrftoken",
     "x-requested-with",
 )
-PDF_UPLOAD_DIR = BASE_DIR / "pdf_uploads"
+# feltöltött / feldolgozandó CIB kivonatok (a konténerben írható helyre állítható)
+PDF_UPLOAD_DIR = Path(os.environ.get("PDF_UPLOAD_DIR", BASE_DIR / "pdf_uploads"))
+# CIB kivonatok párhuzamos feldolgozása: ennyi processz dolgozik egyszerre
+CIB_PARSE_WORKERS = int(os.environ.get("CIB_PARSE_WORKERS", os.cpu_count() or 1))
+# egy nagy kivonat oldalainak párhuzamos szövegkinyerése ennyi processzben
+# (processzenként legalább CibStatementParser.MIN_PAGES_PER_WORKER oldal)
+CIB_PAGE_WORKERS = int(os.environ.get("CIB_PAGE_WORKERS", CIB_PARSE_WORKERS))
+# feldolgozott kivonatok cache-e (SHA-256 + parser verzió kulcsokkal); a
+# pdf_uploads mellett, az app/cib_cache könyvtár nincs verziókezelve (.gitignore)
+CIB_PARSE_CACHE_DIR = os.environ.get(
+    "CIB_PARSE_CACHE_DIR", os.path.join(BASE_DIR, "cib_cache")
+)
+# már feldolgozott kivonatok listája (path, méret, mtime, hash) az
+# inkrementális ingesthez
+CIB_INGEST_MANIFEST = os.environ.get(
+    "CIB_INGEST_MANIFEST", os.path.join(CIB_PARSE_CACHE_DIR, "manifest.json")
+)
+# kereskedő -> kategória memo (tanult és kézi javítású kategóriák)
+CIB_CATEGORY_MEMO = os.environ.get(
+    "CIB_CATEGORY_MEMO", os.path.join(CIB_PARSE_CACHE_DIR, "category_memo.json")
+)
+# a cib-parse ?consolidated=1 összevont összesítésének inkrementális állapota
+CIB_CONSOLIDATED_STATE = os.environ.get(
+    "CIB_CONSOLIDATED_STATE", os.path.join(CIB_PARSE_CACHE_DIR, "consolidated.json")
+)
+# kinyert oldal szövegek cache-e (PDF hash + backend verzió + oldal); egy
+# parse szabály / kulcsszó módosítás után nem kell újra szövegkinyerés
+CIB_PAGE_TEXT_CACHE_DIR = os.environ.get(
+    "CIB_PAGE_TEXT_CACHE_DIR", os.path.join(CIB_PARSE_CACHE_DIR, "page_text")
+)
+# feldolgozott kivonatok oszlopos (Parquet) datasetje az elemzésekhez
+CIB_DATASET_DIR = os.environ.get(
+    "CIB_DATASET_DIR", os.path.join(CIB_PARSE_CACHE_DIR, "dataset")
+)
+# szakaszonkénti időmérés minden cib-parse kérésnél (egyébként csak ?profile=1)
+CIB_PARSE_PROFILE = bool(int(os.environ.get("CIB_PARSE_PROFILE", 0)))
 # CORS_ORIGIN_ALLOW_ALL = True
@@ -50,3 +50,5 @@ admin.site.register(models.Dev)
 admin.site.register(models.Invoice)
 admin.site.register(models.CashFlow)
 admin.site.register(models.CostRepeat)
+admin.site.register(models.CibParseJob)
+admin.site.register(models.BankTransaction)
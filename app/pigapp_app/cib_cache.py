@@ -0,0 +1,135 @@
+# app_name/cib_cache.py
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager, suppress
+
+try:
+    import fcntl
+except ImportError:  # nem Unix rendszer
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Kizárólagos zár a path fájlra egy mellette lévő .lock fájlon (más
+    processzek és szálak ellen is); fcntl nélkül, nem Unix-on: nincs zár.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w"):
+    """
+    Atomikus fájlírás: a megnyitott fájl a cél könyvtárában létrehozott,
+    egyedi nevű (mkstemp) tmp fájl, ami sikeres írás után os.replace-szel
+    veszi át a path helyét; párhuzamos olvasó sosem lát félig megírt fájlt,
+    és két író (egy processz két szála sem) nem osztozik a tmp fájlon. Hiba
+    esetén a tmp fájl törlődik, a kivétel továbbmegy.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        encoding = None if "b" in mode else "utf-8"
+        with open(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def parse_key(sha256: str, parser) -> str:
+    """PDF tartalom hash + parser / backend / kategorizálás verzió."""
+    return "{}-{}-{}-{}".format(
+        sha256,
+        parser.PARSER_VERSION,
+        parser.extractor.cache_tag,
+        parser.categorization_version(),
+    )
+
+
+def parse_key_sha256(key: str) -> str:
+    """A parse kulcs tartalom hash része (a hex hash-ben nincs "-")."""
+    return key.split("-", 1)[0]
+
+
+class CibParseCache:
+    """
+    Lemezen tárolt cache a CIB kivonatok feldolgozási eredményeihez.
+
+    A kulcs a PDF tartalmának SHA-256 hash-e + a parser verziója + a
+    szövegkinyerő backend + a kulcsszó tábla verziója, így a fájl átnevezése
+    nem, a tartalma, a parser vagy a kategória kulcsszavak módosítása viszont
+    új feldolgozást eredményez.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = str(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, pdf_path: str, parser, sha256: str = None) -> str:
+        return parse_key(sha256 or file_sha256(pdf_path), parser)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._entry_path(key))
+
+    def get(self, key: str):
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        path = self._entry_path(key)
+        try:
+            with atomic_write(path) as f:
+                json.dump(value, f, ensure_ascii=False, default=json_default)
+        except OSError as e:
+            logger.warning(f"CIB parse cache írás sikertelen ({path}): {e}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def json_default(value):
+    # numpy / pandas skalárok (np.int64, np.float64, ...)
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
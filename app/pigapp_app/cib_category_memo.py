@@ -0,0 +1,132 @@
+# app_name/cib_category_memo.py
+import hashlib
+import json
+import logging
+
+from .cib_cache import atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class CibCategoryMemo:
+    """
+    Lemezen tárolt kereskedő -> kategória tábla (lásd
+    CibStatementParser.merchant_key).
+
+    Két része van: a kulcsszavas kategorizálás eredményeiből automatikusan
+    tanult ("learned") és a kézi javítások ("manual"); a kézi javítás mindig
+    elsőbbséget élvez. A tanult bejegyzések a kulcsszó tábla verziójához
+    kötöttek: ha a tábla változik, eldobásra kerülnek. A fájl parser
+    példányonként egyszer töltődik be.
+
+    A fájl olvasás-módosítás-írás lépései (save, set_manual) egy mellette
+    lévő .lock fájlon tartott kizárólagos zár alatt futnak, így a párhuzamos
+    feldolgozó processzek és a kézi javítás nem írják felül egymást.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.keyword_table_version = None
+        self.learned = {}
+        self.manual = {}
+        self._new = {}  # a legutóbbi mentés óta tanult bejegyzések
+        self.loaded = False
+
+    # ---- betöltés / mentés ----
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, keyword_table_version: str) -> "CibCategoryMemo":
+        """A fájl beolvasása (példányonként egyszer)."""
+        if self.loaded and keyword_table_version == self.keyword_table_version:
+            return self
+
+        data = self._read()
+        self.manual = data.get("manual", {})
+        self.learned = {}
+        if data.get("keyword_table_version") == keyword_table_version:
+            self.learned = data.get("learned", {})
+        self.keyword_table_version = keyword_table_version
+        self._new = {}
+        self.loaded = True
+        return self
+
+    def save(self) -> None:
+        """
+        Az új tanult bejegyzések mentése. A fájl újraolvasásával egyesít, így a
+        párhuzamosan (más processzben) tanult bejegyzések sem vesznek el.
+        """
+        if not self._new:
+            return
+
+        with file_lock(self.path):
+            data = self._read()
+            learned = {}
+            if data.get("keyword_table_version") == self.keyword_table_version:
+                learned = data.get("learned", {})
+            learned.update(self._new)
+            self._write(
+                {
+                    "keyword_table_version": self.keyword_table_version,
+                    "learned": learned,
+                    "manual": data.get("manual", self.manual),
+                }
+            )
+        self.learned.update(learned)
+        self._new = {}
+
+    def _write(self, data: dict) -> None:
+        try:
+            with atomic_write(self.path) as f:
+                json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        except OSError as e:
+            logger.warning(f"CIB kategória memo írás sikertelen ({self.path}): {e}")
+
+    # ---- lekérdezés ----
+    def get(self, key: str):
+        category = self.manual.get(key)
+        if category is None:
+            category = self.learned.get(key)
+        return category
+
+    def learn(self, key: str, category: str) -> None:
+        self.learned[key] = category
+        self._new[key] = category
+
+    def manual_version(self) -> str:
+        """
+        A kézi javítások rövid hash-e (a parse cache kulcs része). A tanult
+        bejegyzések nem részei: a kulcsszó táblából származnak, aminek a
+        verziója már benne van a kulcsban.
+        """
+        raw = json.dumps(self.manual, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+    # ---- kézi javítás ----
+    def set_manual(self, key: str, category: str = None) -> None:
+        """Kézi javítás felvétele (category=None: törlés) és azonnali mentés."""
+        with file_lock(self.path):
+            data = self._read()
+            manual = data.get("manual", {})
+            if category is None:
+                manual.pop(key, None)
+            else:
+                manual[key] = category
+            data["manual"] = manual
+            self._write(data)
+        self.manual = manual
+
+    def entries(self) -> dict:
+        """{kulcs: {"category", "source"}} a kézi és a tanult bejegyzésekből."""
+        data = self._read()
+        result = {
+            key: {"category": category, "source": "learned"}
+            for key, category in data.get("learned", {}).items()
+        }
+        for key, category in data.get("manual", {}).items():
+            result[key] = {"category": category, "source": "manual"}
+        return result
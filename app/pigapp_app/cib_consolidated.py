@@ -0,0 +1,308 @@
+# app_name/cib_consolidated.py
+"""
+Több kivonat összevont (konszolidált) összesítése, fájlok közötti
+duplikátum szűréssel.
+
+Az átfedő kivonatok (pl. havi és éves export) ugyanazon tranzakciói egyszer
+számítanak: a természetes kulcs (könyvelési dátum, összeg, egyenleg, leírás,
+mint a BankTransaction unique constraint-je) hash-e alapján. Az összesítések
+(kategória, napi kiadás, IBAN csoportok, belső átvezetések) fillérben,
+inkrementálisan frissülnek: új kivonat hozzáadásakor csak az új sorok
+kerülnek feldolgozásra, egyetlen vektorizált menetben.
+"""
+
+import json
+import logging
+import os
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from .cib_cache import atomic_write, file_sha256, json_default, parse_key
+from .cib_parser import CibStatementParser
+
+logger = logging.getLogger(__name__)
+
+NATURAL_KEY = ("konyvelesi_datum", "osszeg", "egyenleg", "leiras")
+
+
+class CibConsolidatedSummary:
+    """
+    Összevont összesítés; opcionálisan lemezen (JSON) tárolva, így a
+    következő kérésnél csak az új kivonatok kerülnek hozzáadásra.
+
+    A kivonatok azonosítója a parse cache kulcsa (tartalom hash + parser és
+    kategorizálás verzió). Ha egy korábban hozzáadott kivonat eltűnik vagy
+    megváltozik, az állapot újraépül (a szűrt duplikátumok miatt egy kivonat
+    nem vonható ki).
+    """
+
+    STATE_VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = str(path) if path else None
+        self.reset()
+
+    def reset(self) -> None:
+        self.statements = {}
+        self.rows = []
+        self.keys = np.empty(0, dtype="uint64")
+        self.duplicates = 0
+        # összegek fillérben
+        self.category_totals = {}
+        self.category_sources = {}
+        self.daily_spending = {}
+        self.outgoing_by_iban = {}
+        self.internal_total = 0
+        self.internal_transactions = []
+        self._changed = True
+
+    # ---- betöltés / mentés ----
+    def load(self) -> "CibConsolidatedSummary":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") != self.STATE_VERSION:
+            return self
+
+        self.statements = data["statements"]
+        self.rows = data["rows"]
+        self.duplicates = data["duplicates"]
+        self.category_totals = data["category_totals"]
+        self.category_sources = data["category_sources"]
+        self.daily_spending = data["daily_spending"]
+        self.outgoing_by_iban = data["outgoing_by_iban"]
+        self.internal_total = data["internal_total"]
+        self.internal_transactions = data["internal_transactions"]
+        if self.rows:
+            self.keys = self.natural_keys(
+                pd.DataFrame.from_records(self.rows, columns=NATURAL_KEY)
+            )
+        self._changed = False
+        return self
+
+    def save(self) -> None:
+        if self.path is None or not self._changed:
+            return
+
+        data = {
+            "version": self.STATE_VERSION,
+            "statements": self.statements,
+            "rows": self.rows,
+            "duplicates": self.duplicates,
+            "category_totals": self.category_totals,
+            "category_sources": self.category_sources,
+            "daily_spending": self.daily_spending,
+            "outgoing_by_iban": self.outgoing_by_iban,
+            "internal_total": self.internal_total,
+            "internal_transactions": self.internal_transactions,
+        }
+        try:
+            with atomic_write(self.path) as f:
+                json.dump(data, f, ensure_ascii=False, default=json_default)
+            self._changed = False
+        except OSError as e:
+            logger.warning(
+                f"CIB összevont összesítés írás sikertelen ({self.path}): {e}"
+            )
+
+    # ---- kivonatok hozzáadása ----
+    @staticmethod
+    def natural_keys(df: pd.DataFrame) -> np.ndarray:
+        """Soronként a természetes kulcs 64 bites hash-e (uint64 tömb)."""
+        key_frame = pd.DataFrame(
+            {
+                "date": df["konyvelesi_datum"].astype(str),
+                "amount": CibStatementParser._filler(df["osszeg"]),
+                "balance": CibStatementParser._filler(df["egyenleg"]),
+                "description": df["leiras"].fillna("").astype(str),
+            }
+        )
+        return pd.util.hash_pandas_object(key_frame, index=False).to_numpy()
+
+    def update_from_path(
+        self,
+        parser,
+        path: str,
+        workers: int = None,
+        cache=None,
+        profiler=None,
+        page_workers: int = None,
+    ) -> "CibConsolidatedSummary":
+        """
+        A path (PDF vagy mappa) kivonatai közül csak a még nem hozzáadottak
+        kerülnek feldolgozásra (parser.parse_files, cache-sel). A fájlok
+        egyszer kerülnek hash-elésre: a parse kulcsokat a parse_files is
+        megkapja.
+        """
+        pdf_files = parser.collect_pdf_files(path)
+        keys = {
+            pdf_path: parse_key(file_sha256(pdf_path), parser) for pdf_path in pdf_files
+        }
+
+        known = {entry["key"] for entry in self.statements.values() if "key" in entry}
+        if not known <= set(keys.values()):
+            logger.info("CIB összevont összesítés újraépítése (változott kivonat).")
+            self.reset()
+            known = set()
+        # a hibás kivonatok a következő frissítéskor újra próbálkoznak
+        self.statements = {
+            name: entry for name, entry in self.statements.items() if "key" in entry
+        }
+
+        pending = [pdf_path for pdf_path in pdf_files if keys[pdf_path] not in known]
+        if pending:
+            parsed = parser.parse_files(
+                pending,
+                workers=workers,
+                cache=cache,
+                profiler=profiler,
+                page_workers=page_workers,
+                keys=keys,
+            )
+            self.add(
+                {
+                    os.path.splitext(os.path.basename(pdf_path))[0]: (
+                        keys[pdf_path],
+                        parsed[pdf_path],
+                    )
+                    for pdf_path in pending
+                }
+            )
+        return self
+
+    def add(self, statements: dict) -> int:
+        """
+        {név: (parse kulcs, summary)} hozzáadása; a már ismert (vagy a
+        kötegen belül ismétlődő) tranzakciók kimaradnak. Az új sorok számával
+        tér vissza.
+        """
+        records = []
+        sizes = []
+        for name, (key, summary) in statements.items():
+            if "error" in summary:
+                self.statements[name] = {"error": summary["error"]}
+                continue
+            self.statements[name] = {"key": key}
+            records.extend(summary["all_transactions"])
+            sizes.append((name, len(summary["all_transactions"])))
+        self._changed = True
+        if not records:
+            for name, size in sizes:
+                self.statements[name].update(
+                    transaction_count=0, new_transactions=0, duplicates=0
+                )
+            return 0
+
+        df = pd.DataFrame.from_records(records)
+        keys = self.natural_keys(df)
+
+        # új: nem ismert, és a kötegen belül az első előfordulás
+        first = np.zeros(len(keys), dtype=bool)
+        first[np.unique(keys, return_index=True)[1]] = True
+        new = first & ~np.isin(keys, self.keys)
+
+        start = 0
+        for name, size in sizes:
+            kept = int(new[start : start + size].sum())
+            self.statements[name].update(
+                transaction_count=size, new_transactions=kept, duplicates=size - kept
+            )
+            start += size
+
+        positions = np.flatnonzero(new)
+        self.keys = np.concatenate([self.keys, keys[positions]])
+        self.duplicates += len(keys) - len(positions)
+        self.rows.extend(records[i] for i in positions)
+        self._aggregate(df.iloc[positions].reset_index(drop=True))
+        return len(positions)
+
+    @staticmethod
+    def _merge(target: dict, totals) -> None:
+        for key, value in totals.items():
+            target[key] = target.get(key, 0) + int(value)
+
+    def _aggregate(self, df: pd.DataFrame) -> None:
+        """Az új sorok hozzáadása a futó összesítésekhez (fillérben)."""
+        if df.empty:
+            return
+
+        amounts = pd.Series(CibStatementParser._filler(df["osszeg"]), index=df.index)
+        self._merge(self.category_totals, amounts.groupby(df["category"]).sum())
+        if "category_source" in df:
+            self._merge(self.category_sources, df["category_source"].value_counts())
+
+        spending = amounts < 0
+        date_norm = (
+            df["konyvelesi_datum"].str.replace(".", "-", regex=False).str.rstrip("-")
+        )
+        self._merge(
+            self.daily_spending, amounts[spending].groupby(date_norm[spending]).sum()
+        )
+
+        leiras = df["leiras"].fillna("").str.lower()
+        outgoing_mask = leiras.str.contains(
+            CibStatementParser.OUTGOING_INSTANT_TEXT, regex=False
+        )
+        internal_mask = leiras.str.contains(
+            CibStatementParser.INTERNAL_TRANSFER_TEXT, regex=False
+        )
+
+        outgoing = df[outgoing_mask]
+        outgoing_trx = CibStatementParser._transaction_records(outgoing)
+        groups = outgoing.groupby("iban")
+        totals = amounts[outgoing_mask].groupby(outgoing["iban"]).sum()
+        for iban, positions in groups.indices.items():
+            group = self.outgoing_by_iban.setdefault(
+                iban, {"partner": "", "total": 0, "transactions": []}
+            )
+            if not group["partner"]:
+                partner = outgoing["partner"].iat[positions[0]]
+                group["partner"] = "" if pd.isna(partner) else partner
+            group["total"] += int(totals[iban])
+            group["transactions"].extend(outgoing_trx[p] for p in positions)
+
+        internal = df[internal_mask]
+        self.internal_total += int(amounts[internal_mask].sum())
+        self.internal_transactions.extend(
+            CibStatementParser._transaction_records(internal)
+        )
+
+    # ---- kimenet ----
+    def as_summary(self) -> dict:
+        """A parse_pdf summary formátuma, kivonatonkénti statisztikával."""
+        scale = CibStatementParser.AMOUNT_SCALE
+        return {
+            # a parse kulcs belső azonosító, nem része a válasznak
+            "statements": {
+                name: {key: value for key, value in entry.items() if key != "key"}
+                for name, entry in self.statements.items()
+            },
+            "transaction_count": len(self.rows),
+            "duplicates_dropped": self.duplicates,
+            # könyvelési dátum szerint (stabil rendezés)
+            "all_transactions": sorted(self.rows, key=itemgetter("konyvelesi_datum")),
+            "outgoing_by_iban": {
+                iban: {
+                    "partner": group["partner"],
+                    "total_amount": group["total"] / scale,
+                    "transactions": group["transactions"],
+                }
+                for iban, group in sorted(self.outgoing_by_iban.items())
+            },
+            "daily_spending": {
+                day: total / scale for day, total in sorted(self.daily_spending.items())
+            },
+            "internal_transfers": {
+                "total": self.internal_total / scale,
+                "transactions": self.internal_transactions,
+            },
+            "category_totals": {
+                category: total / scale
+                for category, total in sorted(self.category_totals.items())
+            },
+            "category_sources": dict(self.category_sources),
+        }
@@ -0,0 +1,238 @@
+# app_name/cib_dataset.py
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .cib_cache import atomic_write, file_sha256, parse_key, parse_key_sha256
+from .cib_parser import CibStatementParser
+
+logger = logging.getLogger(__name__)
+
+
+class CibStatementDataset:
+    """
+    Feldolgozott kivonatok oszlopos tárolása: kivonatonként egy Parquet fájl
+    a típusos DataFrame-ből (CibStatementParser.apply_schema), mellette egy
+    JSON index (PDF path -> fájl, méret, mtime, hash, sorok, dátum tartomány).
+
+    A Parquet fájl neve a parse cache kulcsa (tartalom hash + parser, backend
+    és kulcsszó tábla verzió), így a változatlan kivonat nem íródik újra. Az
+    olvasás memory-mapped, és csak a kért oszlopokat dekódolja, így pl. a havi
+    kategória összesítés újra-parse nélkül, három oszlopból számolható.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.index_path = os.path.join(self.root, self.INDEX_FILE)
+        self.entries = self._load_index()
+
+    # ---- index ----
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("statements", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self) -> None:
+        with atomic_write(self.index_path) as f:
+            json.dump({"statements": self.entries}, f, ensure_ascii=False, indent=1)
+
+    def statement_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.parquet")
+
+    def names(self) -> list:
+        return sorted(entry["name"] for entry in self.entries.values())
+
+    def _entry_by_name(self, name: str) -> dict:
+        for entry in self.entries.values():
+            if entry["name"] == name:
+                return entry
+        raise KeyError(f"Nincs ilyen kivonat a datasetben: {name}")
+
+    # ---- írás ----
+    def write_statement(self, key: str, df: pd.DataFrame) -> None:
+        with atomic_write(self.statement_path(key), "wb") as f:
+            pq.write_table(
+                pa.Table.from_pandas(df, preserve_index=False),
+                f,
+                compression="zstd",
+            )
+
+    def _parse_and_write(self, parser, pdf_path: str, key: str) -> dict:
+        """Egy PDF -> Parquet; a párhuzamos feldolgozás processzeiben is fut."""
+        df = parser.parse_pdf_to_dataframe(pdf_path, sha256=parse_key_sha256(key))
+        self.write_statement(key, df)
+
+        dates = df[parser.DATE_COLUMNS[0]]
+        return {
+            "rows": len(df),
+            "date_from": dates.min().strftime("%Y-%m-%d") if len(df) else None,
+            "date_to": dates.max().strftime("%Y-%m-%d") if len(df) else None,
+        }
+
+    def update(self, path, parser=None, workers: int = None) -> dict:
+        """
+        A path (PDF vagy mappa) kivonatainak felvétele a datasetbe. Csak az új
+        vagy módosult PDF-ek kerülnek feldolgozásra; a mappából törölt PDF-ek
+        kikerülnek az indexből.
+        """
+        parser = parser or CibStatementParser()
+        pdf_files = [os.path.abspath(f) for f in parser.collect_pdf_files(str(path))]
+
+        stats = {"written": [], "unchanged": 0, "removed": [], "failed": {}}
+        pending = {}  # pdf_path -> index bejegyzés (rows / dátumok nélkül)
+
+        for pdf_path in pdf_files:
+            stat = os.stat(pdf_path)
+            entry = self.entries.get(pdf_path)
+            if (
+                entry
+                and entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime
+                and entry["key"] == parse_key(entry["sha256"], parser)
+                and os.path.exists(self.statement_path(entry["key"]))
+            ):
+                stats["unchanged"] += 1
+                continue
+
+            sha256 = file_sha256(pdf_path)
+            pending[pdf_path] = {
+                "name": os.path.splitext(os.path.basename(pdf_path))[0],
+                "key": parse_key(sha256, parser),
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+            }
+
+        for pdf_path, result in self._write_pending(parser, pending, workers).items():
+            if "error" in result:
+                stats["failed"][pdf_path] = result["error"]
+                continue
+            self.entries[pdf_path] = {**pending[pdf_path], **result}
+            stats["written"].append(pdf_path)
+
+        if os.path.isdir(str(path)):
+            folder_prefix = os.path.join(os.path.abspath(str(path)), "")
+            current = set(pdf_files)
+            for pdf_path in list(self.entries):
+                if pdf_path.startswith(folder_prefix) and pdf_path not in current:
+                    del self.entries[pdf_path]
+                    stats["removed"].append(pdf_path)
+
+        self.save_index()
+        self._remove_orphans()
+        logger.info(
+            f"CIB dataset {self.root}: {len(stats['written'])} írt, "
+            f"{stats['unchanged']} változatlan, {len(stats['removed'])} törölt, "
+            f"{len(stats['failed'])} hibás"
+        )
+        return stats
+
+    def _write_pending(self, parser, pending: dict, workers: int = None) -> dict:
+        results = {}
+        if not workers or workers <= 1 or len(pending) <= 1:
+            for pdf_path, entry in pending.items():
+                try:
+                    results[pdf_path] = self._parse_and_write(
+                        parser, pdf_path, entry["key"]
+                    )
+                except Exception as e:
+                    results[pdf_path] = {"error": f"{type(e).__name__}: {e}"}
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {
+                pool.submit(self._parse_and_write, parser, pdf_path, entry["key"]): (
+                    pdf_path
+                )
+                for pdf_path, entry in pending.items()
+            }
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    results[pdf_path] = future.result()
+                except Exception as e:
+                    results[pdf_path] = {"error": f"{type(e).__name__}: {e}"}
+        return results
+
+    def _remove_orphans(self) -> None:
+        """Az indexben már nem hivatkozott Parquet fájlok törlése."""
+        keys = {entry["key"] for entry in self.entries.values()}
+        for name in os.listdir(self.root):
+            if name.endswith(".parquet") and name[: -len(".parquet")] not in keys:
+                os.remove(os.path.join(self.root, name))
+
+    # ---- olvasás ----
+    def read_table(self, name: str, columns: list = None) -> pa.Table:
+        entry = self._entry_by_name(name)
+        return pq.read_table(
+            self.statement_path(entry["key"]), columns=columns, memory_map=True
+        )
+
+    def read_statement(self, name: str, columns: list = None) -> pd.DataFrame:
+        return self.read_table(name, columns).to_pandas()
+
+    def load_frame(self, columns: list = None, names: list = None) -> pd.DataFrame:
+        """
+        Több kivonat egy DataFrame-ben, egy "statement" (kategória) oszloppal.
+        columns: csak ezek az oszlopok kerülnek beolvasásra.
+        """
+        tables = []
+        for name in names if names is not None else self.names():
+            table = self.read_table(name, columns)
+            statement = pa.array([name] * table.num_rows).dictionary_encode()
+            tables.append(table.append_column("statement", statement))
+
+        if not tables:
+            return pd.DataFrame(columns=[*(columns or []), "statement"])
+        return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+    def load_summaries(self) -> dict:
+        """{kivonat név: summary} a tárolt DataFrame-ekből, újra-parse nélkül."""
+        return {
+            name: CibStatementParser.dataframe_to_summary(self.read_statement(name))
+            for name in self.names()
+        }
+
+    # ---- elemzések (csak a szükséges oszlopokat olvassák) ----
+    def category_totals_by_month(self) -> dict:
+        """{"2026-01": {"food": -12345.0, ...}, ...} forintban."""
+        df = self.load_frame(columns=["konyvelesi_datum", "category", "osszeg"])
+        if df.empty:
+            return {}
+
+        month = df["konyvelesi_datum"].dt.strftime("%Y-%m")
+        totals = df.groupby([month, "category"], observed=True)["osszeg"].sum()
+
+        result = {}
+        for (month_key, category), total in totals.items():
+            result.setdefault(month_key, {})[category] = (
+                int(total) / CibStatementParser.AMOUNT_SCALE
+            )
+        return result
+
+    def top_merchants(self, limit: int = 10) -> list:
+        """A legnagyobb kártyás költésű kereskedők: [{"merchant", "total", "count"}]."""
+        df = self.load_frame(columns=["card_merchant", "osszeg"])
+        df = df[df["card_merchant"].fillna("") != ""]
+        if df.empty:
+            return []
+
+        grouped = df.groupby("card_merchant")["osszeg"].agg(["sum", "count"])
+        grouped = grouped.sort_values("sum").head(limit)
+        return [
+            {
+                "merchant": merchant,
+                "total": int(row["sum"]) / CibStatementParser.AMOUNT_SCALE,
+                "count": int(row["count"]),
+            }
+            for merchant, row in grouped.iterrows()
+        ]
@@ -0,0 +1,318 @@
+# app_name/cib_extractors.py
+"""
+PDF szövegkinyerő backendek a CibStatementParser-hez.
+
+Minden backend oldalanként a (még nem normalizált) szövegsorokat adja vissza,
+fentről lefelé, a soron belül balról jobbra. A pdfplumber a referencia, a
+többi gyorsabb, de ugyanazokat a tranzakciókat kell adnia.
+
+Alapértelmezés szerint a backendek csak a tranzakció táblát dolgozzák fel:
+a tábla nélküli oldalak (borító, jogi tájékoztató, ...) üres sorlistát adnak,
+a többi oldalon pedig a szövegkinyerés a tábla függőleges tartományára szűkül
+(a fejléc sortól az "ÖSSZESEN FORGALOM" összesítőig).
+"""
+
+import re
+from bisect import bisect_right
+
+import pdfplumber
+
+# tábla fejléc ("KÖNYVELÉSI/ ÉRTÉKNAP") és a tábla sorainak dátum oszlopa
+# (könyvelési + értéknap dátum egymás után a tartalomfolyamban)
+TABLE_START_RE = re.compile(r"KÖNYVELÉSI/|ÉRTÉKNAP")
+TABLE_ROW_RE = re.compile(r"\d{4}\.\d{2}\.\d{2}\.\s*\d{4}\.\d{2}\.\d{2}\.")
+TABLE_END_RE = re.compile(r"ÖSSZESEN\s*FORGALOM")
+
+# a vágás ennyivel a fejléc / összesítő sor teteje fölött történik
+TABLE_MARGIN = 1
+
+
+class PdfTextExtractor:
+    """Szövegkinyerő interfész."""
+
+    name = ""
+    # növelni kell, ha a kinyert sorok változhatnak (a cache kulcs része)
+    version = "1"
+
+    def __init__(self, crop_to_table: bool = True):
+        self.crop_to_table = crop_to_table
+
+    def page_count(self, pdf_path: str) -> int:
+        raise NotImplementedError
+
+    def iter_page_lines(self, pdf_path: str, start: int = 0, stop: int = None):
+        """A [start, stop) oldalak sorai, oldalanként egy listában."""
+        raise NotImplementedError
+
+    @property
+    def cache_tag(self) -> str:
+        tag = f"{self.name}{self.version}"
+        return tag if self.crop_to_table else f"{tag}-full"
+
+    def _table_items(self, items: list) -> list:
+        """(top, x0, x1, text) elemek, a tábla tartományára szűkítve."""
+        if not self.crop_to_table:
+            return items
+
+        region = table_region([(item[0], item[3]) for item in items])
+        if region is None:
+            return []
+
+        top, bottom = region
+        return [item for item in items if top <= item[0] < bottom]
+
+
+def table_region(runs: list):
+    """
+    Oldal triage: (top, text) szövegdarabok a tartalomfolyam sorrendjében ->
+    a tranzakció tábla függőleges tartománya (top, bottom), vagy None, ha az
+    oldalon nincs tábla. Olcsó: nem kell hozzá sorokba rendezés.
+    """
+    offsets = []
+    pos = 0
+    for _, text in runs:
+        offsets.append(pos)
+        pos += len(text)
+    stream = "".join(text for _, text in runs)
+
+    start = TABLE_START_RE.search(stream)
+    if start is None and not TABLE_ROW_RE.search(stream):
+        return None
+
+    def top_at(index):
+        return runs[bisect_right(offsets, index) - 1][0] - TABLE_MARGIN
+
+    top = top_at(start.start()) if start else float("-inf")
+    end = TABLE_END_RE.search(stream, start.end() if start else 0)
+    bottom = top_at(end.start()) if end else float("inf")
+    if bottom <= top:
+        bottom = float("inf")
+
+    return top, bottom
+
+
+def assemble_lines(items: list, y_tolerance: float = 3, x_tolerance: float = 3):
+    """
+    (top, x0, x1, text) elemek -> szövegsorok.
+
+    Az egymáshoz y_tolerance-nél közelebbi elemek egy sorba kerülnek; soron
+    belül szóköz csak x_tolerance-nél nagyobb rés esetén kerül közéjük
+    (a pdfplumber extract_text alapértelmezett viselkedése).
+    """
+    items.sort(key=lambda item: (item[0], item[1]))
+
+    lines = []
+    current = []
+    line_top = None
+    for item in items:
+        if line_top is not None and item[0] - line_top > y_tolerance:
+            lines.append(current)
+            current = []
+            line_top = None
+        if line_top is None:
+            line_top = item[0]
+        current.append(item)
+    if current:
+        lines.append(current)
+
+    result = []
+    for line in lines:
+        line.sort(key=lambda item: item[1])
+        parts = []
+        prev_x1 = None
+        for top, x0, x1, text in line:
+            if prev_x1 is not None and x0 - prev_x1 > x_tolerance:
+                parts.append(" ")
+            parts.append(text)
+            prev_x1 = x1
+        result.append("".join(parts))
+
+    return result
+
+
+def _dedupe_key(text: str, x0: float, top: float) -> tuple:
+    # "félkövér" szimuláció: ugyanaz a karakter kétszer, (közel) ugyanott
+    return (text, round(x0), round(top))
+
+
+class PdfplumberExtractor(PdfTextExtractor):
+    """Referencia backend: pdfplumber teljes karakter layouttal."""
+
+    name = "pdfplumber"
+    version = "3"
+
+    def page_count(self, pdf_path: str) -> int:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    def iter_page_lines(self, pdf_path: str, start: int = 0, stop: int = None):
+        table_pages = None
+        if self.crop_to_table:
+            # a pdfplumber objektum feldolgozása drága: a tábla nélküli
+            # oldalakat egy gyors pdfium előszűrés alapján meg sem nyitjuk
+            table_pages = PdfiumExtractor().table_pages(pdf_path, start, stop)
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for index, page in enumerate(pdf.pages[start:stop], start):
+                if table_pages is not None and index not in table_pages:
+                    yield []
+                    continue
+
+                try:
+                    filtered = self._dedupe_chars(page)
+                    if self.crop_to_table:
+                        filtered = self._crop_to_table(filtered)
+                    text = filtered.extract_text() or ""
+                finally:
+                    # a pdf.pages lista a dokumentum végéig minden oldalt
+                    # megtart: a karakter / layout cache-t oldalanként ürítjük
+                    page.close()
+                yield text.splitlines()
+
+    @staticmethod
+    def _dedupe_chars(page):
+        """Az egymásra rajzolt duplikált karakterek kiszűrése (olcsó, O(n))."""
+        seen = set()
+
+        def keep(obj):
+            if obj.get("object_type") != "char":
+                return True
+            key = _dedupe_key(obj["text"], obj["x0"], obj["top"])
+            if key in seen:
+                return False
+            seen.add(key)
+            return True
+
+        return page.filter(keep)
+
+    @staticmethod
+    def _crop_to_table(page):
+        """
+        Csak a tábla tartományába eső objektumok. Szűrés és nem page.crop: a
+        vágás minden objektumot újraszámol, ami drágább a megspórolt layoutnál.
+        """
+        region = table_region([(c["top"], c["text"]) for c in page.chars])
+        if region is None:
+            return page
+
+        top, bottom = region
+        return page.filter(lambda obj: top <= obj.get("top", top) < bottom)
+
+
+class PdfminerExtractor(PdfTextExtractor):
+    """
+    Nyers pdfminer karakterek layout analízis nélkül (laparams=None); a sorokat
+    a karakterek pozíciójából rakjuk össze.
+    """
+
+    name = "pdfminer"
+    version = "2"
+
+    def page_count(self, pdf_path: str) -> int:
+        from pdfminer.pdfpage import PDFPage
+
+        with open(pdf_path, "rb") as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+    def iter_page_lines(self, pdf_path: str, start: int = 0, stop: int = None):
+        from pdfminer.high_level import extract_pages
+
+        page_numbers = None
+        if start or stop is not None:
+            stop = self.page_count(pdf_path) if stop is None else stop
+            page_numbers = range(start, stop)
+
+        for layout in extract_pages(pdf_path, page_numbers=page_numbers, laparams=None):
+            seen = set()
+            items = []
+            for char in self._iter_chars(layout):
+                text = char.get_text()
+                top = layout.height - char.y1
+                key = _dedupe_key(text, char.x0, top)
+                if key in seen:
+                    continue
+                seen.add(key)
+                items.append((top, char.x0, char.x1, text))
+            yield assemble_lines(self._table_items(items))
+
+    @classmethod
+    def _iter_chars(cls, container):
+        from pdfminer.layout import LTChar, LTContainer
+
+        for obj in container:
+            if isinstance(obj, LTChar):
+                yield obj
+            elif isinstance(obj, LTContainer):
+                yield from cls._iter_chars(obj)
+
+
+class PdfiumExtractor(PdfTextExtractor):
+    """pypdfium2 szövegréteg: szövegszakaszok (rect) és azok pozíciója."""
+
+    name = "pdfium"
+    version = "2"
+
+    def page_count(self, pdf_path: str) -> int:
+        import pypdfium2 as pdfium
+
+        doc = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def iter_page_items(self, pdf_path: str, start: int = 0, stop: int = None):
+        """A [start, stop) oldalak (top, x0, x1, text) elemei, oldalanként."""
+        import pypdfium2 as pdfium
+
+        doc = pdfium.PdfDocument(pdf_path)
+        try:
+            stop = len(doc) if stop is None else min(stop, len(doc))
+            for index in range(start, stop):
+                page = doc[index]
+                textpage = page.get_textpage()
+                height = page.get_height()
+
+                items = []
+                for i in range(textpage.count_rects()):
+                    left, bottom, right, top = textpage.get_rect(i)
+                    text = textpage.get_text_bounded(left, bottom, right, top)
+                    items.append((height - top, left, right, text))
+
+                textpage.close()
+                page.close()
+                yield items
+        finally:
+            doc.close()
+
+    def iter_page_lines(self, pdf_path: str, start: int = 0, stop: int = None):
+        for items in self.iter_page_items(pdf_path, start, stop):
+            yield assemble_lines(self._table_items(items))
+
+    def table_pages(self, pdf_path: str, start: int = 0, stop: int = None) -> set:
+        """A tranzakció táblát tartalmazó oldalak indexei (oldal triage)."""
+        return {
+            index
+            for index, items in enumerate(
+                self.iter_page_items(pdf_path, start, stop), start
+            )
+            if table_region([(item[0], item[3]) for item in items]) is not None
+        }
+
+
+EXTRACTORS = {
+    cls.name: cls for cls in (PdfplumberExtractor, PdfminerExtractor, PdfiumExtractor)
+}
+
+
+def get_extractor(extractor) -> PdfTextExtractor:
+    """Backend név ("pdfplumber", "pdfminer", "pdfium") vagy példány -> példány."""
+    if isinstance(extractor, PdfTextExtractor):
+        return extractor
+    try:
+        return EXTRACTORS[extractor]()
+    except KeyError:
+        choices = ", ".join(EXTRACTORS)
+        raise ValueError(
+            f"Ismeretlen szövegkinyerő: {extractor} (választható: {choices})"
+        )
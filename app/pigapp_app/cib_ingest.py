@@ -0,0 +1,110 @@
+# app_name/cib_ingest.py
+import json
+import logging
+import os
+
+from .cib_cache import atomic_write, file_sha256
+from .cib_parser import CibStatementParser
+
+logger = logging.getLogger(__name__)
+
+
+class CibIngestManifest:
+    """
+    A már feldolgozott PDF-ek listája: path -> méret, mtime, SHA-256, cache kulcs.
+    Egy JSON fájlban tárolódik, atomikus cserével íródik.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        with atomic_write(self.path) as f:
+            json.dump({"files": self.entries}, f, ensure_ascii=False, indent=1)
+
+    def record(self, pdf_path: str, stat, sha256: str, cache_key: str) -> None:
+        self.entries[pdf_path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256,
+            "cache_key": cache_key,
+        }
+
+
+def ingest_folder(
+    folder, cache, manifest, parser=None, workers=None, page_workers=None
+) -> dict:
+    """
+    Inkrementális feldolgozás: csak az új vagy módosult PDF-ek kerülnek
+    parse-olásra, az eredmény a cache-be, a fájl adatai a manifestbe kerülnek.
+
+    Változatlannak számít a fájl, ha mérete és mtime-ja egyezik a manifestben
+    tárolttal, és az eredménye (a jelenlegi parser verzióval) a cache-ben van.
+    Méret / mtime eltérésnél a hash dönt, így egy "touch" nem okoz újra parse-t.
+    """
+    parser = parser or CibStatementParser()
+    pdf_files = [os.path.abspath(f) for f in parser.collect_pdf_files(str(folder))]
+
+    stats = {"new": [], "changed": [], "unchanged": 0, "removed": [], "failed": {}}
+    pending = {}  # pdf_path -> (stat, sha256, cache_key)
+
+    for pdf_path in pdf_files:
+        stat = os.stat(pdf_path)
+        entry = manifest.entries.get(pdf_path)
+
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            key = cache.key_for(pdf_path, parser, sha256=entry["sha256"])
+            if key == entry["cache_key"] and cache.contains(key):
+                stats["unchanged"] += 1
+                continue
+
+        sha256 = file_sha256(pdf_path)
+        key = cache.key_for(pdf_path, parser, sha256=sha256)
+        if cache.contains(key):
+            # a tartalom már ismert (pl. touch vagy átnevezés): nincs parse
+            manifest.record(pdf_path, stat, sha256, key)
+            stats["unchanged"] += 1
+            continue
+
+        stats["changed" if entry else "new"].append(pdf_path)
+        pending[pdf_path] = (stat, sha256, key)
+
+    if pending:
+        # a már kiszámolt kulcsok: a szöveg cache nem hash-eli újra a PDF-eket
+        parsed = parser.parse_files(
+            list(pending),
+            workers=workers,
+            page_workers=page_workers,
+            keys={pdf_path: key for pdf_path, (_, _, key) in pending.items()},
+        )
+        for pdf_path, summary in parsed.items():
+            stat, sha256, key = pending[pdf_path]
+            if "error" in summary:
+                # nem kerül a manifestbe, a következő futás újrapróbálja
+                stats["failed"][pdf_path] = summary["error"]
+                continue
+            cache.set(key, summary)
+            manifest.record(pdf_path, stat, sha256, key)
+
+    folder_prefix = os.path.join(os.path.abspath(str(folder)), "")
+    current = set(pdf_files)
+    for pdf_path in list(manifest.entries):
+        if pdf_path.startswith(folder_prefix) and pdf_path not in current:
+            del manifest.entries[pdf_path]
+            stats["removed"].append(pdf_path)
+
+    manifest.save()
+    logger.info(
+        f"CIB ingest {folder}: {len(stats['new'])} új, {len(stats['changed'])} "
+        f"módosult, {stats['unchanged']} változatlan, {len(stats['removed'])} "
+        f"törölt, {len(stats['failed'])} hibás"
+    )
+    return stats
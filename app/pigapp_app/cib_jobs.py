@@ -0,0 +1,123 @@
+# app_name/cib_jobs.py
+import json
+import logging
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cib_cache import CibParseCache, json_default
+from .cib_parser import CibStatementParser
+from .models import BankTransaction, CibParseJob
+
+logger = logging.getLogger(__name__)
+
+
+def save_uploaded_pdf(uploaded_file, upload_dir) -> str:
+    """A feltöltött PDF darabonként (chunks) kerül a lemezre, nem a memóriába."""
+    os.makedirs(upload_dir, exist_ok=True)
+
+    base_name = os.path.basename(uploaded_file.name)
+    # egyedi előtag: azonos nevű feltöltések nem írják felül egymást
+    target = os.path.join(str(upload_dir), f"{uuid.uuid4().hex[:8]}_{base_name}")
+
+    with open(target, "wb") as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+
+    return target
+
+
+def job_upload_dir(user) -> str:
+    """
+    A felhasználó job feltöltéseinek könyvtára (PDF_UPLOAD_DIR/jobs/<user id>).
+    Külön alkönyvtár, mert a PDF_UPLOAD_DIR közvetlen tartalmát a cib-parse
+    minden felhasználónak feldolgozza (a collect_pdf_files nem rekurzív).
+    """
+    return os.path.join(str(settings.PDF_UPLOAD_DIR), "jobs", str(user.pk))
+
+
+def enqueue_parse_job(user, uploaded_file) -> CibParseJob:
+    file_path = save_uploaded_pdf(uploaded_file, job_upload_dir(user))
+    return CibParseJob.objects.create(
+        user=user,
+        file_name=os.path.basename(uploaded_file.name),
+        file_path=file_path,
+    )
+
+
+def claim_next_job():
+    """A legrégebbi várakozó job lefoglalása (több worker esetén is egyszer)."""
+    with transaction.atomic():
+        job = (
+            CibParseJob.objects.select_for_update(skip_locked=True)
+            .filter(status=CibParseJob.STATUS_PENDING)
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = CibParseJob.STATUS_RUNNING
+        job.started_date = timezone.now()
+        job.save(update_fields=["status", "started_date"])
+
+    return job
+
+
+def run_job(job: CibParseJob, parser=None, cache=None) -> CibParseJob:
+    parser = parser or CibStatementParser(
+        category_memo=settings.CIB_CATEGORY_MEMO,
+        text_cache=settings.CIB_PAGE_TEXT_CACHE_DIR,
+    )
+    cache = cache or CibParseCache(settings.CIB_PARSE_CACHE_DIR)
+
+    try:
+        # egyetlen (akár több száz oldalas) kivonat: oldalszintű párhuzamosítás
+        parsed = parser.parse_path(
+            job.file_path, cache=cache, page_workers=settings.CIB_PAGE_WORKERS
+        )
+        summary = next(iter(parsed.values()))
+        if "error" in summary:
+            # a parse_path fájlonként adja vissza a hibát, nem dobja tovább
+            job.error = summary["error"]
+            job.status = CibParseJob.STATUS_FAILED
+        else:
+            # numpy skalárok -> natív JSON típusok
+            job.result = json.loads(json.dumps(summary, default=json_default))
+            job.status = CibParseJob.STATUS_DONE
+            created = BankTransaction.objects.create_from_summary(
+                job.user, job.result, source_file=job.file_name
+            )
+            logger.info(f"CIB parse job {job.id}: {created} új tranzakció")
+    except Exception as e:
+        logger.exception(f"CIB parse job {job.id} hibára futott")
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = CibParseJob.STATUS_FAILED
+
+    job.finished_date = timezone.now()
+    job.save(update_fields=["result", "error", "status", "finished_date"])
+    return job
+
+
+def run_worker(poll_interval: float = 2.0, once: bool = False) -> None:
+    """Várakozó jobok feldolgozása ciklusban (cib_parse_worker command)."""
+    parser = CibStatementParser(
+        category_memo=settings.CIB_CATEGORY_MEMO,
+        text_cache=settings.CIB_PAGE_TEXT_CACHE_DIR,
+    )
+    cache = CibParseCache(settings.CIB_PARSE_CACHE_DIR)
+
+    while True:
+        job = claim_next_job()
+        if job is not None:
+            logger.info(f"CIB parse job {job.id} indul: {job.file_name}")
+            run_job(job, parser=parser, cache=cache)
+            continue
+
+        if once:
+            return
+        time.sleep(poll_interval)
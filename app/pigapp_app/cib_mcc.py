@@ -0,0 +1,79 @@
+# app_name/cib_mcc.py
+"""
+Kártyás fizetések MCC (Merchant Category Code, ISO 18245) -> kategória tábla.
+
+A kereskedő sor első mezője a 4 jegyű MCC (lásd CibStatementParser.MERCHANT_RE);
+ha a kód szerepel a táblában, a kategória egyetlen dict lookup, kulcsszavas
+pontozás nélkül. A kategóriák a CibStatementParser.CATEGORY_KEYWORDS kulcsai.
+"""
+
+# (első kód, utolsó kód, kategória); zárt intervallumok
+MCC_RANGES = (
+    # élelmiszer, vendéglátás
+    (5411, 5411, "food"),  # élelmiszerbolt, szupermarket
+    (5422, 5422, "food"),  # hentes
+    (5441, 5441, "food"),  # édességbolt
+    (5451, 5451, "food"),  # tejtermék bolt
+    (5462, 5462, "food"),  # pékség
+    (5499, 5499, "food"),  # egyéb élelmiszer bolt
+    (5811, 5814, "food"),  # catering, étterem, bár, gyorsétterem
+    (5921, 5921, "food"),  # italbolt
+    # közlekedés
+    (3000, 3299, "transport"),  # légitársaságok
+    (3351, 3441, "transport"),  # autókölcsönzők
+    (4011, 4011, "transport"),  # vasút
+    (4111, 4112, "transport"),  # helyi és távolsági tömegközlekedés
+    (4121, 4121, "transport"),  # taxi
+    (4131, 4131, "transport"),  # busz
+    (4511, 4511, "transport"),  # légitársaság
+    (4784, 4784, "transport"),  # útdíj
+    (4789, 4789, "transport"),  # egyéb közlekedési szolgáltatás
+    (5541, 5542, "transport"),  # benzinkút
+    (7512, 7512, "transport"),  # autókölcsönzés
+    (7523, 7523, "transport"),  # parkolás
+    # vásárlás
+    (5200, 5200, "shopping"),  # barkácsáruház
+    (5211, 5211, "shopping"),  # építőanyag
+    (5251, 5251, "shopping"),  # vasáru
+    (5310, 5311, "shopping"),  # diszkont, áruház
+    (5331, 5331, "shopping"),  # vegyeskereskedés
+    (5399, 5399, "shopping"),  # egyéb általános áru
+    (5611, 5699, "shopping"),  # ruházat, cipő
+    (5712, 5712, "shopping"),  # bútor
+    (5722, 5722, "shopping"),  # háztartási gép
+    (5732, 5734, "shopping"),  # elektronika, szoftver
+    (5912, 5912, "shopping"),  # drogéria, gyógyszertár
+    (5941, 5942, "shopping"),  # sportszer, könyv
+    (5945, 5945, "shopping"),  # játék
+    (5964, 5964, "shopping"),  # csomagküldő
+    (5977, 5977, "shopping"),  # kozmetikum
+    (5993, 5993, "shopping"),  # dohánybolt
+    (5995, 5995, "shopping"),  # állatfelszerelés
+    (5999, 5999, "shopping"),  # egyéb kiskereskedelem
+    # szolgáltatások
+    (3501, 3999, "services"),  # szállodák
+    (4812, 4816, "services"),  # telekommunikáció, internet
+    (4899, 4899, "services"),  # kábel- és streaming TV
+    (5815, 5818, "services"),  # digitális tartalom, alkalmazások
+    (7011, 7011, "services"),  # szállás
+    (7230, 7230, "services"),  # fodrász, szépségszalon
+    (7298, 7298, "services"),  # wellness
+    (7832, 7832, "services"),  # mozi
+    (7941, 7941, "services"),  # sportklub
+    (7997, 7997, "services"),  # klub, edzőterem
+    (8011, 8099, "services"),  # egészségügy
+    # rezsi
+    (4900, 4900, "utilities"),  # villany, gáz, víz
+    # készpénz
+    (6010, 6011, "atm"),  # készpénzfelvétel (pénztár, ATM)
+    # pénzküldés, feltöltés
+    (4829, 4829, "transfer"),  # pénzátutalás
+    (6540, 6540, "transfer"),  # kártya / tárca feltöltés
+)
+
+# "5411" -> "food"; a modul betöltésekor egyszer épül fel
+MCC_CATEGORIES = {
+    f"{code:04d}": category
+    for first, last, category in MCC_RANGES
+    for code in range(first, last + 1)
+}
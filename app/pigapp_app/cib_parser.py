@@ -1,9 +1,110 @@
 # app_name/cib_parser.py
+import hashlib
+import json
+import logging
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple, Optional
 
+import numpy as np
 import pandas as pd
-import pdfplumber
+from .cib_cache import file_sha256, parse_key_sha256
+from .cib_category_memo import CibCategoryMemo
+from .cib_extractors import get_extractor
+from .cib_mcc import MCC_CATEGORIES
+from .cib_profile import CibParseProfile
+from .cib_text_cache import CibPageTextCache
+from .keyword_matcher import KeywordMatcher
+from .statement_formats import UnsupportedStatementFormat, sniff_format
+
+logger = logging.getLogger(__name__)
+
+
+class CibTransaction(NamedTuple):
+    """Egy feldolgozott tranzakció (a DataFrame egy sora)."""
+
+    konyvelesi_datum: str
+    leiras: str
+    osszeg: Optional[float]
+    egyenleg: Optional[float]
+    partner: str
+    iban: str
+    extra_sor_1: str
+    extra_sor_2: str
+    account_number: str
+    other_party_name: str
+    comment: str
+    category: str
+    category_source: str
+    # kártya
+    card_bin: str
+    card_last4: str
+    card_masked: str
+    card_tx_date: str
+    card_tx_time: str
+    card_original_amount: Optional[float]
+    card_currency: str
+    mcc: str
+    pos_id: str
+    card_city: str
+    card_merchant: str
+
+
+class CibRawTransaction(NamedTuple):
+    """
+    Egy tranzakció a sorillesztés után, átalakítás nélkül: a regex csoportok
+    nyers szövegei ("-3.000,00", "20260103"). Az összegek, dátumok és kártya
+    mezők oszloponként, vektorizáltan alakulnak át (rows_to_dataframe).
+    """
+
+    konyvelesi_datum: str
+    leiras: str
+    osszeg: str
+    egyenleg: str
+    partner: str
+    iban: str
+    extra_sor_1: str
+    extra_sor_2: str
+    account_number: str
+    other_party_name: str
+    comment: str
+    category: str
+    category_source: str
+    # kártya (CARD_RE / MERCHANT_RE csoportok)
+    card_p1: str
+    card_p2: str
+    card_p4: str
+    card_txdate: str
+    card_txtime: str
+    card_original_amount: str
+    card_currency: str
+    mcc: str
+    pos_id: str
+    card_city: str
+    card_merchant: str
+
+
+# classify_line sor típusai
+LINE_MAIN = "main"
+LINE_HEADER = "header"
+LINE_FOOTER = "footer"
+LINE_ACCOUNT = "account"
+LINE_IBAN = "iban"
+LINE_CARD = "card"
+LINE_MERCHANT = "merchant"
+LINE_COMMENT = "comment"
+LINE_TEXT = "text"
+
+# hiányzó kiegészítő sor
+_NO_LINE = (LINE_TEXT, "", None)
+
+# a kategória forrása (category_source oszlop)
+CATEGORY_SOURCE_MANUAL = "manual"
+CATEGORY_SOURCE_MCC = "mcc"
+CATEGORY_SOURCE_MEMO = "memo"
+CATEGORY_SOURCE_KEYWORD = "keyword"
 
 
 class CibStatementParser:
@@ -12,6 +113,15 @@ class CibStatementParser:
     Django/DRF-ben service/utils rétegben használható.
     """
 
+    # Növelni kell, ha a parse logika változik (a cache kulcs része)
+    PARSER_VERSION = "8"
+
+    # alapértelmezett szövegkinyerő backend (lásd cib_extractors.EXTRACTORS)
+    DEFAULT_EXTRACTOR = "pdfplumber"
+
+    # a kezelt kivonat formátum (statement_formats); None: nincs ellenőrzés
+    STATEMENT_FORMAT = "cib"
+
     # --- Kategorizálás kulcsszavak alapján ---
     CATEGORY_KEYWORDS = {
         "food": [
@@ -66,13 +176,47 @@ class CibStatementParser:
             "díjbekérés",
         ],
         "utilities": ["eon", "elmű", "távhő", "víz", "rezsi", "számla"],
-        "transfer": ["kimenő utalás", "azonnali utalás", "saját számlák", "átvezetés"],
+        "transfer": [
+            "kimenő utalás",
+            "azonnali utalás",
+            "saját számlák",
+            "átvezetés",
+        ],
         "atm": ["kpfelvétel", "atm", "kp felvétel", "készpénzfelvétel"],
         "salary": ["bér", "fizetés", "munkabér", "jövedelem"],
         "other": [],
     }
 
+    # --- Kártyás fizetések: MCC -> kategória (lásd cib_mcc) ---
+    MCC_CATEGORIES = MCC_CATEGORIES
+
+    # --- DataFrame séma ---
+    # az összegek egész fillérben (nullable Int64) tárolódnak: 100 fillér = 1 HUF
+    AMOUNT_SCALE = 100
+    DATE_FORMAT = "%Y.%m.%d."
+    DATE_COLUMNS = ("konyvelesi_datum",)
+    AMOUNT_COLUMNS = ("osszeg", "egyenleg", "card_original_amount")
+    CATEGORICAL_COLUMNS = ("category", "category_source", "card_currency", "mcc")
+    # ismétlődő szövegek: sys.intern-nel egyetlen példányban vannak a memóriában
+    INTERNED_COLUMNS = (
+        "partner",
+        "iban",
+        "account_number",
+        "other_party_name",
+        "card_city",
+        "card_merchant",
+    )
+
+    # párhuzamos oldalfeldolgozásnál ennyi oldal jut minimum egy processzre
+    MIN_PAGES_PER_WORKER = 10
+
     # --- regex minták ---
+    # a tranzakció táblázat fejlécének második sora (minden oldalon ismétlődik)
+    TABLE_HEADER_RE = re.compile(r"^ÉRTÉKNAP\b")
+    # a tábla vége: az oldal lábléce (bank adatai, jogi szöveg) vagy a záró
+    # összesítő; utána a következő fejlécig nincs tranzakció sor
+    TABLE_FOOTER_RE = re.compile(r"^(?:CIB Bank Zrt\. H-\d{4}|ÖSSZESEN FORGALOM\b)")
+
     MAIN_TX_RE = re.compile(
         r"^(?P<date>\d{4}\.\d{2}\.\d{2}\.)\s+"
         r"(?P<desc>.+?)\s+"
@@ -84,23 +228,80 @@ class CibStatementParser:
     ACCOUNT_NUM_RE = re.compile(r"^\d{8}-\d{8}-\d{8}$")
     COMMENT_RE = re.compile(r"^Közlemény:\s*(.+)$")
 
+    # a kártyaszám és a dátum között "A" vagy szóköz áll; az eredeti összeg
+    # "2.200,00" vagy "2200.00" alakú, utána a terhelt összeg és pénzneme is
+    # szerepelhet
     CARD_RE = re.compile(
-        r"^(?P<p1>\d{4})\s+(?P<p2>\d{4})\s+(?P<p3>\d{4})\s+(?P<p4>\d{4})A?"
+        r"^(?P<p1>\d{4})\s+(?P<p2>\d{4})\s+(?P<p3>\d{4})\s+(?P<p4>\d{4})\s*A?"
         r"(?P<txdate>\d{8})\s+(?P<txtime>\d{6});\s+"
-        r"(?P<orig_amount>[\d\.]+,\d{2})\s+(?P<currency>[A-Z]{3})$"
+        r"(?P<orig_amount>[\d\.]+,\d{2}|\d+\.\d{2})\s+(?P<currency>[A-Z]{3})"
+        r"(?:\s+(?:[\d\.]+,\d{2}|\d+\.\d{2})\s+[A-Z]{3})?$"
     )
 
+    # devizás fizetésnél a sor elején az árfolyam áll ("343.21 5993 ...")
     MERCHANT_RE = re.compile(
-        r"^(?P<mcc>\d{4})\s+(?P<pos>[A-Z0-9]+)\s+(?P<city>.+?);\s+(?P<merchant>.+)$"
+        r"^(?:\d+\.\d+\s+)?"
+        r"(?P<mcc>\d{4})\s+(?P<pos>[A-Z0-9]+)\s+(?P<city>.+?);\s+(?P<merchant>.+)$"
     )
+    # a fenti "2200.00" alakú (tizedespontos) összeg
+    DECIMAL_POINT_AMOUNT_RE = re.compile(r"^-?\d+\.\d{2}$")
+
+    # --- kategória memo kulcs (merchant_key) ---
+    # a blokk első kiegészítő sora előtt álló értéknap
+    VALUE_DATE_PREFIX_RE = re.compile(r"^\d{4}\.\d{2}\.\d{2}\.\s+")
+    CARD_NUMBER_RE = re.compile(r"^\d{4}\s+\d{4}\s+\d{4}\s+\d{4}")
 
-    def __init__(self, category_keywords=None):
+    def __init__(
+        self,
+        category_keywords=None,
+        extractor=None,
+        category_memo=None,
+        mcc_categories=None,
+        text_cache=None,
+    ):
         """
         Ha szeretnéd, felülírhatod a kategória kulcsszavakat:
         CibStatementParser(category_keywords={...})
+
+        extractor: szövegkinyerő backend neve ("pdfplumber", "pdfminer",
+        "pdfium") vagy PdfTextExtractor példány.
+
+        category_memo: CibCategoryMemo vagy a memo fájl path-ja; a kereskedő ->
+        kategória tábla a kulcsszavas kategorizálás előtt kerül ellenőrzésre.
+
+        mcc_categories: az MCC -> kategória tábla felülírása ({"5411": "food"}).
+
+        text_cache: CibPageTextCache vagy a cache könyvtár path-ja; a kinyert
+        oldal szövegek innen jönnek, a PDF csak az első feldolgozáskor nyílik meg.
         """
         if category_keywords is not None:
             self.CATEGORY_KEYWORDS = category_keywords
+        if mcc_categories is not None:
+            self.MCC_CATEGORIES = mcc_categories
+        self.extractor = get_extractor(extractor or self.DEFAULT_EXTRACTOR)
+        if category_memo is not None and not isinstance(category_memo, CibCategoryMemo):
+            category_memo = CibCategoryMemo(category_memo)
+        self._category_memo = category_memo
+        if text_cache is not None and not isinstance(text_cache, CibPageTextCache):
+            text_cache = CibPageTextCache(text_cache)
+        self.text_cache = text_cache
+
+    def keyword_table_version(self) -> str:
+        """A kategória kulcsszó tábla rövid hash-e (a cache kulcs része)."""
+        raw = json.dumps(self.CATEGORY_KEYWORDS, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+    def mcc_table_version(self) -> str:
+        """Az MCC -> kategória tábla rövid hash-e."""
+        raw = json.dumps(self.MCC_CATEGORIES, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+    def categorization_version(self) -> str:
+        """A kulcsszó / MCC tábla és a memo kézi javításainak verziója (cache kulcs)."""
+        version = f"{self.keyword_table_version()}.{self.mcc_table_version()}"
+        if self.category_memo is not None:
+            version = f"{version}.{self.category_memo.manual_version()}"
+        return version
 
     @staticmethod
     def normalize(line: str) -> str:
@@ -108,228 +309,715 @@ class CibStatementParser:
             return ""
         return " ".join(line.replace("\u00a0", " ").strip().split())
 
-    @staticmethod
-    def parse_amount(text):
+    @classmethod
+    def parse_amount(cls, text):
         if not text:
             return None
+        if cls.DECIMAL_POINT_AMOUNT_RE.match(text):
+            return float(text)
         t = text.replace(".", "").replace(",", ".")
         try:
             return float(t)
         except Exception:
             return None
 
-    def categorize(self, description: str, extra1: str, extra2: str) -> str:
+    @property
+    def keyword_matcher(self) -> KeywordMatcher:
+        """A kulcsszó táblából egyszer épített, példányonként cache-elt."""
+        cached = self.__dict__.get("_keyword_matcher")
+        if cached is None or cached[0] is not self.CATEGORY_KEYWORDS:
+            cached = (self.CATEGORY_KEYWORDS, KeywordMatcher(self.CATEGORY_KEYWORDS))
+            self._keyword_matcher = cached
+        return cached[1]
+
+    @property
+    def category_memo(self):
+        """A kereskedő -> kategória memo (az első használatkor töltődik be)."""
+        memo = self._category_memo
+        if memo is not None and not memo.loaded:
+            memo.load(self.keyword_table_version())
+        return memo
+
+    @classmethod
+    def merchant_key(cls, description: str, extra1: str, extra2: str):
+        """
+        A tranzakció partnerének memo kulcsa: kártyás fizetésnél a kereskedő
+        neve (a változó azonosítók nélkül), utalásnál a tranzakció típusa és a
+        partner IBAN / számlaszáma. Más tranzakciónál None.
+        """
+        extra1 = cls.VALUE_DATE_PREFIX_RE.sub("", extra1, count=1)
+
+        if cls.CARD_NUMBER_RE.match(extra1):
+            m = cls.MERCHANT_RE.match(extra2)
+            if not m:
+                return None
+            # a név végén álló, tranzakciónként változó numerikus azonosítók
+            # nélkül
+            words = m.group("merchant").split()
+            while len(words) > 1 and words[-1].isdigit():
+                words.pop()
+            return "card:" + " ".join(words).lower()
+
+        if cls.IBAN_RE.match(extra1) or cls.ACCOUNT_NUM_RE.match(extra1):
+            kind = description.split(";", 1)[0].strip().lower()
+            return f"account:{kind}:{extra1.replace(' ', '')}"
+
+        return None
+
+    def categorize(
+        self, description: str, extra1: str, extra2: str, mcc: str = ""
+    ) -> tuple:
+        """
+        Kategorizálás -> (kategória, forrás), sorrendben:
+        a memo kézi javítása, kártyás fizetésnél az MCC tábla, ismert
+        kereskedőnél a memo tanult bejegyzése, végül a kulcsszavak (az
+        eredmény bekerül a memóba). Az első három egy-egy dict lookup.
+        """
+        memo = self.category_memo
+        key = None
+        if memo is not None:
+            key = self.merchant_key(description, extra1, extra2)
+            if key is not None and key in memo.manual:
+                return memo.manual[key], CATEGORY_SOURCE_MANUAL
+
+        category = self.MCC_CATEGORIES.get(mcc) if mcc else None
+        if category is not None:
+            return category, CATEGORY_SOURCE_MCC
+
+        if key is None:
+            return (
+                self.keyword_category(description, extra1, extra2),
+                CATEGORY_SOURCE_KEYWORD,
+            )
+
+        category = memo.get(key)
+        if category is not None:
+            return category, CATEGORY_SOURCE_MEMO
+        category = self.keyword_category(description, extra1, extra2)
+        memo.learn(key, category)
+        return category, CATEGORY_SOURCE_KEYWORD
+
+    def keyword_category(self, description: str, extra1: str, extra2: str) -> str:
         """Egyszerű AI-szerű kategorizálás kulcsszavak alapján."""
         text = f"{description} {extra1} {extra2}".lower()
 
-        best_cat = "other"
-        best_score = 0
+        # egy menetben az összes kulcsszó találat; a legjobb pontszám nyer
+        return self.keyword_matcher.best_category(text)
+
+    def check_format(self, pdf_path: str) -> None:
+        """
+        Gyors formátum felismerés (metaadat / első oldal); más dokumentumnál
+        UnsupportedStatementFormat, még a teljes szövegkinyerés előtt.
+        """
+        if self.STATEMENT_FORMAT is None:
+            return
+
+        detected = sniff_format(pdf_path)
+        if detected != self.STATEMENT_FORMAT:
+            raise UnsupportedStatementFormat(
+                f"A fájl nem {self.STATEMENT_FORMAT} számlakivonat "
+                f"(felismert formátum: {detected or 'ismeretlen'})."
+            )
+
+    # ---- PDF oldalak -> normalizált sorok ----
+    def normalize_lines(self, raw_lines: list) -> list:
+        """Egy oldal kinyert sorai -> normalizált, nem üres sorok."""
+        return [self.normalize(x) for x in raw_lines if x.strip()]
+
+    def iter_page_lines(
+        self, pdf_path: str, start: int = 0, stop: int = None, sha256: str = None
+    ):
+        """
+        A [start, stop) oldalak normalizált, nem üres sorai, oldalanként.
+
+        sha256: a PDF már ismert tartalom hash-e; a szöveg cache-nek kell,
+        így az nem hash-eli újra a fájlt.
+        """
+        if self.text_cache is not None:
+            yield from self.text_cache.iter_page_lines(
+                self, pdf_path, start, stop, sha256=sha256
+            )
+            return
+
+        for raw_lines in self.extractor.iter_page_lines(pdf_path, start, stop):
+            yield self.normalize_lines(raw_lines)
+
+    def extract_page_lines(
+        self, pdf_path: str, start: int = 0, stop: int = None, sha256: str = None
+    ):
+        return list(self.iter_page_lines(pdf_path, start, stop, sha256=sha256))
+
+    def _extract_page_lines_parallel(
+        self, pdf_path: str, page_workers: int, sha256: str = None
+    ):
+        """
+        Az oldaltartományt page_workers darab folytonos szeletre bontja; minden
+        processz külön nyitja meg a PDF-et, az eredményt oldalsorrendben fűzzük
+        össze. Szöveg cache esetén a PDF egyszer kerül hash-elésre, nem
+        szeletenként.
+        """
+        page_count = self.extractor.page_count(pdf_path)
+
+        # felfelé kerekített oldalszám / processz
+        chunk = max(self.MIN_PAGES_PER_WORKER, -(-page_count // page_workers))
+        ranges = [(s, min(s + chunk, page_count)) for s in range(0, page_count, chunk)]
+        if len(ranges) <= 1:
+            return self.extract_page_lines(pdf_path, sha256=sha256)
+
+        if self.text_cache is not None and sha256 is None:
+            sha256 = file_sha256(pdf_path)
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [
+                pool.submit(self.extract_page_lines, pdf_path, s, e, sha256)
+                for s, e in ranges
+            ]
+            pages_lines = []
+            for future in futures:
+                pages_lines.extend(future.result())
+
+        return pages_lines
+
+    # ---- PDF -> tranzakciók (streaming) ----
+    def iter_transactions(self, pdf_path: str, page_workers: int = None):
+        """
+        CibTransaction rekordok oldalanként, a PDF sorrendjében (soronként
+        átalakítva; DataFrame-hez a rows_to_dataframe gyorsabb).
+        """
+        for raw in self.iter_raw_transactions(pdf_path, page_workers=page_workers):
+            yield self.finalize_row(raw)
+
+    def iter_raw_transactions(
+        self, pdf_path: str, page_workers: int = None, sha256: str = None
+    ):
+        """
+        CibRawTransaction rekordok oldalanként, a PDF sorrendjében.
+
+        Egyszerre csak az aktuális és a következő oldal sorai vannak a memóriában
+        (a következő oldal a lap alján kezdődő tranzakciók kiegészítő soraihoz
+        kell). page_workers>1 esetén a szövegkinyerés párhuzamosan fut, ilyenkor
+        az összes oldal sora előre beolvasásra kerül.
+        """
+        self.check_format(pdf_path)
+
+        if page_workers and page_workers > 1:
+            pages_lines = self._extract_page_lines_parallel(
+                pdf_path, page_workers, sha256=sha256
+            )
+        else:
+            pages_lines = self.iter_page_lines(pdf_path, sha256=sha256)
+
+        return self.iter_rows_from_page_lines(pages_lines)
+
+    def iter_rows_from_page_lines(self, pages_lines, categorize=None):
+        """
+        Oldalak sorai -> CibRawTransaction rekordok. Egy menetes összeállítás:
+        minden sor egyszer kerül osztályozásra (classify_line), a tranzakciókat
+        egy kis állapotgép rakja össze. A fő sor nyit egy tranzakciót, a
+        következő fő sorig tartó sorok a kiegészítő sorai (kettőnél több is
+        lehet), de legfeljebb a tábla végéig: a lábléc és a záró összesítő
+        utáni sorok nem tartoznak hozzá. Oldaltörés után a nyitott tranzakció
+        a következő oldal táblázat fejléce után folytatódik. A ciklus csak a
+        regex csoportok szövegeit gyűjti, átalakítás nélkül.
+
+        categorize: a self.categorize helyett (pl. mért változata).
+        """
+        categorize = categorize or self.categorize
+        classify = self.classify_line
+
+        main = None  # a nyitott tranzakció fő sorának match-e
+        follow = []  # a kiegészítő sorai: (típus, sor, match)
+        collecting = False
+        for lines in pages_lines:
+            # az oldal eleje (fejléc előtt) nem tartozik a nyitott tranzakcióhoz
+            collecting = False
+            for line in lines:
+                kind, m = classify(line)
+                if kind == LINE_MAIN:
+                    if main is not None:
+                        yield self._build_raw_transaction(main, follow, categorize)
+                    main, follow, collecting = m, [], True
+                elif kind == LINE_HEADER:
+                    collecting = main is not None
+                elif kind == LINE_FOOTER:
+                    collecting = False
+                elif collecting:
+                    follow.append((kind, line, m))
+
+        if main is not None:
+            yield self._build_raw_transaction(main, follow, categorize)
+
+    @classmethod
+    def classify_line(cls, line: str) -> tuple:
+        """
+        Normalizált sor -> (típus, match). Az első karakter alapján legfeljebb
+        egy (kártya soroknál kettő, értéknap előtagos soroknál három) regex fut.
+        Számlaszám és IBAN sornál a match szövege az előtag nélküli érték.
+        """
+        first = line[:1]
+        if first.isdigit():
+            sep = line[4:5]
+            if sep == ".":
+                m = cls.MAIN_TX_RE.match(line)
+                if m:
+                    return LINE_MAIN, m
+                # a blokk első kiegészítő sora előtt értéknap állhat (kártya,
+                # számlaszám és IBAN sornál is, mint a merchant_key-ben)
+                line = cls.VALUE_DATE_PREFIX_RE.sub("", line, count=1)
+                if "A" <= line[:1] <= "Z":
+                    m = cls.IBAN_RE.match(line)
+                    if m:
+                        return LINE_IBAN, m
+                elif line[4:5] == " ":
+                    m = cls.CARD_RE.match(line)
+                    if m:
+                        return LINE_CARD, m
+                elif line[8:9] == "-":
+                    m = cls.ACCOUNT_NUM_RE.match(line)
+                    if m:
+                        return LINE_ACCOUNT, m
+            elif sep == " ":
+                m = cls.CARD_RE.match(line)
+                if m:
+                    return LINE_CARD, m
+                m = cls.MERCHANT_RE.match(line)
+                if m:
+                    return LINE_MERCHANT, m
+            elif line[8:9] == "-":
+                m = cls.ACCOUNT_NUM_RE.match(line)
+                if m:
+                    return LINE_ACCOUNT, m
+            elif "." in line[:6]:
+                # devizás kereskedő sor (árfolyam előtaggal)
+                m = cls.MERCHANT_RE.match(line)
+                if m:
+                    return LINE_MERCHANT, m
+            return LINE_TEXT, None
+
+        if first == "K":
+            m = cls.COMMENT_RE.match(line)
+            if m:
+                return LINE_COMMENT, m
+        elif first == "É":
+            if cls.TABLE_HEADER_RE.match(line):
+                return LINE_HEADER, None
+            return LINE_TEXT, None
+        elif first in "CÖ" and cls.TABLE_FOOTER_RE.match(line):
+            return LINE_FOOTER, None
+
+        if "A" <= first <= "Z":
+            m = cls.IBAN_RE.match(line)
+            if m:
+                return LINE_IBAN, m
+        return LINE_TEXT, None
+
+    def _build_raw_transaction(
+        self, main, follow: list, categorize
+    ) -> CibRawTransaction:
+        """Fő sor match + osztályozott kiegészítő sorok -> CibRawTransaction."""
+        date, leiras, amount, balance = main.groups()
+
+        # az első két kiegészítő sor a régi extra_sor_1 / extra_sor_2
+        kind1, extra1, m1 = follow[0] if follow else _NO_LINE
+        kind2, extra2, m2 = follow[1] if len(follow) > 1 else _NO_LINE
+
+        # számlaszám felismerése (értéknap előtag nélkül: a match szövege)
+        account_number = ""
+        if kind2 == LINE_ACCOUNT:
+            account_number = m2.group(0)
+        elif kind1 == LINE_ACCOUNT:
+            account_number = m1.group(0)
+
+        # közlemény: az első két sorból, különben a további sorok elsőjéből
+        comment = ""
+        if kind2 == LINE_COMMENT:
+            comment = m2.group(1)
+        elif kind1 == LINE_COMMENT:
+            comment = m1.group(1)
+        else:
+            for kind, _, m in follow[2:]:
+                if kind == LINE_COMMENT:
+                    comment = m.group(1)
+                    break
+
+        # partner / IBAN
+        partner = ""
+        iban = ""
+        other_party_name = ""
+        if kind1 == LINE_IBAN:
+            iban = m1.group(0)
+            partner = extra2
+        elif kind2 == LINE_ACCOUNT:
+            other_party_name = extra1
+        elif kind1 == LINE_ACCOUNT:
+            other_party_name = extra2
+
+        # --- Kártyaadatok (nyers csoportok) ---
+        p1 = p2 = p4 = txdate = txtime = orig_amount = card_currency = ""
+        mcc = pos_id = card_city = card_merchant = ""
+
+        card_line = kind1 == LINE_CARD
+        if card_line:
+            p1, p2, _, p4, txdate, txtime, orig_amount, card_currency = m1.groups()
+
+        c2 = m2 if kind2 == LINE_MERCHANT else None
+        if kind2 == LINE_CARD:
+            # kártya sorként osztályozott sor kereskedő sorként is illeszkedhet
+            c2 = self.MERCHANT_RE.match(extra2)
+        # a kereskedő sor (MCC) akkor is, ha a kártya sor többi része (értéknap
+        # előtag, összeg formátum) miatt a CARD_RE nem illeszkedett
+        if c2 and not card_line:
+            card_line = self.CARD_NUMBER_RE.match(
+                self.VALUE_DATE_PREFIX_RE.sub("", extra1, count=1)
+            )
+        if c2 and card_line:
+            mcc, pos_id, card_city, card_merchant = c2.groups()
 
-        for cat, keywords in self.CATEGORY_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text)
-            if score > best_score:
-                best_score = score
-                best_cat = cat
+        # --- AI kategorizálás ---
+        category, category_source = categorize(leiras, extra1, extra2, mcc)
 
-        return best_cat
+        return CibRawTransaction(
+            konyvelesi_datum=date,
+            leiras=leiras,
+            osszeg=amount,
+            egyenleg=balance,
+            partner=partner,
+            iban=iban,
+            extra_sor_1=extra1,
+            extra_sor_2=extra2,
+            account_number=account_number,
+            other_party_name=other_party_name,
+            comment=comment,
+            category=category,
+            category_source=category_source,
+            # kártya
+            card_p1=p1,
+            card_p2=p2,
+            card_p4=p4,
+            card_txdate=txdate,
+            card_txtime=txtime,
+            card_original_amount=orig_amount,
+            card_currency=card_currency,
+            mcc=mcc,
+            pos_id=pos_id,
+            card_city=card_city,
+            card_merchant=card_merchant,
+        )
+
+    @classmethod
+    def finalize_row(cls, raw: CibRawTransaction) -> CibTransaction:
+        """Egy nyers rekord soronkénti átalakítása (streaming feldolgozáshoz)."""
+        card_bin = card_masked = card_tx_date = card_tx_time = ""
+        if raw.card_p1:
+            card_bin = raw.card_p1 + raw.card_p2[:2]
+            card_masked = f"{card_bin}******{raw.card_p4}"
+            txdate = raw.card_txdate
+            txtime = raw.card_txtime
+            card_tx_date = f"{txdate[:4]}-{txdate[4:6]}-{txdate[6:]}"
+            card_tx_time = f"{txtime[:2]}:{txtime[2:4]}:{txtime[4:]}"
+
+        return CibTransaction(
+            konyvelesi_datum=raw.konyvelesi_datum,
+            leiras=raw.leiras,
+            osszeg=cls.parse_amount(raw.osszeg),
+            egyenleg=cls.parse_amount(raw.egyenleg),
+            partner=raw.partner,
+            iban=raw.iban,
+            extra_sor_1=raw.extra_sor_1,
+            extra_sor_2=raw.extra_sor_2,
+            account_number=raw.account_number,
+            other_party_name=raw.other_party_name,
+            comment=raw.comment,
+            category=raw.category,
+            category_source=raw.category_source,
+            # kártya
+            card_bin=card_bin,
+            card_last4=raw.card_p4,
+            card_masked=card_masked,
+            card_tx_date=card_tx_date,
+            card_tx_time=card_tx_time,
+            card_original_amount=cls.parse_amount(raw.card_original_amount),
+            card_currency=raw.card_currency,
+            mcc=raw.mcc,
+            pos_id=raw.pos_id,
+            card_city=raw.card_city,
+            card_merchant=raw.card_merchant,
+        )
 
     # ---- Alap PDF -> DataFrame parse ----
-    def parse_pdf_to_dataframe(self, pdf_path: str) -> pd.DataFrame:
-        rows = []
-
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                lines = [self.normalize(x) for x in text.splitlines() if x.strip()]
-
-                for i, line in enumerate(lines):
-                    m = self.MAIN_TX_RE.match(line)
-                    if not m:
-                        continue
-
-                    konyvelesi = m.group("date")
-                    leiras = m.group("desc")
-                    osszeg = self.parse_amount(m.group("amount"))
-                    egyenleg = self.parse_amount(m.group("balance"))
-
-                    extra1 = lines[i + 1] if i + 1 < len(lines) else ""
-                    extra2 = lines[i + 2] if i + 2 < len(lines) else ""
-
-                    partner = ""
-                    iban = ""
-
-                    # --- ÚJ mezők ---
-                    account_number = ""
-                    other_party_name = ""
-                    comment = ""
-
-                    # számlaszám felismerése
-                    if self.ACCOUNT_NUM_RE.match(extra1):
-                        account_number = extra1
-                    if self.ACCOUNT_NUM_RE.match(extra2):
-                        account_number = extra2
-
-                    # közlemény felismerése
-                    m_comm1 = self.COMMENT_RE.match(extra1)
-                    if m_comm1:
-                        comment = m_comm1.group(1)
-
-                    m_comm2 = self.COMMENT_RE.match(extra2)
-                    if m_comm2:
-                        comment = m_comm2.group(1)
-
-                    # partner / IBAN
-                    if self.IBAN_RE.match(extra1):
-                        iban = extra1
-                        partner = extra2
-                    else:
-                        if account_number and not iban:
-                            if self.ACCOUNT_NUM_RE.match(extra1):
-                                other_party_name = extra2
-                            if self.ACCOUNT_NUM_RE.match(extra2):
-                                other_party_name = extra1
-
-                    # --- Kártyaadatok ---
-                    card_bin = ""
-                    card_last4 = ""
-                    card_masked = ""
-                    card_tx_date = ""
-                    card_tx_time = ""
-                    card_original_amount = None
-                    card_currency = ""
-                    mcc = ""
-                    pos_id = ""
-                    card_city = ""
-                    card_merchant = ""
-
-                    c1 = self.CARD_RE.match(extra1)
-                    if c1:
-                        p1 = c1.group("p1")
-                        p2 = c1.group("p2")
-                        p3 = c1.group("p3")
-                        p4 = c1.group("p4")
-
-                        card_bin = p1 + p2[:2]
-                        card_last4 = p4
-                        card_masked = f"{card_bin}******{card_last4}"
-
-                        txdate = c1.group("txdate")
-                        txtime = c1.group("txtime")
-
-                        card_tx_date = f"{txdate[:4]}-{txdate[4:6]}-{txdate[6:]}"
-                        card_tx_time = f"{txtime[:2]}:{txtime[2:4]}:{txtime[4:]}"
-
-                        card_original_amount = self.parse_amount(
-                            c1.group("orig_amount")
-                        )
-                        card_currency = c1.group("currency")
-
-                        c2 = self.MERCHANT_RE.match(extra2)
-                        if c2:
-                            mcc = c2.group("mcc")
-                            pos_id = c2.group("pos")
-                            card_city = c2.group("city")
-                            card_merchant = c2.group("merchant")
-
-                    # --- AI kategorizálás ---
-                    category = self.categorize(leiras, extra1, extra2)
-
-                    rows.append(
-                        {
-                            "konyvelesi_datum": konyvelesi,
-                            "leiras": leiras,
-                            "osszeg": osszeg,
-                            "egyenleg": egyenleg,
-                            "partner": partner,
-                            "iban": iban,
-                            "extra_sor_1": extra1,
-                            "extra_sor_2": extra2,
-                            "account_number": account_number,
-                            "other_party_name": other_party_name,
-                            "comment": comment,
-                            "category": category,
-                            # kártya
-                            "card_bin": card_bin,
-                            "card_last4": card_last4,
-                            "card_masked": card_masked,
-                            "card_tx_date": card_tx_date,
-                            "card_tx_time": card_tx_time,
-                            "card_original_amount": card_original_amount,
-                            "card_currency": card_currency,
-                            "mcc": mcc,
-                            "pos_id": pos_id,
-                            "card_city": card_city,
-                            "card_merchant": card_merchant,
-                        }
-                    )
-
-        return pd.DataFrame(rows)
+    def parse_pdf_to_dataframe(
+        self, pdf_path: str, page_workers: int = None, profile=None, sha256=None
+    ) -> pd.DataFrame:
+        """
+        page_workers>1: nagy (sok oldalas) kivonatnál az oldalak szövegkinyerése
+        párhuzamosan, több processzben fut.
+
+        profile: opcionális CibParseProfile a szakaszonkénti méréshez.
+
+        sha256: a PDF már ismert tartalom hash-e (a szöveg cache kulcsához).
+        """
+        if profile is None:
+            rows = list(
+                self.iter_raw_transactions(
+                    pdf_path, page_workers=page_workers, sha256=sha256
+                )
+            )
+            df = self.rows_to_dataframe(rows)
+        else:
+            rows = self._profiled_transactions(pdf_path, page_workers, profile, sha256)
+            with profile.stage("dataframe"):
+                df = self.rows_to_dataframe(rows)
+
+        # az újonnan tanult kereskedők mentése (kivonatonként egyszer)
+        if self._category_memo is not None:
+            self._category_memo.save()
+        return df
+
+    def _profiled_transactions(
+        self, pdf_path: str, page_workers, profile, sha256: str = None
+    ) -> list:
+        """
+        Mért feldolgozás: a szövegkinyerés külön szakaszként, előre fut (így a
+        memóriája is külön mérhető); a regex szakasz idejéből a kategorizálás
+        ideje levonásra kerül.
+        """
+        with profile.stage("extraction"):
+            self.check_format(pdf_path)
+            if page_workers and page_workers > 1:
+                pages_lines = self._extract_page_lines_parallel(
+                    pdf_path, page_workers, sha256=sha256
+                )
+            else:
+                pages_lines = self.extract_page_lines(pdf_path, sha256=sha256)
+        profile.pages = len(pages_lines)
+        profile.lines = sum(len(lines) for lines in pages_lines)
+
+        categorize = profile.timed("categorization", self.categorize)
+        with profile.stage("matching"):
+            rows = list(self.iter_rows_from_page_lines(pages_lines, categorize))
+        profile.stages["matching"]["seconds"] -= profile.stages["categorization"][
+            "seconds"
+        ]
+        profile.rows = len(rows)
+        return rows
+
+    # ---- DataFrame séma: tömör, típusos oszlopok ----
+    @classmethod
+    def apply_schema(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        datetime64 könyvelési dátum, fillér alapú nullable Int64 összegek,
+        category dtype a kevés értékű oszlopokra, internált ismétlődő szövegek.
+        """
+        df = df.copy()
+
+        for col in cls.DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col], format=cls.DATE_FORMAT, errors="coerce")
+
+        for col in cls.AMOUNT_COLUMNS:
+            amounts = pd.to_numeric(df[col], errors="coerce") * cls.AMOUNT_SCALE
+            df[col] = amounts.round().astype("Int64")
+
+        return cls._compact_columns(df)
+
+    @classmethod
+    def rows_to_dataframe(cls, rows) -> pd.DataFrame:
+        """
+        CibRawTransaction rekordok -> típusos DataFrame (mint az apply_schema),
+        a nyers szövegek oszloponkénti, vektorizált átalakításával; soronkénti
+        Python munka (parse_amount, f-stringek) nélkül.
+        """
+        raw = pd.DataFrame.from_records(rows, columns=CibRawTransaction._fields)
+
+        card = raw["card_p1"] != ""
+        card_bin = raw["card_p1"] + raw["card_p2"].str[:2]
+        txdate = raw["card_txdate"]
+        txtime = raw["card_txtime"]
+        df = raw.assign(
+            card_bin=card_bin,
+            card_last4=raw["card_p4"],
+            card_masked=(card_bin + "******" + raw["card_p4"]).where(card, ""),
+            card_tx_date=(
+                txdate.str[:4] + "-" + txdate.str[4:6] + "-" + txdate.str[6:]
+            ).where(card, ""),
+            card_tx_time=(
+                txtime.str[:2] + ":" + txtime.str[2:4] + ":" + txtime.str[4:]
+            ).where(card, ""),
+        )[list(CibTransaction._fields)]
+
+        for col in cls.DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col], format=cls.DATE_FORMAT, errors="coerce")
+
+        for col in cls.AMOUNT_COLUMNS:
+            df[col] = cls._raw_amount_filler(df[col])
+
+        return cls._compact_columns(df)
 
-    # ---- DataFrame -> összesített JSON struktúra ----
     @staticmethod
-    def dataframe_to_summary(df: pd.DataFrame) -> dict:
+    def _raw_amount_filler(values: pd.Series) -> pd.Series:
+        """
+        "-3.000,00" -> -300000 (Int64 fillér): a regexek pontosan két
+        tizedesjegyet fognak meg (AMOUNT_SCALE=100), így elég az ezres pontok
+        és a tizedesvessző elhagyása; float kerekítés nincs. "" -> <NA>.
+        """
+        digits = values.str.replace(".", "", regex=False).str.replace(
+            ",", "", regex=False
+        )
+        return digits.where(digits != "").astype("Int64")
+
+    @classmethod
+    def _compact_columns(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        category dtype a kevés értékű oszlopokra, internált ismétlődő
+        szövegek.
+        """
+        for col in cls.CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype("category")
+
+        for col in cls.INTERNED_COLUMNS:
+            # Arrow alapú str oszlopban nincsenek Python string objektumok
+            if df[col].dtype == object:
+                df[col] = df[col].map(sys.intern, na_action="ignore")
+
+        return df
+
+    # ---- egyenleg lánc ellenőrzés ----
+    @classmethod
+    def _filler(cls, values: pd.Series) -> np.ndarray:
+        """
+        Összeg oszlop int64 fillérben; a hiányzó érték 0 (hézagként
+        jelentkezik).
+        """
+        if not pd.api.types.is_integer_dtype(values):
+            values = (pd.to_numeric(values, errors="coerce") * cls.AMOUNT_SCALE).round()
+        return values.to_numpy(dtype="int64", na_value=0)
+
+    @classmethod
+    def reconcile_balances(cls, df: pd.DataFrame) -> dict:
+        """
+        Egyenleg lánc: a nyitó egyenlegből és az összegek kumulált összegéből
+        számolt várt egyenleg vs. a kivonat egyenleg oszlopa. Ahol a kettő
+        különbsége (residual) ugrik, ott a két sor között tranzakció maradt ki
+        (vagy egy összeg / egyenleg hibásan lett felismerve). O(n), vektorizált,
+        egész fillérben számol, így nincs kerekítési hiba.
+        """
+        if df.empty:
+            return {"ok": True, "checked": 0, "gaps": []}
+
+        amounts = cls._filler(df["osszeg"])
+        balances = cls._filler(df["egyenleg"])
+
+        opening = balances[0] - amounts[0]
+        residual = balances - (opening + np.cumsum(amounts))
+        jumps = np.diff(residual, prepend=residual[0])
+        positions = np.flatnonzero(jumps)
+
+        gaps = []
+        if len(positions):
+            dates = df[cls.DATE_COLUMNS[0]]
+            if pd.api.types.is_datetime64_any_dtype(dates):
+                dates = dates.dt.strftime(cls.DATE_FORMAT)
+            dates = dates.to_numpy()
+            gaps = [
+                {
+                    # a hézag utáni első sor pozíciója (all_transactions index)
+                    "position": int(i),
+                    "previous_date": dates[i - 1],
+                    "date": dates[i],
+                    "previous_balance": int(balances[i - 1]) / cls.AMOUNT_SCALE,
+                    "balance": int(balances[i]) / cls.AMOUNT_SCALE,
+                    "missing_amount": int(jumps[i]) / cls.AMOUNT_SCALE,
+                }
+                for i in positions
+            ]
+        return {"ok": not gaps, "checked": len(df), "gaps": gaps}
+
+    @classmethod
+    def to_output_frame(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        A típusos DataFrame visszaalakítása a JSON válasz formátumára
+        ("2025.11.01." dátum, forint float összeg, hiányzó érték: None).
+        Séma nélküli DataFrame-et változatlanul ad vissza.
+        """
+        if not pd.api.types.is_datetime64_any_dtype(df[cls.DATE_COLUMNS[0]]):
+            return df
+
+        out = df.copy()
+
+        for col in cls.DATE_COLUMNS:
+            out[col] = out[col].dt.strftime(cls.DATE_FORMAT)
+
+        for col in cls.AMOUNT_COLUMNS:
+            amounts = out[col].astype("Float64") / cls.AMOUNT_SCALE
+            if amounts.isna().any():
+                out[col] = amounts.astype(object).where(amounts.notna(), None)
+            else:
+                out[col] = amounts.astype("float64")
+
+        for col in cls.CATEGORICAL_COLUMNS:
+            out[col] = out[col].astype(object)
+
+        return out
+
+    # ---- DataFrame -> összesített JSON struktúra ----
+    OUTGOING_INSTANT_TEXT = "kimenő azonnali utalás"
+    INTERNAL_TRANSFER_TEXT = "saját számlák közti rendsz. utalás"
+
+    @classmethod
+    def dataframe_to_summary(cls, df: pd.DataFrame) -> dict:
+        """
+        Oszloponként (vektorizáltan) számolt összesítés, soronkénti iterálás
+        nélkül. A tranzakció listák egyetlen to_dict hívásból készülnek.
+        """
+        balance_check = cls.reconcile_balances(df)
+        df = cls.to_output_frame(df)
         all_transactions = df.to_dict(orient="records")
 
         # kategória összesítés
         category_totals = df.groupby("category")["osszeg"].sum().to_dict()
+        # hány sor kategóriája jött MCC-ből, kulcsszavakból, memóból
+        category_sources = {
+            source: int(count)
+            for source, count in df["category_source"].value_counts().items()
+            if count
+        }
+
+        # egyszer kisbetűsítve, utána egyszerű részszöveg keresés
+        leiras = df["leiras"].fillna("").str.lower()
+        outgoing_mask = leiras.str.contains(cls.OUTGOING_INSTANT_TEXT, regex=False)
+        internal_mask = leiras.str.contains(cls.INTERNAL_TRANSFER_TEXT, regex=False)
 
         # outgoing_by_iban
-        outgoing = df[
-            df["leiras"].str.contains("Kimenő azonnali utalás", case=False, na=False)
-        ]
+        outgoing = df[outgoing_mask]
+        outgoing_trx = cls._transaction_records(outgoing)
         groups = outgoing.groupby("iban")
+        aggregated = groups.agg(
+            partner=("partner", "first"), total_amount=("osszeg", "sum")
+        )
 
         outgoing_by_iban = {}
-        for iban, group in groups:
-            partner_name = (
-                group["partner"].dropna().iloc[0]
-                if not group["partner"].dropna().empty
-                else ""
-            )
-            total_amount = group["osszeg"].sum()
-
-            trx_list = [
-                {
-                    "date": row["konyvelesi_datum"],
-                    "amount": row["osszeg"],
-                    "balance": row["egyenleg"],
-                    "description": row["leiras"],
-                }
-                for _, row in group.iterrows()
-            ]
-
+        for iban, positions in groups.indices.items():
+            partner_name = aggregated.at[iban, "partner"]
             outgoing_by_iban[iban] = {
-                "partner": partner_name,
-                "total_amount": total_amount,
-                "transactions": trx_list,
+                "partner": "" if pd.isna(partner_name) else partner_name,
+                "total_amount": aggregated.at[iban, "total_amount"],
+                "transactions": [outgoing_trx[p] for p in positions],
             }
+        # a groupby rendezett kulcssorrendje
+        outgoing_by_iban = {iban: outgoing_by_iban[iban] for iban in aggregated.index}
 
         # napi kiadások
-        df["date_norm"] = (
+        date_norm = (
             df["konyvelesi_datum"].str.replace(".", "-", regex=False).str.rstrip("-")
         )
+        spending = df["osszeg"] < 0
         daily_spending = (
-            df[df["osszeg"] < 0].groupby("date_norm")["osszeg"].sum().to_dict()
+            df.loc[spending, "osszeg"].groupby(date_norm[spending]).sum().to_dict()
         )
 
         # internal transfers
-        internal_df = df[
-            df["leiras"].str.contains(
-                "Saját számlák közti rendsz. utalás", case=False, na=False
-            )
-        ]
-        internal_trx = [
-            {
-                "date": row["konyvelesi_datum"],
-                "amount": row["osszeg"],
-                "balance": row["egyenleg"],
-                "description": row["leiras"],
-            }
-            for _, row in internal_df.iterrows()
-        ]
+        internal_df = df[internal_mask]
         internal_transfers = {
             "total": internal_df["osszeg"].sum() if not internal_df.empty else 0,
-            "transactions": internal_trx,
+            "transactions": cls._transaction_records(internal_df),
         }
 
         return {
@@ -338,15 +1026,63 @@ class CibStatementParser:
             "daily_spending": daily_spending,
             "internal_transfers": internal_transfers,
             "category_totals": category_totals,
+            "category_sources": category_sources,
+            "balance_check": balance_check,
         }
 
+    @staticmethod
+    def _transaction_records(df: pd.DataFrame) -> list:
+        return (
+            df[["konyvelesi_datum", "osszeg", "egyenleg", "leiras"]]
+            .rename(
+                columns={
+                    "konyvelesi_datum": "date",
+                    "osszeg": "amount",
+                    "egyenleg": "balance",
+                    "leiras": "description",
+                }
+            )
+            .to_dict(orient="records")
+        )
+
     # ---- Egy PDF -> summary dict ----
-    def parse_pdf(self, pdf_path: str) -> dict:
-        df = self.parse_pdf_to_dataframe(pdf_path)
-        return self.dataframe_to_summary(df)
+    def parse_pdf(
+        self, pdf_path: str, page_workers: int = None, profile=None, sha256=None
+    ) -> dict:
+        df = self.parse_pdf_to_dataframe(
+            pdf_path, page_workers=page_workers, profile=profile, sha256=sha256
+        )
+        if profile is None:
+            summary = self.dataframe_to_summary(df)
+        else:
+            with profile.stage("summary"):
+                summary = self.dataframe_to_summary(df)
 
-    # ---- Path (PDF vagy mappa) -> több summary ----
-    def parse_path(self, path: str) -> dict:
+        if not summary["balance_check"]["ok"]:
+            logger.warning(
+                f"CIB egyenleg lánc hiba {os.path.basename(pdf_path)}: "
+                f"{len(summary['balance_check']['gaps'])} hézag, "
+                f"{summary['balance_check']['gaps']}"
+            )
+        logger.debug(
+            f"CIB kategorizálás {os.path.basename(pdf_path)}: "
+            f"{summary['category_sources']}"
+        )
+        return summary
+
+    def _parse_pdf_profiled(
+        self, pdf_path: str, page_workers: int = None, sha256: str = None
+    ):
+        """(summary, mérés dict); a párhuzamos feldolgozás processzeiben is fut."""
+        profile = CibParseProfile(pdf_path)
+        summary = self.parse_pdf(
+            pdf_path, page_workers=page_workers, profile=profile, sha256=sha256
+        )
+        return summary, profile.as_dict()
+
+    # ---- Path (PDF vagy mappa) -> PDF fájlok listája ----
+    @staticmethod
+    def collect_pdf_files(path: str) -> list:
         pdf_files = []
 
         if os.path.isdir(path):
@@ -362,9 +1098,167 @@ class CibStatementParser:
         if not pdf_files:
             raise ValueError("Nincs PDF fájl a megadott path-on.")
 
+        return pdf_files
+
+    # ---- Path (PDF vagy mappa) -> több summary ----
+    def parse_path(
+        self,
+        path: str,
+        workers: int = None,
+        cache=None,
+        profiler=None,
+        page_workers: int = None,
+    ) -> dict:
+        """
+        workers=None vagy 1: a PDF-ek egymás után kerülnek feldolgozásra.
+        workers>1: a PDF-ek párhuzamosan, külön processzekben (ProcessPoolExecutor)
+        kerülnek feldolgozásra. Egy hibás fájl nem állítja meg a többit,
+        a hibája a saját kulcsa alatt jelenik meg: {"error": "..."}.
+
+        cache: opcionális CibParseCache; a változatlan PDF-ek eredménye innen
+        jön, csak az új / módosult fájlok kerülnek feldolgozásra.
+
+        profiler: opcionális CibParseProfiler; a feldolgozott fájlok
+        szakaszonkénti ideje, sor / tranzakció száma és memóriája ebbe kerül.
+
+        page_workers>1: az egymás után feldolgozott PDF-ek (egyetlen fájl vagy
+        workers<=1) oldalainak szövegkinyerése párhuzamosan fut (lásd
+        parse_pdf_to_dataframe). Párhuzamos fájl feldolgozásnál nincs hatása:
+        a pool processzei nem indíthatnak további processzeket.
+        """
+        pdf_files = self.collect_pdf_files(path)
+        parsed = self.parse_files(
+            pdf_files,
+            workers=workers,
+            cache=cache,
+            profiler=profiler,
+            page_workers=page_workers,
+        )
+
+        # a kimenet sorrendje a fájllista sorrendje
         result = {}
         for pdf_path in pdf_files:
             base_name = os.path.splitext(os.path.basename(pdf_path))[0]
-            result[base_name] = self.parse_pdf(pdf_path)
+            result[base_name] = parsed[pdf_path]
 
         return result
+
+    def iter_parse_path(
+        self,
+        path: str,
+        cache=None,
+        profiler=None,
+        page_workers: int = None,
+    ):
+        """
+        A parse_path lusta változata: (név, summary) párok kivonatonként, a
+        PDF-ek egymás után kerülnek feldolgozásra, így egyszerre csak egy
+        kivonat összesítése van a memóriában (streamelt válaszhoz).
+
+        A fájllista azonnal összeáll, a hibás path ValueError-ja már a
+        hívásnál jelentkezik, nem az első elem kérésekor.
+        """
+        pdf_files = self.collect_pdf_files(path)
+
+        def summaries():
+            for pdf_path in pdf_files:
+                parsed = self.parse_files(
+                    [pdf_path],
+                    cache=cache,
+                    profiler=profiler,
+                    page_workers=page_workers,
+                )
+                base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+                yield base_name, parsed[pdf_path]
+
+        return summaries()
+
+    def parse_files(
+        self,
+        pdf_files: list,
+        workers: int = None,
+        cache=None,
+        profiler=None,
+        page_workers: int = None,
+        keys: dict = None,
+    ) -> dict:
+        """
+        PDF fájlok -> {pdf_path: summary} (lásd parse_path).
+
+        keys: a hívó által már kiszámolt {pdf_path: parse kulcs}; ezekhez a
+        fájlokhoz a cache nem hash-el újra. A kulcsokban lévő tartalom hash a
+        szöveg cache-hez is továbbadódik, így egy PDF egyszer kerül hash-elésre.
+        """
+        keys = dict(keys or {})
+        parsed = {}
+        cache_keys = {}
+        pending = []
+        for pdf_path in pdf_files:
+            if cache is not None:
+                if pdf_path not in keys:
+                    keys[pdf_path] = cache.key_for(pdf_path, self)
+                key = keys[pdf_path]
+                cached = cache.get(key)
+                if cached is not None:
+                    parsed[pdf_path] = cached
+                    if profiler is not None:
+                        profiler.add_cached(pdf_path)
+                    continue
+                cache_keys[pdf_path] = key
+            pending.append(pdf_path)
+
+        sha256s = {pdf_path: parse_key_sha256(key) for pdf_path, key in keys.items()}
+        if pending:
+            if not workers or workers <= 1 or len(pending) == 1:
+                for pdf_path in pending:
+                    sha256 = sha256s.get(pdf_path)
+                    try:
+                        if profiler is None:
+                            parsed[pdf_path] = self.parse_pdf(
+                                pdf_path, page_workers=page_workers, sha256=sha256
+                            )
+                        else:
+                            parsed[pdf_path], profile = self._parse_pdf_profiled(
+                                pdf_path, page_workers, sha256
+                            )
+                            profiler.add(pdf_path, profile)
+                    except Exception as e:
+                        parsed[pdf_path] = self._error_result(e)
+            else:
+                parsed.update(
+                    self._parse_files_parallel(pending, workers, profiler, sha256s)
+                )
+
+        for pdf_path, key in cache_keys.items():
+            if "error" not in parsed[pdf_path]:
+                cache.set(key, parsed[pdf_path])
+
+        return parsed
+
+    def _parse_files_parallel(
+        self, pdf_files: list, workers: int, profiler=None, sha256s: dict = None
+    ) -> dict:
+        parsed = {}
+        task = self.parse_pdf if profiler is None else self._parse_pdf_profiled
+        sha256s = sha256s or {}
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(pdf_files))) as pool:
+            futures = {
+                pool.submit(task, f, sha256=sha256s.get(f)): f for f in pdf_files
+            }
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    if profiler is None:
+                        parsed[pdf_path] = future.result()
+                    else:
+                        parsed[pdf_path], profile = future.result()
+                        profiler.add(pdf_path, profile)
+                except Exception as e:
+                    parsed[pdf_path] = self._error_result(e)
+
+        return parsed
+
+    @staticmethod
+    def _error_result(exc: Exception) -> dict:
+        return {"error": f"{type(exc).__name__}: {exc}"}
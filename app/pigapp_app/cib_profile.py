@@ -0,0 +1,124 @@
+# app_name/cib_profile.py
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # nem Unix rendszer
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extraction", "matching", "categorization", "dataframe", "summary")
+
+
+def process_peak_rss_kb():
+    """
+    A processz indulása óta mért legnagyobb rezidens memória (KiB), ha
+    mérhető; nem szakaszonkénti érték, csak nőhet.
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class CibParseProfile:
+    """
+    Egy PDF feldolgozásának szakaszonkénti mérése: idő, oldal / sor /
+    tranzakció szám és memória.
+
+    Memória: process_peak_rss_kb a teljes processz (ru_maxrss) eddigi csúcsa
+    a szakasz végén, nem a szakasz saját fogyasztása (ha nő, az adott szakasz
+    emelte meg); szakaszonkénti érték a py_peak_kb, a szakaszon belüli Python
+    allokációs csúcs, ha a tracemalloc fut (PYTHONTRACEMALLOC=1).
+    """
+
+    def __init__(self, pdf_path: str):
+        self.file = os.path.basename(pdf_path)
+        self.pages = 0
+        self.lines = 0
+        self.rows = 0
+        self.stages = {}
+
+    def _stage(self, name: str) -> dict:
+        return self.stages.setdefault(name, {"seconds": 0.0})
+
+    @contextmanager
+    def stage(self, name: str):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self._stage(name)
+            entry["seconds"] += time.perf_counter() - t0
+            entry["process_peak_rss_kb"] = process_peak_rss_kb()
+            if tracing:
+                entry["py_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+
+    def timed(self, name: str, func):
+        """func, amelynek hívásai a name szakasz idejébe számítanak."""
+        entry = self._stage(name)
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                entry["seconds"] += perf_counter() - t0
+
+        return wrapper
+
+    def as_dict(self) -> dict:
+        stages = {
+            name: {
+                key: round(value, 6) if key == "seconds" else value
+                for key, value in self.stages[name].items()
+            }
+            for name in STAGES
+            if name in self.stages
+        }
+        return {
+            "file": self.file,
+            "pages": self.pages,
+            "lines": self.lines,
+            "rows": self.rows,
+            "total_seconds": round(sum(s["seconds"] for s in stages.values()), 6),
+            "stages": stages,
+        }
+
+
+class CibParseProfiler:
+    """
+    Több fájl mérésének gyűjtője (a CibParseCache-hez hasonlóan a
+    parse_path / parse_files kapja meg). A fájlonkénti eredményt a
+    pigapp_app logger-be is kiírja.
+    """
+
+    def __init__(self):
+        self.files = {}
+
+    def add(self, pdf_path: str, profile: dict) -> None:
+        self.files[pdf_path] = profile
+        stages = " ".join(
+            f"{name}={stage['seconds']:.3f}s"
+            for name, stage in profile["stages"].items()
+        )
+        logger.info(
+            f"CIB parse {profile['file']}: {profile['pages']} oldal, "
+            f"{profile['lines']} sor, {profile['rows']} tranzakció, "
+            f"{profile['total_seconds']:.3f}s ({stages})"
+        )
+
+    def add_cached(self, pdf_path: str) -> None:
+        self.files[pdf_path] = {"file": os.path.basename(pdf_path), "cached": True}
+
+    def as_dict(self) -> dict:
+        return {profile["file"]: profile for profile in self.files.values()}
@@ -0,0 +1,244 @@
+# app_name/cib_query.py
+"""
+A /api/cib-parse/ válasz szűkítése query paraméterekkel:
+
+    summary_only=1          csak az összesítések, tranzakció listák nélkül
+    date_from / date_to     könyvelési dátum szűrés (YYYY-MM-DD, zárt
+                            intervallum)
+    category=food,transfer  kategória szűrés (vesszővel vagy ismételt
+                            paraméterrel)
+    page / limit            lapozás az all_transactions listán (kivonatonként)
+    stream=1                a válasz darabonként, StreamingHttpResponse-ban; a
+                            kivonatok egymás után, a kimenet írása közben
+                            kerülnek feldolgozásra (összevont összesítésnél
+                            csak a szerializálás darabolt)
+    consolidated=1          egyetlen összevont összesítés az összes kivonatból
+                            (duplikátum szűréssel, lásd CibConsolidatedSummary)
+
+Szűrésnél az összesítések (a transaction_count is) a szűrt sorokból
+újraszámolódnak; a balance_check a teljes kivonaté marad (a szűrt sorok
+egyenleg lánca nem folytonos), ahogy az összevont összesítés kivonatonkénti
+statisztikája (statements) és a duplicates_dropped is.
+"""
+
+import datetime
+import json
+
+import pandas as pd
+
+from .cib_cache import json_default
+from .cib_parser import CibStatementParser
+
+TRUE_VALUES = ("1", "true")
+
+# a szűrt sorokból nem újraszámolható kulcsok (változatlanul maradnak)
+UNFILTERED_KEYS = ("balance_check", "statements", "duplicates_dropped")
+
+
+class CibSummaryQuery:
+    DEFAULT_LIMIT = 100
+    MAX_LIMIT = 1000
+    STREAM_CHUNK_ROWS = 500
+
+    def __init__(
+        self,
+        summary_only: bool = False,
+        date_from: datetime.date = None,
+        date_to: datetime.date = None,
+        categories: tuple = (),
+        page: int = None,
+        limit: int = None,
+        stream: bool = False,
+        consolidated: bool = False,
+    ):
+        self.summary_only = summary_only
+        self.date_from = date_from
+        self.date_to = date_to
+        self.categories = tuple(categories)
+        self.page = page
+        self.limit = limit
+        self.stream = stream
+        self.consolidated = consolidated
+
+    @classmethod
+    def from_params(cls, params) -> "CibSummaryQuery":
+        """request.query_params -> query; hibás paraméternél ValueError."""
+
+        def parse_date(name):
+            value = params.get(name)
+            if not value:
+                return None
+            try:
+                return datetime.date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Hibás dátum formátum ({name}, YYYY-MM-DD).")
+
+        def parse_positive(name):
+            value = params.get(name)
+            if value in (None, ""):
+                return None
+            if not value.isdigit() or int(value) < 1:
+                raise ValueError(f"A(z) {name} pozitív egész szám kell legyen.")
+            return int(value)
+
+        categories = [
+            category.strip()
+            for value in params.getlist("category")
+            for category in value.split(",")
+            if category.strip()
+        ]
+
+        page = parse_positive("page")
+        limit = parse_positive("limit")
+        if limit is not None and limit > cls.MAX_LIMIT:
+            raise ValueError(f"A limit legfeljebb {cls.MAX_LIMIT} lehet.")
+        if limit is not None and page is None:
+            page = 1
+        if page is not None and limit is None:
+            limit = cls.DEFAULT_LIMIT
+
+        query = cls(
+            summary_only=params.get("summary_only") in TRUE_VALUES,
+            date_from=parse_date("date_from"),
+            date_to=parse_date("date_to"),
+            categories=categories,
+            page=page,
+            limit=limit,
+            stream=params.get("stream") in TRUE_VALUES,
+            consolidated=params.get("consolidated") in TRUE_VALUES,
+        )
+        if query.date_from and query.date_to and query.date_from > query.date_to:
+            raise ValueError("A date_from nem lehet későbbi, mint a date_to.")
+        return query
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.date_from or self.date_to or self.categories)
+
+    # ---- egy kivonat összesítése ----
+    def apply(self, summary: dict) -> dict:
+        """Egy parse_pdf summary szűrt / lapozott / rövidített másolata."""
+        if "error" in summary:
+            return summary
+
+        if self.filtered:
+            summary = self._filter(summary)
+        if self.summary_only:
+            return self._strip_rows(summary)
+        if self.page is not None:
+            return self._paginate(summary)
+        return summary
+
+    def apply_all(self, summary_dict: dict) -> dict:
+        """parse_path eredménye ({név: summary}) -> ugyanez, kivonatonként apply."""
+        return {name: self.apply(summary) for name, summary in summary_dict.items()}
+
+    def _filter(self, summary: dict) -> dict:
+        df = pd.DataFrame.from_records(summary["all_transactions"])
+        if df.empty:
+            return summary
+
+        # "2025.11.01." alakú dátumok: fix szélességűek, így szövegként is
+        # rendezhetők
+        date_format = CibStatementParser.DATE_FORMAT
+        dates = df[CibStatementParser.DATE_COLUMNS[0]]
+        mask = pd.Series(True, index=df.index)
+        if self.date_from:
+            mask &= dates >= self.date_from.strftime(date_format)
+        if self.date_to:
+            mask &= dates <= self.date_to.strftime(date_format)
+        if self.categories:
+            mask &= df["category"].isin(self.categories)
+
+        # típusos oszlopokkal, így a hiányzó összegek None-ként (nem NaN-ként)
+        # kerülnek vissza a JSON-ba, ahogy a szűretlen összesítésben
+        filtered = CibStatementParser.dataframe_to_summary(
+            CibStatementParser.apply_schema(df[mask].reset_index(drop=True))
+        )
+        for key in UNFILTERED_KEYS:
+            if key in summary:
+                filtered[key] = summary[key]
+            else:
+                filtered.pop(key, None)
+        if "transaction_count" in summary:
+            filtered["transaction_count"] = len(filtered["all_transactions"])
+        return filtered
+
+    @staticmethod
+    def _strip_rows(summary: dict) -> dict:
+        stripped = {
+            "transaction_count": len(summary["all_transactions"]),
+            "outgoing_by_iban": {
+                iban: {
+                    "partner": group["partner"],
+                    "total_amount": group["total_amount"],
+                    "transaction_count": len(group["transactions"]),
+                }
+                for iban, group in summary["outgoing_by_iban"].items()
+            },
+            "daily_spending": summary["daily_spending"],
+            "internal_transfers": {
+                "total": summary["internal_transfers"]["total"],
+                "transaction_count": len(summary["internal_transfers"]["transactions"]),
+            },
+            "category_totals": summary["category_totals"],
+            "category_sources": summary["category_sources"],
+        }
+        for key in UNFILTERED_KEYS:
+            if key in summary:
+                stripped[key] = summary[key]
+        return stripped
+
+    def _paginate(self, summary: dict) -> dict:
+        rows = summary["all_transactions"]
+        start = (self.page - 1) * self.limit
+        return {
+            **summary,
+            "all_transactions": rows[start : start + self.limit],
+            "pagination": {
+                "page": self.page,
+                "limit": self.limit,
+                "count": len(rows),
+                "pages": -(-len(rows) // self.limit),
+            },
+        }
+
+    # ---- streamelt JSON ----
+    def iter_json(self, summaries):
+        """
+        A válasz JSON darabokban: kivonatonként, az all_transactions listát
+        STREAM_CHUNK_ROWS soronként szerializálva, így a teljes válasz sosem
+        áll össze egyetlen stringként a memóriában.
+
+        summaries: {név: summary} dict vagy (név, summary) párok iterálója
+        (lásd CibStatementParser.iter_parse_path); utóbbinál a kivonatok
+        feldolgozása is a kimenet írásával együtt halad.
+        """
+        if isinstance(summaries, dict):
+            summaries = summaries.items()
+
+        def dumps(value):
+            return json.dumps(
+                value, ensure_ascii=False, separators=(",", ":"), default=json_default
+            )
+
+        yield "{"
+        for i, (name, summary) in enumerate(summaries):
+            yield f"{',' if i else ''}{dumps(name)}:"
+            rows = (
+                summary.get("all_transactions") if isinstance(summary, dict) else None
+            )
+            if rows is None:
+                yield dumps(summary)
+                continue
+
+            yield '{"all_transactions":['
+            for start in range(0, len(rows), self.STREAM_CHUNK_ROWS):
+                chunk = dumps(rows[start : start + self.STREAM_CHUNK_ROWS])[1:-1]
+                yield f"{',' if start else ''}{chunk}"
+            yield "]"
+            for key, value in summary.items():
+                if key != "all_transactions":
+                    yield f",{dumps(key)}:{dumps(value)}"
+            yield "}"
+        yield "}"
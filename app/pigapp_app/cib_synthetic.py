@@ -0,0 +1,263 @@
+# app_name/cib_synthetic.py
+"""
+Szintetikus, CIB formátumú számlakivonat PDF-ek (benchmarkhoz, teszthez).
+
+A generált PDF a valódi kivonatok elrendezését követi: oldalfejléc, a
+tranzakció tábla fejléce minden oldalon, tranzakciónként egy fő sor és a
+kártya / IBAN / számlaszám / közlemény kiegészítő sorok, a végén az
+"ÖSSZESEN FORGALOM" összesítő és egy tábla nélküli tájékoztató oldal. Külső
+függőség nélkül, közvetlenül PDF operátorokkal íródik (Helvetica, WinAnsi).
+"""
+
+import datetime
+import random
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+FONT_SIZE = 8
+LINE_HEIGHT = 9
+TABLE_BOTTOM = 770
+
+DATE_X = 17
+TEXT_X = 79
+AMOUNT_X = 430
+BALANCE_X = 510
+
+# a WinAnsi kódolásból hiányzó magyar betűk
+_WINANSI = str.maketrans({"ő": "ö", "Ő": "Ö", "ű": "ü", "Ű": "Ü"})
+
+CARD_MERCHANTS = [
+    ("5411", "BUDAPEST", "LIDL HU 316 Budape"),
+    ("5411", "BUDAPEST", "SPAR MAGYARORSZAG"),
+    ("5411", "BUDAPEST", "TESCO ARUHAZ"),
+    ("5462", "BUDAPEST", "SCH-BAKERY LIPOTI"),
+    ("5812", "Budapest", "Pizza Manufaktura"),
+    ("5814", "BUDAPEST", "MCDONALDS 0412"),
+    ("5541", "BUDAPEST", "MOL TOLTOALLOMAS"),
+    ("4121", "BUDAPEST", "BOLT TAXI"),
+    ("4899", "Los Gatos", "Netflix.com"),
+    ("5815", "Stockholm", "Spotify P3EE7715E4"),
+    ("5818", "CORK", "APPLE.COM/BILL"),
+    ("5310", "BUDAPEST", "DISZKONT-UZLET"),
+    ("5993", "BUDAPEST", "NEMZETI DOHANYBOLT"),
+    ("5912", "BUDAPEST", "ROSSMANN 112"),
+]
+PARTNERS = ["Papp Zsolt", "Papp Dániel", "Kiss Anna", "Nagy Péter", "Szabó Éva"]
+COMMENTS = ["törlesztés", "albérlet", "rezsi", "CIB Bank Zrt. hitel törlesztés"]
+
+
+def format_amount(value: float) -> str:
+    """-1500.0 -> "-1.500,00" (a kivonat formátuma)."""
+    text = f"{abs(value):,.2f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+    return f"-{text}" if value < 0 else text
+
+
+def synthetic_transactions(count: int, seed: int = 42) -> list:
+    """
+    count darab tranzakció blokk: (könyvelési dátum, értéknap, leírás, összeg,
+    egyenleg, kiegészítő sorok). A kiegészítő sor (értéknap, szöveg) pár; az
+    értéknap csak a blokk első kiegészítő sorában szerepel.
+    """
+    rng = random.Random(seed)
+    day = datetime.date(2026, 1, 1)
+    balance = 500_000.0
+
+    blocks = []
+    for i in range(count):
+        if rng.random() < 0.15:
+            day += datetime.timedelta(days=1)
+        booking = day.strftime("%Y.%m.%d.")
+        value_date = (day - datetime.timedelta(days=rng.randint(0, 2))).strftime(
+            "%Y.%m.%d."
+        )
+        ref = f"{rng.randrange(10**11):011d}"
+
+        kind = rng.random()
+        if kind < 0.55:
+            mcc, city, merchant = rng.choice(CARD_MERCHANTS)
+            amount = -float(rng.randint(300, 30_000))
+            description = f"BANKKÁRTYA TERHELÉS; AR1M{ref[:5]} 01"
+            card = (
+                f"4796 8501 0427 1257A{day.strftime('%Y%m%d')} "
+                f"{rng.randint(60000, 235959):06d}; {-amount:.2f} HUF"
+            )
+            follow = [card, f"{mcc} {ref[:6]}HU {city}; {merchant} {ref[5:]}"]
+        elif kind < 0.75:
+            amount = -float(rng.randint(1_000, 50_000))
+            description = f"Kimenő azonnali utalás; AZKIG{ref}"
+            iban = "HU{:02d} {} {} {} {} {} {}".format(
+                rng.randint(10, 99),
+                *(f"{rng.randrange(10**4):04d}" for _ in range(6)),
+            )
+            follow = [iban, rng.choice(PARTNERS)]
+        elif kind < 0.9:
+            incoming = rng.random() < 0.4
+            amount = float(rng.randint(5_000, 400_000))
+            if incoming:
+                description = f"Bejövő azonnali GIRO jóváírás; AZBII{ref}"
+                comment = "munkabér"
+            else:
+                amount = -amount / 10
+                description = f"Saját számlák közti rendsz. utalás; SPETRN{ref[:10]}"
+                comment = rng.choice(COMMENTS)
+            account = f"10701094-{rng.randrange(10**8):08d}-{rng.randrange(10**8):08d}"
+            follow = [account, rng.choice(PARTNERS).upper(), f"Közlemény: {comment}"]
+        else:
+            amount = -float(rng.randint(100, 1_000))
+            description = f"Jutalék; SNKFSE{ref[:10]}"
+            follow = ["TK-Megbízás mód./visszavonás díja; CONTKFSE0LAKSAG"]
+
+        balance += amount
+        blocks.append(
+            (
+                booking,
+                value_date,
+                description,
+                format_amount(amount),
+                format_amount(balance),
+                follow,
+            )
+        )
+
+    return blocks
+
+
+def statement_pages(blocks: list) -> list:
+    """Tranzakció blokkok -> oldalak; egy oldal (x, top, szöveg) elemek listája."""
+    period = "IDŐSZAK: {} - {}".format(blocks[0][0], blocks[-1][0]) if blocks else ""
+    pages = []
+
+    def new_page(first):
+        page = [
+            (448, 40, "SORSZÁM: 1"),
+            (448, 49, f"OLDALSZÁM: {len(pages) + 1}"),
+            (99, 44, "BANKSZÁMLA KIVONAT"),
+            (17, 52, "SZÁMLA: 0109 EN5UE0 511"),
+            (17, 60, period),
+        ]
+        top = 101
+        if first:
+            page += [
+                (99, 93, "ÜGYFÉLSZOLGÁLAT"),
+                (17, 102, "CIB24 azonosító: 65640841"),
+                (17, 146, "SZÁMLATULAJDONOS: PAPP ZSOLT"),
+                (17, 170, "DEVIZANEM: HUF"),
+                (17, 194, "IBAN SZÁM: HU68 1070 1094 6564 0841 5110 0005"),
+                (23, 284, "NYITÓ EGYENLEG: 500.000,00"),
+            ]
+            top = 303
+        page += [
+            (17, top, "KÖNYVELÉSI/"),
+            (120, top, "TRANZAKCIÓK"),
+            (AMOUNT_X, top, "TERHELÉSEK(-)/"),
+            (BALANCE_X, top, "EGYENLEG"),
+            (17, top + 10, "ÉRTÉKNAP"),
+            (AMOUNT_X, top + 10, "JÓVÁÍRÁSOK"),
+        ]
+        pages.append(page)
+        return top + 29
+
+    top = new_page(True)
+    for booking, value_date, description, amount, balance, follow in blocks:
+        rows = [
+            [
+                (DATE_X, booking),
+                (TEXT_X, description),
+                (AMOUNT_X, amount),
+                (BALANCE_X, balance),
+            ]
+        ]
+        for i, text in enumerate(follow):
+            row = [(TEXT_X, text)]
+            if i == 0:
+                row.insert(0, (DATE_X, value_date))
+            rows.append(row)
+
+        # a kiegészítő sorok a következő oldalon is folytatódhatnak
+        for row in rows:
+            if top > TABLE_BOTTOM:
+                top = new_page(False)
+            pages[-1].extend((x, top, text) for x, text in row)
+            top += LINE_HEIGHT
+        top += LINE_HEIGHT
+
+    if top > TABLE_BOTTOM - 3 * LINE_HEIGHT:
+        top = new_page(False)
+    pages[-1] += [
+        (23, top + 16, "ÖSSZESEN FORGALOM TERHELÉS:"),
+        (343, top + 33, "ZÁRÓ EGYENLEG:"),
+        (BALANCE_X, top + 33, blocks[-1][4] if blocks else "0,00"),
+    ]
+
+    # tábla nélküli tájékoztató oldal (a triage ezt kihagyja)
+    pages.append(
+        [
+            (17, 189 + i * 8, "Tisztelt Ügyfelünk! Tájékoztatjuk, hogy ...")
+            for i in range(20)
+        ]
+    )
+    return pages
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.translate(_WINANSI).encode("cp1252", errors="replace")
+    return (
+        b"("
+        + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+        + b")"
+    )
+
+
+def render_pdf(pages: list) -> bytes:
+    """(x, top, szöveg) elemekből álló oldalak -> PDF fájl tartalma."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # oldalfa, az oldalak után töltjük ki
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for items in pages:
+        content = b"".join(
+            b"BT /F1 %d Tf 1 0 0 1 %.2f %.2f Tm %s Tj ET\n"
+            % (FONT_SIZE, x, PAGE_HEIGHT - top - FONT_SIZE, _pdf_string(text))
+            for x, top, text in items
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids),
+        len(page_ids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def write_statement_pdf(path: str, count: int, seed: int = 42) -> int:
+    """count tranzakciós szintetikus kivonat a path fájlba.
+
+    Az elkészült kivonat oldalszámával tér vissza.
+    """
+    pages = statement_pages(synthetic_transactions(count, seed))
+    with open(path, "wb") as f:
+        f.write(render_pdf(pages))
+    return len(pages)
@@ -0,0 +1,120 @@
+# app_name/cib_text_cache.py
+import gzip
+import json
+import logging
+import os
+
+from .cib_cache import atomic_write, file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+class CibPageTextCache:
+    """
+    Lemezen tárolt cache a PDF oldalak normalizált szövegsoraihoz, a parse
+    eredmény cache-től (CibParseCache) függetlenül.
+
+    A kulcs a PDF tartalmának SHA-256 hash-e + a szövegkinyerő backend
+    verziója (cache_tag) + az oldalszám; a parser verzió és a kategória
+    táblák nem részei, így egy regex / kulcsszó módosítás után a kivonatok
+    újrafeldolgozása szövegkinyerés (pdfplumber) nélkül, a cache-elt sorokból
+    fut. Oldalanként egy gzip tömörített JSON fájl, dokumentumonként egy
+    könyvtárban; a dokumentum oldalszáma a pages.json-ban.
+    """
+
+    # növelni kell, ha a tárolt sorok formátuma (normalizálás) változik
+    VERSION = "1"
+    PAGES_FILE = "pages.json"
+
+    def __init__(self, cache_dir):
+        self.cache_dir = str(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def document_dir(self, sha256: str, extractor) -> str:
+        return os.path.join(
+            self.cache_dir, f"{sha256}-{extractor.cache_tag}-{self.VERSION}"
+        )
+
+    def _page_path(self, doc_dir: str, page: int) -> str:
+        return os.path.join(doc_dir, f"{page:05d}.json.gz")
+
+    # ---- oldalszám ----
+    def _read_page_count(self, doc_dir: str):
+        try:
+            with open(os.path.join(doc_dir, self.PAGES_FILE), "r") as f:
+                return json.load(f)["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_page_count(self, doc_dir: str, page_count: int) -> None:
+        self._write(
+            os.path.join(doc_dir, self.PAGES_FILE),
+            json.dumps({"pages": page_count}).encode("utf-8"),
+        )
+
+    # ---- oldalak ----
+    def get_page(self, doc_dir: str, page: int):
+        try:
+            with gzip.open(self._page_path(doc_dir, page), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def set_page(self, doc_dir: str, page: int, lines: list) -> None:
+        raw = json.dumps(lines, ensure_ascii=False).encode("utf-8")
+        self._write(self._page_path(doc_dir, page), gzip.compress(raw))
+
+    def _write(self, path: str, data: bytes) -> None:
+        try:
+            with atomic_write(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"CIB oldal szöveg cache írás sikertelen ({path}): {e}")
+
+    def iter_page_lines(
+        self,
+        parser,
+        pdf_path: str,
+        start: int = 0,
+        stop: int = None,
+        sha256: str = None,
+    ):
+        """
+        A [start, stop) oldalak normalizált sorai (mint a
+        parser.iter_page_lines): a cache-elt oldalak lemezről, az első
+        hiányzó oldaltól kezdve a szövegkinyerőből (és a cache-be írva).
+
+        sha256: a PDF hívó által már kiszámolt tartalom hash-e (pl. a parse
+        cache kulcsából); ha nincs megadva, itt kerül kiszámolásra.
+        """
+        extractor = parser.extractor
+        doc_dir = self.document_dir(sha256 or file_sha256(pdf_path), extractor)
+
+        if stop is None:
+            stop = self._read_page_count(doc_dir)
+            if stop is None:
+                stop = extractor.page_count(pdf_path)
+                self._write_page_count(doc_dir, stop)
+
+        page = start
+        while page < stop:
+            lines = self.get_page(doc_dir, page)
+            if lines is None:
+                break
+            self.hits += 1
+            yield lines
+            page += 1
+
+        if page >= stop:
+            return
+
+        for raw_lines in extractor.iter_page_lines(pdf_path, page, stop):
+            lines = parser.normalize_lines(raw_lines)
+            self.misses += 1
+            self.set_page(doc_dir, page, lines)
+            yield lines
+            page += 1
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,99 @@
+# app_name/keyword_matcher.py
+import re
+from collections import defaultdict
+
+
+class KeywordMatcher:
+    """
+    Kulcsszó tábla -> egyetlen, trie alakú regex.
+
+    Egy finditer menetben megtalálja a szövegben előforduló összes kulcsszót
+    (átfedőket is), így a kategóriánkénti pontszám nem függ attól, hogy hány
+    kulcsszó van a táblában. Az eredmény megegyezik a `kw in text` alapú,
+    kulcsszavanként egyszer számolt pontozással.
+    """
+
+    def __init__(self, category_keywords: dict):
+        self.categories = list(category_keywords)
+
+        # kulcsszó -> kategóriák (ismétléssel, ha egy kategóriában többször
+        # szerepel)
+        self.keyword_categories = defaultdict(list)
+        self.always = defaultdict(int)  # üres kulcsszó: `"" in text` mindig igaz
+        for cat, keywords in category_keywords.items():
+            for kw in keywords:
+                if kw:
+                    self.keyword_categories[kw].append(cat)
+                else:
+                    self.always[cat] += 1
+
+        # Egy pozíción a leghosszabb találatot adja a regex; az ugyanott induló
+        # rövidebb kulcsszavak mind ennek prefixei, ezeket előre kiszámoljuk.
+        keywords = list(self.keyword_categories)
+        self.prefixes = {
+            kw: [other for other in keywords if kw.startswith(other)] for kw in keywords
+        }
+
+        self.pattern = None
+        if keywords:
+            self.pattern = re.compile(f"(?=({self._trie_regex(keywords)}))")
+
+    @classmethod
+    def _trie_regex(cls, keywords: list) -> str:
+        trie = {}
+        for kw in keywords:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        return cls._node_regex(trie)
+
+    @classmethod
+    def _node_regex(cls, node: dict) -> str:
+        # mohó alternatívák: a hosszabb folytatás előbb próbálkozik
+        branches = [
+            re.escape(ch) + cls._node_regex(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not branches:
+            return ""
+
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    def find(self, text: str) -> set:
+        """A szövegben előforduló összes (különböző) kulcsszó."""
+        found = set()
+        if self.pattern is None:
+            return found
+
+        for m in self.pattern.finditer(text):
+            kw = m.group(1)
+            if kw not in found:
+                found.update(self.prefixes[kw])
+
+        return found
+
+    def scores(self, text: str) -> dict:
+        scores = defaultdict(int, self.always)
+        for kw in self.find(text):
+            for cat in self.keyword_categories[kw]:
+                scores[cat] += 1
+        return scores
+
+    def best_category(self, text: str, default: str = "other") -> str:
+        """Legnagyobb pontszámú kategória; egyezésnél a tábla sorrendje dönt."""
+        scores = self.scores(text)
+
+        best_cat = default
+        best_score = 0
+        for cat in self.categories:
+            score = scores.get(cat, 0)
+            if score > best_score:
+                best_score = score
+                best_cat = cat
+
+        return best_cat
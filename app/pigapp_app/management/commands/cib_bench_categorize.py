@@ -0,0 +1,89 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from pigapp_app.cib_parser import CibStatementParser
+
+
+def naive_categorize(category_keywords: dict, text: str) -> str:
+    """
+    A korábbi, kulcsszavanként `kw in text` alapú kategorizálás
+    (összehasonlításhoz).
+    """
+    best_cat = "other"
+    best_score = 0
+    for cat, keywords in category_keywords.items():
+        score = sum(1 for kw in keywords if kw in text)
+        if score > best_score:
+            best_score = score
+            best_cat = cat
+    return best_cat
+
+
+class Command(BaseCommand):
+    help = (
+        "CibStatementParser.categorize benchmark: tranzakciónkénti költség "
+        "a kulcsszó tábla méretének függvényében."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="60,300,1000,3000",
+            help="Kulcsszavak száma összesen, vesszővel elválasztva.",
+        )
+        parser.add_argument("--transactions", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        sizes = [int(x) for x in options["sizes"].split(",") if x]
+        base = CibStatementParser.CATEGORY_KEYWORDS
+
+        texts = [
+            self._transaction_text(rng, base) for _ in range(options["transactions"])
+        ]
+
+        self.stdout.write(
+            f"{'keywords':>10} {'naive µs/tx':>14} {'compiled µs/tx':>16}"
+        )
+        for size in sizes:
+            table = self._keyword_table(rng, base, size)
+            parser = CibStatementParser(category_keywords=table)
+            parser.keyword_matcher  # a felépítés nem része a mérésnek
+
+            t0 = time.perf_counter()
+            naive = [naive_categorize(table, t) for t in texts]
+            t1 = time.perf_counter()
+            compiled = [parser.keyword_matcher.best_category(t) for t in texts]
+            t2 = time.perf_counter()
+
+            if naive != compiled:
+                self.stderr.write(f"Eltérő eredmény {size} kulcsszónál!")
+
+            n = len(texts)
+            self.stdout.write(
+                f"{size:>10} {(t1 - t0) / n * 1e6:>14.1f} {(t2 - t1) / n * 1e6:>16.1f}"
+            )
+
+    @staticmethod
+    def _random_word(rng, length):
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+    def _keyword_table(self, rng, base: dict, size: int) -> dict:
+        """Az alap tábla kiegészítve véletlen "kereskedő" nevekkel size darabig."""
+        table = {cat: list(kws) for cat, kws in base.items()}
+        cats = [c for c in table if c != "other"]
+        count = sum(len(kws) for kws in table.values())
+        while count < size:
+            table[rng.choice(cats)].append(self._random_word(rng, rng.randint(4, 12)))
+            count += 1
+        return table
+
+    def _transaction_text(self, rng, base: dict) -> str:
+        words = [self._random_word(rng, rng.randint(3, 10)) for _ in range(12)]
+        keyword = rng.choice([kw for kws in base.values() for kw in kws])
+        words.insert(rng.randint(0, len(words)), keyword)
+        return " ".join(words)
@@ -0,0 +1,104 @@
+import datetime
+import json
+import os
+import platform
+import tempfile
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from pigapp_app.cib_parser import CibStatementParser
+from pigapp_app.cib_profile import STAGES, CibParseProfile
+from pigapp_app.cib_synthetic import write_statement_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "CibStatementParser benchmark szintetikus CIB kivonatokon: "
+        "szakaszonkénti idő (szövegkinyerés, regex, kategorizálás, DataFrame, "
+        "összesítő) JSON-ban, a verziók közti regressziók követéséhez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10,100,1000,10000",
+            help="Tranzakciók száma kivonatonként, vesszővel elválasztva.",
+        )
+        parser.add_argument("--repeat", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--extractor",
+            default=CibStatementParser.DEFAULT_EXTRACTOR,
+            help="Szövegkinyerő backend (pdfplumber, pdfminer, pdfium).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Az eredmény JSON fájl; alapértelmezés: standard kimenet.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(x) for x in options["sizes"].split(",") if x]
+        parser = CibStatementParser(extractor=options["extractor"])
+
+        report = {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "parser_version": parser.PARSER_VERSION,
+            "extractor": parser.extractor.cache_tag,
+            "keyword_table_version": parser.keyword_table_version(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "results": [],
+        }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in sizes:
+                pdf_path = os.path.join(tmp, f"synthetic_{size}.pdf")
+                pages = write_statement_pdf(pdf_path, size, seed=options["seed"])
+
+                runs = [
+                    self.run_stages(parser, pdf_path) for _ in range(options["repeat"])
+                ]
+                result = {
+                    "transactions": size,
+                    "pages": pages,
+                    "file_bytes": os.path.getsize(pdf_path),
+                    "lines": runs[0]["lines"],
+                    "rows": runs[0]["rows"],
+                    # szakaszonként a legjobb futás
+                    "stages": {
+                        stage: min(run["stages"][stage]["seconds"] for run in runs)
+                        for stage in STAGES
+                    },
+                }
+                result["total"] = round(sum(result["stages"].values()), 6)
+                result["process_peak_rss_kb"] = runs[-1]["stages"]["summary"].get(
+                    "process_peak_rss_kb"
+                )
+                result["us_per_transaction"] = round(result["total"] / size * 1e6, 1)
+                report["results"].append(result)
+
+                if result["rows"] != size:
+                    self.stderr.write(
+                        f"{size} tranzakcióból {result['rows']} sort "
+                        "ismert fel a parser!"
+                    )
+                self.stderr.write(
+                    f"{size:>6} tx {pages:>4} oldal  "
+                    + "  ".join(f"{s}={result['stages'][s]:.3f}s" for s in STAGES)
+                )
+
+        blob = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(blob + "\n")
+        else:
+            self.stdout.write(blob)
+
+    @staticmethod
+    def run_stages(parser: CibStatementParser, pdf_path: str) -> dict:
+        """Egy mért parse_pdf futás (lásd CibParseProfile)."""
+        profile = CibParseProfile(pdf_path)
+        parser.keyword_matcher  # a matcher felépítése nem része a mérésnek
+        parser.parse_pdf(pdf_path, profile=profile)
+        return profile.as_dict()
@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from pigapp_app.cib_parser import CibStatementParser, CibTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "CibStatementParser.dataframe_to_summary benchmark szintetikus "
+        "tranzakciókon (idő / tranzakció a méret függvényében)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,100000",
+            help="Tranzakciók száma, vesszővel elválasztva.",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        sizes = [int(x) for x in options["sizes"].split(",") if x]
+
+        self.stdout.write(f"{'rows':>10} {'best ms':>10} {'µs/row':>8}")
+        for size in sizes:
+            df = self.synthetic_dataframe(rng, size)
+
+            best = None
+            for _ in range(options["repeat"]):
+                t0 = time.perf_counter()
+                CibStatementParser.dataframe_to_summary(df)
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+
+            self.stdout.write(
+                f"{size:>10} {best * 1e3:>10.1f} {best / size * 1e6:>8.2f}"
+            )
+
+    @staticmethod
+    def synthetic_dataframe(rng, size: int) -> pd.DataFrame:
+        descriptions = np.array(
+            [
+                "Kimenő azonnali utalás; AZKIG30919367821",
+                "Saját számlák közti rendsz. utalás; SPETRN0022881287",
+                "BANKKÁRTYA TERHELÉS; AR1MBVMSC 01",
+                "Bejövő azonnali GIRO jóváírás; AZBII30084177076",
+                "Jutalék; SNKFSE0000428796",
+            ]
+        )
+        ibans = np.array(
+            [f"HU{10 + i} 1040 4089 8676 5051 5788 {1000 + i}" for i in range(200)]
+        )
+        categories = np.array(list(CibStatementParser.CATEGORY_KEYWORDS))
+        days = pd.date_range("2020-01-01", periods=2000, freq="D").strftime("%Y.%m.%d.")
+
+        desc_idx = rng.integers(0, len(descriptions), size)
+        amounts = np.round(rng.uniform(-50_000, 50_000, size), 2)
+
+        data = {
+            field: np.full(size, "", dtype=object) for field in CibTransaction._fields
+        }
+        data.update(
+            {
+                "konyvelesi_datum": np.sort(rng.choice(days, size)),
+                "leiras": descriptions[desc_idx],
+                "osszeg": amounts,
+                "egyenleg": np.round(np.cumsum(amounts), 2),
+                "iban": np.where(desc_idx == 0, rng.choice(ibans, size), ""),
+                "partner": np.where(desc_idx == 0, "Papp Zsolt", ""),
+                "category": rng.choice(categories, size),
+                "card_original_amount": np.full(size, None, dtype=object),
+            }
+        )
+        df = pd.DataFrame(data, columns=CibTransaction._fields)
+        return CibStatementParser.apply_schema(df)
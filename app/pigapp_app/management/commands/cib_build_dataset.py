@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pigapp_app.cib_dataset import CibStatementDataset
+from pigapp_app.cib_parser import CibStatementParser
+
+
+class Command(BaseCommand):
+    help = (
+        "CIB kivonatok (PDF vagy mappa) feldolgozása oszlopos Parquet "
+        "datasetbe; csak az új vagy módosult kivonatok kerülnek parse-olásra."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=str(settings.PDF_UPLOAD_DIR))
+        parser.add_argument("--dataset", default=settings.CIB_DATASET_DIR)
+        parser.add_argument("--workers", type=int, default=settings.CIB_PARSE_WORKERS)
+
+    def handle(self, *args, **options):
+        dataset = CibStatementDataset(options["dataset"])
+        parser = CibStatementParser(text_cache=settings.CIB_PAGE_TEXT_CACHE_DIR)
+        stats = dataset.update(
+            options["path"], parser=parser, workers=options["workers"]
+        )
+
+        self.stdout.write(
+            f"írt: {len(stats['written'])}, változatlan: {stats['unchanged']}, "
+            f"törölt: {len(stats['removed'])}, kivonatok: {len(dataset.entries)}"
+        )
+        for pdf_path, error in stats["failed"].items():
+            self.stderr.write(f"HIBA {pdf_path}: {error}")
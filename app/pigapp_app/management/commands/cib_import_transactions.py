@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from pigapp_app.cib_cache import CibParseCache
+from pigapp_app.cib_parser import CibStatementParser
+from pigapp_app.models import BankTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "CIB kivonatok (PDF vagy mappa) tranzakcióinak betöltése a "
+        "BankTransaction táblába egy felhasználóhoz; a duplikátumok kimaradnak."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="A felhasználó email címe.")
+        parser.add_argument("--path", default=str(settings.PDF_UPLOAD_DIR))
+        parser.add_argument("--workers", type=int, default=settings.CIB_PARSE_WORKERS)
+        parser.add_argument(
+            "--page-workers", type=int, default=settings.CIB_PAGE_WORKERS
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Nincs ilyen felhasználó: {options['email']}")
+
+        parser = CibStatementParser(
+            category_memo=settings.CIB_CATEGORY_MEMO,
+            text_cache=settings.CIB_PAGE_TEXT_CACHE_DIR,
+        )
+        parsed = parser.parse_path(
+            options["path"],
+            workers=options["workers"],
+            cache=CibParseCache(settings.CIB_PARSE_CACHE_DIR),
+            page_workers=options["page_workers"],
+        )
+
+        for name, summary in parsed.items():
+            if "error" in summary:
+                self.stderr.write(f"HIBA {name}: {summary['error']}")
+                continue
+            created = BankTransaction.objects.create_from_summary(
+                user, summary, source_file=name
+            )
+            self.stdout.write(
+                f"{name}: {len(summary['all_transactions'])} sor, {created} új"
+            )
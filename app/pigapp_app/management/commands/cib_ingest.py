@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pigapp_app.cib_cache import CibParseCache
+from pigapp_app.cib_ingest import CibIngestManifest, ingest_folder
+from pigapp_app.cib_parser import CibStatementParser
+
+
+class Command(BaseCommand):
+    help = (
+        "A pdf_uploads könyvtár inkrementális feldolgozása: csak az új vagy "
+        "módosult CIB kivonatok kerülnek parse-olásra (cron-ból is futtatható)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--folder", default=str(settings.PDF_UPLOAD_DIR))
+        parser.add_argument("--workers", type=int, default=settings.CIB_PARSE_WORKERS)
+        parser.add_argument(
+            "--page-workers", type=int, default=settings.CIB_PAGE_WORKERS
+        )
+
+    def handle(self, *args, **options):
+        stats = ingest_folder(
+            options["folder"],
+            cache=CibParseCache(settings.CIB_PARSE_CACHE_DIR),
+            manifest=CibIngestManifest(settings.CIB_INGEST_MANIFEST),
+            parser=CibStatementParser(
+                category_memo=settings.CIB_CATEGORY_MEMO,
+                text_cache=settings.CIB_PAGE_TEXT_CACHE_DIR,
+            ),
+            workers=options["workers"],
+            page_workers=options["page_workers"],
+        )
+
+        self.stdout.write(
+            f"új: {len(stats['new'])}, módosult: {len(stats['changed'])}, "
+            f"változatlan: {stats['unchanged']}, törölt: {len(stats['removed'])}"
+        )
+        for pdf_path, error in stats["failed"].items():
+            self.stderr.write(f"HIBA {pdf_path}: {error}")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from pigapp_app.cib_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Feltöltött CIB kivonatok háttérben történő feldolgozása (job worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Ennyi másodpercet vár, ha nincs feldolgozandó job.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="A várakozó jobok feldolgozása után kilép.",
+        )
+
+    def handle(self, *args, **options):
+        run_worker(poll_interval=options["poll_interval"], once=options["once"])
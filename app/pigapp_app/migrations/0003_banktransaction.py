@@ -0,0 +1,93 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pigapp_app', '0002_cibparsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankTransaction',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('booking_date', models.DateField()),
+                ('description', models.CharField(max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('category', models.CharField(default='other', max_length=50)),
+                ('partner', models.CharField(blank=True, default='', max_length=255)),
+                ('iban', models.CharField(blank=True, default='', max_length=64)),
+                (
+                    'account_number',
+                    models.CharField(blank=True, default='', max_length=64),
+                ),
+                (
+                    'other_party_name',
+                    models.CharField(blank=True, default='', max_length=255),
+                ),
+                ('comment', models.CharField(blank=True, default='', max_length=255)),
+                (
+                    'card_masked',
+                    models.CharField(blank=True, default='', max_length=32),
+                ),
+                ('card_tx_date', models.DateField(blank=True, null=True)),
+                (
+                    'card_original_amount',
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=14, null=True
+                    ),
+                ),
+                (
+                    'card_currency',
+                    models.CharField(blank=True, default='', max_length=3),
+                ),
+                ('mcc', models.CharField(blank=True, default='', max_length=4)),
+                ('card_city', models.CharField(blank=True, default='', max_length=255)),
+                (
+                    'card_merchant',
+                    models.CharField(blank=True, default='', max_length=255),
+                ),
+                (
+                    'source_file',
+                    models.CharField(blank=True, default='', max_length=255),
+                ),
+                ('create_transaction_date', models.DateTimeField(auto_now_add=True)),
+                (
+                    'user',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['user', 'booking_date'], name='banktx_user_date_idx'
+                    ),
+                    models.Index(
+                        fields=['user', 'category'], name='banktx_user_cat_idx'
+                    ),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=(
+                            'user',
+                            'booking_date',
+                            'amount',
+                            'balance',
+                            'description',
+                        ),
+                        name='uniq_bank_transaction_natural_key',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,9 +1,10 @@
-from datetime import date
+from datetime import date, datetime
+from decimal import Decimal
 
 from django.conf import settings
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin, User)
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Sum
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -418,3 +419,160 @@ class CostSum(Cost):
     def show_sum_amount(self, obj):
         result = Cost.objects.aggregate(Sum("amount"))
         return result["amount__sum"]
+
+
+class CibParseJob(models.Model):
+    """Feltöltött CIB kivonat háttérben futó feldolgozása.
+
+    A feltöltés csak elmenti a PDF-et és létrehoz egy "pending" jobot, a
+    feldolgozást a cib_parse_worker management command végzi.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    file_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True
+    )
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, default="")
+    create_job_date = models.DateTimeField(auto_now_add=True)
+    started_date = models.DateTimeField(blank=True, null=True)
+    finished_date = models.DateTimeField(blank=True, null=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True
+    )
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+
+class BankTransactionManager(models.Manager):
+    def create_from_summary(self, user, summary: dict, source_file: str = "") -> int:
+        """
+        A CibStatementParser összesítés all_transactions listájának mentése.
+        A már tárolt tranzakciók (ugyanaz a természetes kulcs) kimaradnak; a
+        ténylegesen létrehozott sorok számával tér vissza. (ignore_conflicts
+        mellett a bulk_create a kihagyott objektumokat is visszaadja, ezért a
+        felhasználó sorainak száma előtte / utána alapján.)
+        """
+        char_fields = [
+            (field.attname, field.max_length)
+            for field in self.model._meta.concrete_fields
+            if isinstance(field, models.CharField) and field.max_length
+        ]
+        objs = [
+            self._truncate(self._from_record(user, record, source_file), char_fields)
+            for record in summary.get("all_transactions", [])
+        ]
+        stored = self.filter(user=user)
+        with transaction.atomic():
+            before = stored.count()
+            self.bulk_create(objs, batch_size=1000, ignore_conflicts=True)
+            return stored.count() - before
+
+    def _from_record(self, user, record: dict, source_file: str):
+        card_tx_date = record.get("card_tx_date") or None
+        return self.model(
+            user=user,
+            booking_date=datetime.strptime(
+                record["konyvelesi_datum"], "%Y.%m.%d."
+            ).date(),
+            description=record.get("leiras") or "",
+            amount=self._decimal(record.get("osszeg")),
+            balance=self._decimal(record.get("egyenleg")),
+            category=record.get("category") or "other",
+            partner=record.get("partner") or "",
+            iban=record.get("iban") or "",
+            account_number=record.get("account_number") or "",
+            other_party_name=record.get("other_party_name") or "",
+            comment=record.get("comment") or "",
+            card_masked=record.get("card_masked") or "",
+            card_tx_date=card_tx_date,
+            card_original_amount=self._decimal(record.get("card_original_amount")),
+            card_currency=record.get("card_currency") or "",
+            mcc=record.get("mcc") or "",
+            card_city=record.get("card_city") or "",
+            card_merchant=record.get("card_merchant") or "",
+            source_file=source_file,
+        )
+
+    @staticmethod
+    def _truncate(obj, char_fields: list):
+        """
+        A hosszú (pl. több sorból összefűzött) szövegek az oszlop hosszára
+        vágva; Postgres-en a túl hosszú érték DataError-t okozna.
+        """
+        for name, max_length in char_fields:
+            value = getattr(obj, name)
+            if len(value) > max_length:
+                setattr(obj, name, value[:max_length])
+        return obj
+
+    @staticmethod
+    def _decimal(value):
+        if value is None or value != value:  # None / NaN
+            return None
+        return Decimal(str(round(float(value), 2)))
+
+
+class BankTransaction(models.Model):
+    """Feldolgozott CIB bankszámla tranzakció.
+
+    Természetes kulcs: (user, könyvelési dátum, összeg, egyenleg, leírás), így
+    ugyanaz a kivonat többszöri betöltése nem duplikál.
+    """
+
+    id = models.AutoField(primary_key=True)
+    booking_date = models.DateField()
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+    category = models.CharField(max_length=50, default="other")
+    partner = models.CharField(max_length=255, blank=True, default="")
+    iban = models.CharField(max_length=64, blank=True, default="")
+    account_number = models.CharField(max_length=64, blank=True, default="")
+    other_party_name = models.CharField(max_length=255, blank=True, default="")
+    comment = models.CharField(max_length=255, blank=True, default="")
+    card_masked = models.CharField(max_length=32, blank=True, default="")
+    card_tx_date = models.DateField(blank=True, null=True)
+    card_original_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, blank=True, null=True
+    )
+    card_currency = models.CharField(max_length=3, blank=True, default="")
+    mcc = models.CharField(max_length=4, blank=True, default="")
+    card_city = models.CharField(max_length=255, blank=True, default="")
+    card_merchant = models.CharField(max_length=255, blank=True, default="")
+    source_file = models.CharField(max_length=255, blank=True, default="")
+    create_transaction_date = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True
+    )
+
+    objects = BankTransactionManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "booking_date", "amount", "balance", "description"],
+                name="uniq_bank_transaction_natural_key",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "booking_date"], name="banktx_user_date_idx"),
+            models.Index(fields=["user", "category"], name="banktx_user_cat_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.booking_date} {self.description[:30]} {self.amount}"
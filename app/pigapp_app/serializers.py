@@ -1,8 +1,8 @@
 from django.contrib.auth import authenticate, get_user_model
 from django.db.models import Sum
 from django.utils.translation import gettext as _
-from pigapp_app.models import (CashFlow, CashFlowGroup, Cost, CostGroup,
-                               CostRepeat, Dev, Invoice)
+from pigapp_app.models import (CashFlow, CashFlowGroup, CibParseJob, Cost,
+                               CostGroup, CostRepeat, Dev, Invoice)
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
@@ -420,3 +420,19 @@ class AuthTokenSerializer(serializers.Serializer):
         return attrs
         attrs["user"] = user
         return attrs
+
+
+class CibParseJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CibParseJob
+        fields = (
+            "id",
+            "file_name",
+            "status",
+            "error",
+            "create_job_date",
+            "started_date",
+            "finished_date",
+            "result",
+        )
+        read_only_fields = fields
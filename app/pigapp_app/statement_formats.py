@@ -0,0 +1,80 @@
+# app_name/statement_formats.py
+"""
+Bankszámlakivonat formátum felismerés (sniffing) a drága feldolgozás előtt.
+
+Csak a PDF metaadatait és szükség esetén az első oldal szövegét olvassa
+(pypdfium2, néhány ms), így a nem támogatott dokumentumok azonnal
+elutasíthatók. Új bank formátum egy StatementFormat alosztállyal és a
+@register_format dekorátorral vehető fel.
+"""
+
+import re
+
+STATEMENT_FORMATS = {}
+
+
+class UnsupportedStatementFormat(ValueError):
+    """A PDF nem a parser által kezelt kivonat formátum."""
+
+
+def register_format(cls):
+    """Formátum felvétele a registry-be (osztály dekorátor)."""
+    STATEMENT_FORMATS[cls.name] = cls()
+    return cls
+
+
+class StatementFormat:
+    """Formátum felismerő interfész; elég az egyik metódust felülírni."""
+
+    name = ""
+
+    def match_metadata(self, metadata: dict) -> bool:
+        return False
+
+    def match_text(self, first_page_text: str) -> bool:
+        return False
+
+
+@register_format
+class CibStatementFormat(StatementFormat):
+    name = "cib"
+
+    # a CIB kivonatgenerátor spool útvonala a Title mezőben
+    TITLE_RE = re.compile(r"CIB_FLC")
+    TEXT_RES = (
+        re.compile(r"BANKSZÁMLA\s*KIVONAT"),
+        re.compile(r"\bCIB(?:24|\s*Bank)"),
+    )
+
+    def match_metadata(self, metadata: dict) -> bool:
+        return bool(self.TITLE_RE.search(metadata.get("Title") or ""))
+
+    def match_text(self, first_page_text: str) -> bool:
+        return all(regex.search(first_page_text) for regex in self.TEXT_RES)
+
+
+def sniff_format(pdf_path: str):
+    """A felismert formátum neve, vagy None, ha egyik sem illeszkedik."""
+    import pypdfium2 as pdfium
+
+    doc = pdfium.PdfDocument(pdf_path)
+    try:
+        metadata = doc.get_metadata_dict()
+        for name, fmt in STATEMENT_FORMATS.items():
+            if fmt.match_metadata(metadata):
+                return name
+
+        if len(doc) == 0:
+            return None
+        page = doc[0]
+        textpage = page.get_textpage()
+        text = textpage.get_text_range()
+        textpage.close()
+        page.close()
+    finally:
+        doc.close()
+
+    for name, fmt in STATEMENT_FORMATS.items():
+        if fmt.match_text(text):
+            return name
+    return None
@@ -1,2 +1,1576 @@
+import json
+import os
+import random
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+import numpy as np
+import pandas as pd
+from rest_framework.test import APIClient
+
+from .cib_cache import CibParseCache, atomic_write, file_sha256, json_default
+from .cib_category_memo import CibCategoryMemo
+from .cib_consolidated import CibConsolidatedSummary
+from .cib_dataset import CibStatementDataset
+from .cib_extractors import EXTRACTORS, TABLE_MARGIN, get_extractor, table_region
+from .cib_ingest import CibIngestManifest, ingest_folder
+from .cib_jobs import claim_next_job, job_upload_dir, run_job
+from .cib_parser import LINE_MAIN, CibStatementParser, CibTransaction
+from .cib_profile import STAGES, CibParseProfiler
+from .cib_query import CibSummaryQuery
+from .cib_synthetic import render_pdf, synthetic_transactions, write_statement_pdf
+from .keyword_matcher import KeywordMatcher
+from .management.commands.cib_bench_categorize import naive_categorize
+from .management.commands.cib_bench_summary import Command as BenchSummaryCommand
+from .models import BankTransaction, CibParseJob
+from .statement_formats import sniff_format
+
+SAMPLE_DIR = settings.BASE_DIR / "pdf_uploads"
+
+
+def sample_pdfs():
+    if not SAMPLE_DIR.is_dir():
+        return []
+    return sorted(
+        str(SAMPLE_DIR / f)
+        for f in os.listdir(SAMPLE_DIR)
+        if f.lower().endswith(".pdf")
+    )
+
+
+class CibExtractorConformanceTest(SimpleTestCase):
+    """Minden szövegkinyerő backend ugyanazokat a tranzakciókat adja."""
+
+    def test_backends_yield_identical_transactions(self):
+        pdfs = sample_pdfs()
+        if not pdfs:
+            self.skipTest("Nincs minta PDF a pdf_uploads könyvtárban.")
+
+        reference = CibStatementParser(extractor="pdfplumber")
+        parsers = {name: CibStatementParser(extractor=name) for name in EXTRACTORS}
+        for pdf_path in pdfs:
+            expected = list(reference.iter_transactions(pdf_path))
+            self.assertTrue(expected)
+            for name, parser in parsers.items():
+                if name == reference.extractor.name:
+                    continue
+                with self.subTest(extractor=name, pdf=os.path.basename(pdf_path)):
+                    self.assertEqual(list(parser.iter_transactions(pdf_path)), expected)
+
+
+class CibPageTriageTest(SimpleTestCase):
+    def test_page_without_table_is_skipped(self):
+        runs = [(90, "Tájékoztatjuk kedves ügyfelünket, "), (98, "2026. január 5.")]
+        self.assertIsNone(table_region(runs))
+
+    def test_region_spans_header_to_closing_summary(self):
+        runs = [
+            (40, "SORSZÁM: 20"),
+            (101, "TRANZAKCIÓK"),
+            (101, "KÖNYVELÉSI/"),
+            (111, "ÉRTÉKNAP"),
+            (130, "2026.01.30.2026.01.30."),
+            (254, "ÖSSZESEN FORGALOM"),
+            (271, "MEG NEM FIZETETT"),
+        ]
+        self.assertEqual(table_region(runs), (101 - TABLE_MARGIN, 254 - TABLE_MARGIN))
+
+    def test_rows_without_header_keep_the_whole_page(self):
+        runs = [(130, "2026.01.30."), (130, "2026.01.30."), (139, "Papp Zsolt")]
+        self.assertEqual(table_region(runs), (float("-inf"), float("inf")))
+
+
+class CibSyntheticStatementTest(SimpleTestCase):
+    def test_parser_recognises_every_generated_transaction(self):
+        count = 60  # több oldal, oldalhatáron átnyúló kiegészítő sorokkal
+        blocks = synthetic_transactions(count, seed=7)
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            self.assertGreater(write_statement_pdf(pdf_path, count, seed=7), 2)
+            rows = list(CibStatementParser().iter_transactions(pdf_path))
+
+        self.assertEqual(len(rows), count)
+        self.assertEqual(
+            [row.konyvelesi_datum for row in rows], [block[0] for block in blocks]
+        )
+        self.assertEqual(
+            rows[-1].egyenleg, CibStatementParser.parse_amount(blocks[-1][4])
+        )
+
+
+class CibStreamingTransactionsTest(SimpleTestCase):
+    def test_iter_transactions_matches_parse_pdf(self):
+        parser = CibStatementParser()
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            write_statement_pdf(pdf_path, 40, seed=5)
+            pdfs = [pdf_path] + sample_pdfs()[:1]
+            for path in pdfs:
+                with self.subTest(pdf=os.path.basename(path)):
+                    streamed = [row._asdict() for row in parser.iter_transactions(path)]
+                    summary = parser.parse_pdf(path)
+                    self.assertTrue(streamed)
+                    self.assertEqual(streamed, summary["all_transactions"])
+
+
+def row_by_row_summary(df: pd.DataFrame) -> dict:
+    """A korábbi (iterrows alapú) dataframe_to_summary, összehasonlításhoz."""
+    df = df.copy()
+    all_transactions = df.to_dict(orient="records")
+    category_totals = df.groupby("category")["osszeg"].sum().to_dict()
+
+    def records(rows):
+        return [
+            {
+                "date": row["konyvelesi_datum"],
+                "amount": row["osszeg"],
+                "balance": row["egyenleg"],
+                "description": row["leiras"],
+            }
+            for _, row in rows.iterrows()
+        ]
+
+    outgoing = df[
+        df["leiras"].str.contains("Kimenő azonnali utalás", case=False, na=False)
+    ]
+    outgoing_by_iban = {}
+    for iban, group in outgoing.groupby("iban"):
+        partners = group["partner"].dropna()
+        outgoing_by_iban[iban] = {
+            "partner": partners.iloc[0] if not partners.empty else "",
+            "total_amount": group["osszeg"].sum(),
+            "transactions": records(group),
+        }
+
+    df["date_norm"] = (
+        df["konyvelesi_datum"].str.replace(".", "-", regex=False).str.rstrip("-")
+    )
+    daily_spending = df[df["osszeg"] < 0].groupby("date_norm")["osszeg"].sum()
+
+    internal_df = df[
+        df["leiras"].str.contains(
+            "Saját számlák közti rendsz. utalás", case=False, na=False
+        )
+    ]
+    return {
+        "all_transactions": all_transactions,
+        "outgoing_by_iban": outgoing_by_iban,
+        "daily_spending": daily_spending.to_dict(),
+        "internal_transfers": {
+            "total": internal_df["osszeg"].sum() if not internal_df.empty else 0,
+            "transactions": records(internal_df),
+        },
+        "category_totals": category_totals,
+    }
+
+
+class CibVectorizedSummaryTest(SimpleTestCase):
+    def test_matches_row_by_row_summary(self):
+        rng = np.random.default_rng(11)
+        df = BenchSummaryCommand.synthetic_dataframe(rng, 600)
+
+        summary = CibStatementParser.dataframe_to_summary(df)
+        expected = row_by_row_summary(CibStatementParser.to_output_frame(df))
+
+        self.assertTrue(summary["outgoing_by_iban"])
+        self.assertTrue(summary["internal_transfers"]["transactions"])
+        for key, value in expected.items():
+            with self.subTest(key=key):
+                self.assertEqual(summary[key], value)
+
+
+class CibDataFrameSchemaTest(SimpleTestCase):
+    def test_typed_columns(self):
+        rows = [
+            CibTransaction(**dict.fromkeys(CibTransaction._fields, ""))._replace(
+                konyvelesi_datum="2026.01.05.",
+                osszeg=-3000.5,
+                egyenleg=114409.1,
+                card_original_amount=None,
+                category="transfer",
+            ),
+            CibTransaction(**dict.fromkeys(CibTransaction._fields, ""))._replace(
+                konyvelesi_datum="2026.01.06.",
+                osszeg=0.1,
+                egyenleg=114409.2,
+                card_original_amount=2200.0,
+                category="food",
+                card_currency="HUF",
+            ),
+        ]
+        df = CibStatementParser.apply_schema(
+            pd.DataFrame.from_records(rows, columns=CibTransaction._fields)
+        )
+
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["konyvelesi_datum"]))
+        for col in CibStatementParser.AMOUNT_COLUMNS:
+            self.assertEqual(str(df[col].dtype), "Int64", col)
+        for col in CibStatementParser.CATEGORICAL_COLUMNS:
+            self.assertIsInstance(df[col].dtype, pd.CategoricalDtype, col)
+        # egész fillér, hiányzó érték: <NA>
+        self.assertEqual(df["osszeg"].tolist(), [-300050, 10])
+        self.assertIs(df["card_original_amount"].iat[0], pd.NA)
+
+        out = CibStatementParser.to_output_frame(df)
+        self.assertEqual(
+            out["konyvelesi_datum"].tolist(), ["2026.01.05.", "2026.01.06."]
+        )
+        self.assertEqual(out["osszeg"].tolist(), [-3000.5, 0.1])
+        self.assertEqual(out["card_original_amount"].tolist(), [None, 2200.0])
+        self.assertEqual(out["category"].tolist(), ["transfer", "food"])
+
+
+class CibParallelParseTest(SimpleTestCase):
+    def test_parallel_and_sequential_results_are_equal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for seed, count in enumerate((20, 35)):
+                write_statement_pdf(
+                    os.path.join(tmp, f"statement{seed}.pdf"), count, seed=seed
+                )
+            with open(os.path.join(tmp, "broken.pdf"), "wb") as f:
+                f.write(b"nem PDF")
+
+            parser = CibStatementParser()
+            sequential = parser.parse_path(tmp, workers=1)
+            parallel = parser.parse_path(tmp, workers=3)
+
+        self.assertEqual(list(parallel), list(sequential))
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(len(sequential["statement1"]["all_transactions"]), 35)
+        # a hibás fájl nem állítja meg a többit
+        self.assertIn("error", parallel["broken"])
+
+
+class CibPageParallelExtractionTest(SimpleTestCase):
+    @staticmethod
+    def first_row_line(lines):
+        """Az oldal táblázat fejléce utáni első sor (tábla nélkül None)."""
+        for i, line in enumerate(lines[:-1]):
+            if CibStatementParser.TABLE_HEADER_RE.match(line):
+                return lines[i + 1]
+        return None
+
+    def test_transaction_split_across_worker_page_ranges(self):
+        parser = CibStatementParser()
+        # oldalanként külön processz: minden oldaltörés egyben processz határ
+        parser.MIN_PAGES_PER_WORKER = 1
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            page_count = write_statement_pdf(pdf_path, 60, seed=7)
+
+            pages_lines = parser.extract_page_lines(pdf_path)
+            parallel_lines = parser._extract_page_lines_parallel(pdf_path, page_count)
+            sequential = parser.parse_pdf_to_dataframe(pdf_path)
+            parallel = parser.parse_pdf_to_dataframe(pdf_path, page_workers=page_count)
+
+        # van az előző oldalon kezdődött tranzakció kiegészítő sorával induló oldal
+        continued = [
+            CibStatementParser.classify_line(line)[0]
+            for line in map(self.first_row_line, pages_lines[1:])
+            if line
+        ]
+        self.assertIn(LINE_MAIN, continued)
+        self.assertTrue(any(kind != LINE_MAIN for kind in continued))
+
+        self.assertEqual(parallel_lines, pages_lines)
+        self.assertEqual(len(parallel), 60)
+        pd.testing.assert_frame_equal(parallel, sequential)
+
+
+class CibParseCacheTest(SimpleTestCase):
+    def test_hit_and_miss_after_content_or_version_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, "pdfs")
+            os.makedirs(folder)
+            pdf_path = os.path.join(folder, "statement.pdf")
+            write_statement_pdf(pdf_path, 10, seed=1)
+            cache = CibParseCache(os.path.join(tmp, "cache"))
+            parser = CibStatementParser()
+
+            def parse():
+                with mock.patch.object(
+                    parser, "parse_pdf", wraps=parser.parse_pdf
+                ) as parse_pdf:
+                    result = parser.parse_path(folder, cache=cache)
+                return result["statement"], parse_pdf.call_count
+
+            first, parsed = parse()
+            self.assertEqual(parsed, 1)
+            cached, parsed = parse()
+            self.assertEqual(parsed, 0)
+            self.assertEqual(
+                cached, json.loads(json.dumps(first, default=json_default))
+            )
+
+            # más tartalom (átnevezés nélkül): új feldolgozás
+            write_statement_pdf(pdf_path, 12, seed=2)
+            changed, parsed = parse()
+            self.assertEqual(parsed, 1)
+            self.assertEqual(len(changed["all_transactions"]), 12)
+
+            # parser verzió váltás: a régi bejegyzés nem használható
+            parser.PARSER_VERSION = "teszt"
+            _, parsed = parse()
+            self.assertEqual(parsed, 1)
+
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 3})
+
+    def test_atomic_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sub", "state.json")
+            # két egyidejű író (pl. egy processz két szála) külön tmp fájlba ír
+            with atomic_write(path) as first, atomic_write(path) as second:
+                self.assertNotEqual(first.name, second.name)
+                first.write("első")
+                second.write("második")
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "első")
+
+            with self.assertRaises(ValueError):
+                with atomic_write(path) as f:
+                    f.write("félig")
+                    raise ValueError("hiba")
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "első")
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["state.json"])
+
+
+class KeywordMatcherTest(SimpleTestCase):
+    def assertMatchesNaive(self, table, texts):
+        matcher = KeywordMatcher(table)
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(
+                    matcher.best_category(text), naive_categorize(table, text)
+                )
+
+    def test_matches_naive_loop_on_keyword_table(self):
+        table = CibStatementParser.CATEGORY_KEYWORDS
+        keywords = [kw for kws in table.values() for kw in kws]
+        rng = random.Random(3)
+        texts = ["", "semmi különös", "bolt taxi", "molnár spar", "bolt bolt"]
+        texts += keywords
+        # több kulcsszó együtt, átfedésekkel és egyezésekkel
+        texts += [
+            " xy".join(rng.sample(keywords, rng.randint(2, 4))) for _ in range(300)
+        ]
+        self.assertMatchesNaive(table, texts)
+
+    def test_duplicate_and_empty_keywords(self):
+        table = {"a": ["ab", "ab", ""], "b": ["abc", "b"], "c": ["bc", "c", "c"]}
+        self.assertMatchesNaive(table, ["", "x", "ab", "abc", "bc", "c", "abcbc"])
+
+
+class CibIngestManifestTest(SimpleTestCase):
+    def test_only_new_or_changed_files_are_parsed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, "pdfs")
+            os.makedirs(folder)
+            first = os.path.join(folder, "first.pdf")
+            second = os.path.join(folder, "second.pdf")
+            write_statement_pdf(first, 8, seed=1)
+            write_statement_pdf(second, 8, seed=2)
+            cache = CibParseCache(os.path.join(tmp, "cache"))
+            manifest_path = os.path.join(tmp, "manifest.json")
+            parser = CibStatementParser()
+
+            def ingest():
+                with mock.patch.object(
+                    parser, "parse_files", wraps=parser.parse_files
+                ) as parse_files:
+                    stats = ingest_folder(
+                        folder, cache, CibIngestManifest(manifest_path), parser
+                    )
+                parsed = [
+                    path for call in parse_files.call_args_list for path in call[0][0]
+                ]
+                return stats, sorted(os.path.basename(path) for path in parsed)
+
+            stats, parsed = ingest()
+            self.assertEqual(parsed, ["first.pdf", "second.pdf"])
+            self.assertEqual(len(stats["new"]), 2)
+
+            stats, parsed = ingest()
+            self.assertEqual((parsed, stats["unchanged"]), ([], 2))
+
+            # csak az mtime változik: a hash alapján változatlan
+            os.utime(first, (1, 1))
+            stats, parsed = ingest()
+            self.assertEqual((parsed, stats["unchanged"]), ([], 2))
+
+            write_statement_pdf(second, 9, seed=3)
+            stats, parsed = ingest()
+            self.assertEqual(parsed, ["second.pdf"])
+            self.assertEqual(stats["changed"], [os.path.abspath(second)])
+
+            os.remove(first)
+            stats, parsed = ingest()
+            self.assertEqual(parsed, [])
+            self.assertEqual(stats["removed"], [os.path.abspath(first)])
+            self.assertEqual(
+                list(CibIngestManifest(manifest_path).entries),
+                [os.path.abspath(second)],
+            )
+
+    def test_learned_memo_entries_do_not_reparse_unchanged_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, "pdfs")
+            os.makedirs(folder)
+            write_statement_pdf(os.path.join(folder, "a.pdf"), 20, seed=1)
+            cache = CibParseCache(os.path.join(tmp, "cache"))
+            manifest_path = os.path.join(tmp, "manifest.json")
+            memo_path = os.path.join(tmp, "memo.json")
+
+            def ingest():
+                # mint a cib_ingest parancs: futásonként új, memóval dolgozó parser
+                parser = CibStatementParser(category_memo=memo_path)
+                return ingest_folder(
+                    folder, cache, CibIngestManifest(manifest_path), parser
+                )
+
+            self.assertEqual(len(ingest()["new"]), 1)
+            self.assertTrue(CibCategoryMemo(memo_path).entries())
+
+            write_statement_pdf(os.path.join(folder, "b.pdf"), 20, seed=2)
+            stats = ingest()
+            self.assertEqual(
+                (stats["new"], stats["changed"], stats["unchanged"]),
+                ([os.path.abspath(os.path.join(folder, "b.pdf"))], [], 1),
+            )
+
+            stats = ingest()
+            self.assertEqual(
+                (stats["new"], stats["changed"], stats["unchanged"]), ([], [], 2)
+            )
+
+
+class BankTransactionImportTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="teszt@example.com", password="jelszo"
+        )
+
+    @staticmethod
+    def record(**fields):
+        record = {
+            "konyvelesi_datum": "2026.01.05.",
+            "leiras": "Kimenő azonnali utalás; AZKIG1",
+            "osszeg": -3000.0,
+            "egyenleg": 114409.1,
+            "category": "transfer",
+            "card_original_amount": None,
+        }
+        record.update(fields)
+        return record
+
+    def test_counts_only_new_rows(self):
+        manager = BankTransaction.objects
+        first = {"all_transactions": [self.record(), self.record(osszeg=-1.5)]}
+        self.assertEqual(manager.create_from_summary(self.user, first), 2)
+
+        # egy ismert és egy új sor, plusz egy a kötegen belüli ismétlés
+        second = {
+            "all_transactions": [
+                self.record(),
+                self.record(egyenleg=1.0),
+                self.record(egyenleg=1.0),
+            ]
+        }
+        self.assertEqual(manager.create_from_summary(self.user, second), 1)
+        self.assertEqual(manager.create_from_summary(self.user, second), 0)
+        self.assertEqual(manager.filter(user=self.user).count(), 3)
+
+    def test_long_texts_are_truncated_to_column_length(self):
+        long_text = "x" * 400
+        summary = {
+            "all_transactions": [
+                self.record(
+                    leiras=long_text,
+                    comment=long_text,
+                    partner=long_text,
+                    other_party_name=long_text,
+                    card_merchant=long_text,
+                    card_city=long_text,
+                )
+            ]
+        }
+        BankTransaction.objects.create_from_summary(
+            self.user, summary, source_file=long_text
+        )
+
+        stored = BankTransaction.objects.get(user=self.user)
+        for name in (
+            "description",
+            "comment",
+            "partner",
+            "other_party_name",
+            "card_merchant",
+            "card_city",
+            "source_file",
+        ):
+            max_length = BankTransaction._meta.get_field(name).max_length
+            self.assertEqual(getattr(stored, name), long_text[:max_length], name)
+
+    def test_import_command_reports_new_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_statement_pdf(os.path.join(tmp, "kivonat.pdf"), 10, seed=4)
+            with self.settings(
+                CIB_PARSE_CACHE_DIR=os.path.join(tmp, "cache"),
+                CIB_CATEGORY_MEMO=os.path.join(tmp, "memo.json"),
+                CIB_PAGE_TEXT_CACHE_DIR=os.path.join(tmp, "page_text"),
+            ):
+                outputs = []
+                for _ in range(2):
+                    out = StringIO()
+                    call_command(
+                        "cib_import_transactions",
+                        self.user.email,
+                        path=tmp,
+                        workers=1,
+                        stdout=out,
+                    )
+                    outputs.append(out.getvalue())
+
+        self.assertEqual(
+            outputs, ["kivonat: 10 sor, 10 új\n", "kivonat: 10 sor, 0 új\n"]
+        )
+        stored = BankTransaction.objects.filter(user=self.user)
+        self.assertEqual(stored.count(), 10)
+        self.assertEqual(set(stored.values_list("source_file", flat=True)), {"kivonat"})
+
+    def test_import_command_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("cib_import_transactions", "nincs@example.com")
+
+
+class CibStatementUploadViewTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.folder = Path(tmp.name, "uploads")
+        self.folder.mkdir()
+        for seed in (1, 2):
+            write_statement_pdf(str(self.folder / f"s{seed}.pdf"), 8, seed=seed)
+        overrides = self.settings(
+            PDF_UPLOAD_DIR=self.folder,
+            CIB_PARSE_CACHE_DIR=os.path.join(tmp.name, "cache"),
+            CIB_CATEGORY_MEMO=os.path.join(tmp.name, "memo.json"),
+            CIB_PAGE_TEXT_CACHE_DIR=os.path.join(tmp.name, "page_text"),
+            CIB_PARSE_WORKERS=1,
+            CIB_PAGE_WORKERS=1,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="teszt@example.com", password="jelszo"
+            )
+        )
+
+    def test_streamed_response_matches_full_response(self):
+        url = reverse("pigapp_app:cib-parse")
+        full = self.client.get(url, {"category": "transfer"})
+        self.assertEqual(full.status_code, 200)
+        streamed = self.client.get(url, {"category": "transfer", "stream": "1"})
+        self.assertEqual(streamed.status_code, 200)
+        body = json.loads(b"".join(streamed.streaming_content))
+
+        self.assertEqual(list(body), list(full.data))
+        self.assertEqual(body.pop("_meta"), {"cache": {"hits": 2, "misses": 0}})
+        expected = json.loads(json.dumps(full.data))
+        expected.pop("_meta")
+        self.assertEqual(body, expected)
+
+    def test_repeated_request_is_served_from_cache(self):
+        url = reverse("pigapp_app:cib-parse")
+        first = self.client.get(url)
+        self.assertEqual(first.data["_meta"]["cache"], {"hits": 0, "misses": 2})
+        self.assertTrue(CibCategoryMemo(settings.CIB_CATEGORY_MEMO).entries())
+
+        second = self.client.get(url)
+        self.assertEqual(second.data["_meta"]["cache"], {"hits": 2, "misses": 0})
+
+
+class CibParseJobTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        overrides = self.settings(
+            PDF_UPLOAD_DIR=Path(self.tmp, "uploads"),
+            CIB_PARSE_CACHE_DIR=os.path.join(self.tmp, "cache"),
+            CIB_CATEGORY_MEMO=os.path.join(self.tmp, "memo.json"),
+            CIB_PAGE_TEXT_CACHE_DIR=os.path.join(self.tmp, "page_text"),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = get_user_model().objects.create_user(
+            email="teszt@example.com", password="jelszo"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse("pigapp_app:cib-job-upload"),
+            {"file": SimpleUploadedFile(name, content, "application/pdf")},
+            format="multipart",
+        )
+
+    def status(self, job_id):
+        response = self.client.get(reverse("pigapp_app:cib-job-detail", args=[job_id]))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_upload_claim_and_finish(self):
+        pdf_path = os.path.join(self.tmp, "synthetic.pdf")
+        write_statement_pdf(pdf_path, 12, seed=3)
+        with open(pdf_path, "rb") as f:
+            response = self.upload("kivonat.pdf", f.read())
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data["id"]
+        self.assertEqual(self.status(job_id)["status"], CibParseJob.STATUS_PENDING)
+
+        job = claim_next_job()
+        self.assertEqual((job.id, job.status), (job_id, CibParseJob.STATUS_RUNNING))
+        self.assertIsNotNone(job.started_date)
+        self.assertIsNone(claim_next_job())
+
+        run_job(job)
+        data = self.status(job_id)
+        self.assertEqual(data["status"], CibParseJob.STATUS_DONE)
+        self.assertEqual(data["error"], "")
+        self.assertEqual(len(data["result"]["all_transactions"]), 12)
+        self.assertIsNotNone(data["finished_date"])
+        self.assertEqual(BankTransaction.objects.filter(user=self.user).count(), 12)
+
+    def test_unsupported_pdf_fails(self):
+        response = self.upload("level.pdf", render_pdf([[(17, 40, "Kedves Ügyfél!")]]))
+        job = claim_next_job()
+        run_job(job)
+
+        data = self.status(response.data["id"])
+        self.assertEqual(data["status"], CibParseJob.STATUS_FAILED)
+        self.assertIn("UnsupportedStatementFormat", data["error"])
+        self.assertIsNone(data["result"])
+
+    def test_rejects_non_pdf_upload(self):
+        response = self.upload("kivonat.txt", b"nem PDF")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CibParseJob.objects.exists())
+
+    def test_other_users_job_is_not_visible(self):
+        job = CibParseJob.objects.create(file_name="x.pdf", file_path="x.pdf")
+        response = self.client.get(reverse("pigapp_app:cib-job-detail", args=[job.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_upload_is_not_in_other_users_parse(self):
+        pdf_path = os.path.join(self.tmp, "synthetic.pdf")
+        write_statement_pdf(pdf_path, 12, seed=3)
+        with open(pdf_path, "rb") as f:
+            self.assertEqual(self.upload("sajat.pdf", f.read()).status_code, 202)
+        write_statement_pdf(
+            os.path.join(settings.PDF_UPLOAD_DIR, "kozos.pdf"), 8, seed=1
+        )
+
+        other = APIClient()
+        other.force_authenticate(
+            get_user_model().objects.create_user(
+                email="masik@example.com", password="jelszo"
+            )
+        )
+        response = other.get(reverse("pigapp_app:cib-parse"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data) - {"_meta"}, {"kozos"})
+        job = CibParseJob.objects.get(user=self.user)
+        self.assertEqual(os.path.dirname(job.file_path), job_upload_dir(self.user))
+
+
+class CibLineStateMachineTest(SimpleTestCase):
+    HEADER = ["KÖNYVELÉSI/ TRANZAKCIÓK EGYENLEG", "ÉRTÉKNAP JÓVÁÍRÁSOK"]
+
+    def rows(self, pages_lines):
+        parser = CibStatementParser()
+        return list(parser.iter_rows_from_page_lines(pages_lines))
+
+    def test_classify_line(self):
+        classify = CibStatementParser.classify_line
+        cases = {
+            "2026.01.05. Kimenő azonnali utalás; AZKIG1 -3.000,00 114.409,10": "main",
+            "ÉRTÉKNAP JÓVÁÍRÁSOK": "header",
+            "10701094-65640841-50600007": "account",
+            "HU94 1040 4089 8676 5051 5788 1003": "iban",
+            "4796 8501 0427 1257A20260103 103642; 2.200,00 HUF": "card",
+            "5993 560378HU BUDAPEST; NEMZETI DOHANYBOLT 9989068": "merchant",
+            "Közlemény: törlesztés": "comment",
+            "2026.01.05. 10701094-65640841-50600007": "account",
+            "2026.02.01. HU94 1040 4089 8676 5051 5788 1003": "iban",
+            "2026.01.05. Papp Zsolt": "text",
+            "Papp Zsolt": "text",
+        }
+        for line, kind in cases.items():
+            with self.subTest(line=line):
+                self.assertEqual(classify(line)[0], kind)
+
+    def test_follow_lines_stop_at_next_transaction(self):
+        rows = self.rows(
+            [
+                self.HEADER
+                + [
+                    "2026.01.30. Elszámolt kamatössz.; Bruttó 0,10 1.000,10",
+                    "2026.01.30. Levont kamatadó : 0,02 HUF;",
+                    "2026.01.30. Saját számlák közti rendsz. utalás; SP -500,00 500,10",
+                    "10701094-65640841-50600007",
+                    "PAPP ZSOLT",
+                    "Megbízás azonosító: 182956409",
+                    "Közlemény: törlesztés",
+                ]
+            ]
+        )
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0].extra_sor_2, "")
+        self.assertEqual(rows[1].account_number, "10701094-65640841-50600007")
+        self.assertEqual(rows[1].other_party_name, "PAPP ZSOLT")
+        self.assertEqual(rows[1].comment, "törlesztés")
+
+    def test_value_date_prefixed_iban_and_account_lines(self):
+        rows = self.rows(
+            [
+                self.HEADER
+                + [
+                    "2026.02.01. Kimenő azonnali utalás; AZKIG1 -3.000,00 114.409,10",
+                    "2026.02.01. HU94 1040 4089 8676 5051 5788 1003",
+                    "Papp Zsolt",
+                    "2026.02.02. Saját számlák közti rendsz. utalás; SP -500,00 113.909,10",
+                    "2026.02.02. 10701094-65640841-50600007",
+                    "PAPP ZSOLT",
+                ]
+            ]
+        )
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0].iban, "HU94 1040 4089 8676 5051 5788 1003")
+        self.assertEqual(rows[0].partner, "Papp Zsolt")
+        self.assertEqual(rows[1].account_number, "10701094-65640841-50600007")
+        self.assertEqual(rows[1].other_party_name, "PAPP ZSOLT")
+        # a nyers kiegészítő sor változatlan (az előtaggal együtt)
+        self.assertEqual(
+            rows[0].extra_sor_1, "2026.02.01. HU94 1040 4089 8676 5051 5788 1003"
+        )
+
+    def test_follow_lines_continue_after_next_page_header(self):
+        rows = self.rows(
+            [
+                self.HEADER
+                + [
+                    "2026.01.03. Kimenő azonnali utalás; AZKIG1 -3.000,00 114.409,10",
+                    "HU94 1040 4089 8676 5051 5788 1003",
+                ],
+                ["SORSZÁM: 1", "OLDALSZÁM: 2"]
+                + self.HEADER
+                + [
+                    "Papp Zsolt",
+                    "2026.01.04. Jutalék; SNKFSE1 -100,00 114.309,10",
+                ],
+            ]
+        )
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0].iban, "HU94 1040 4089 8676 5051 5788 1003")
+        self.assertEqual(rows[0].partner, "Papp Zsolt")
+        self.assertEqual((rows[1].extra_sor_1, rows[1].extra_sor_2), ("", ""))
+
+
+class CibVectorizedRowsTest(SimpleTestCase):
+    def test_rows_to_dataframe_matches_row_by_row_conversion(self):
+        parser = CibStatementParser()
+        rows = list(
+            parser.iter_rows_from_page_lines(
+                [
+                    CibLineStateMachineTest.HEADER
+                    + [
+                        "2026.01.03. Vásárlás kártyával; KARTYA -2.200,00 112.209,10",
+                        "4796 8501 0427 1257A20260103 103642; 2.200,00 HUF",
+                        "5993 560378HU BUDAPEST; NEMZETI DOHANYBOLT 9989068",
+                        "2026.01.05. Kimenő azonnali utalás; AZKIG1 -3.000,00 109.209,10",
+                        "HU94 1040 4089 8676 5051 5788 1003",
+                        "Papp Zsolt",
+                        "2026.01.30. Elszámolt kamatössz.; Bruttó 0,10 109.209,20",
+                    ]
+                ]
+            )
+        )
+
+        df = parser.rows_to_dataframe(rows)
+        expected = parser.apply_schema(
+            pd.DataFrame.from_records(
+                [parser.finalize_row(row) for row in rows],
+                columns=list(CibTransaction._fields),
+            )
+        )
+
+        pd.testing.assert_frame_equal(df, expected)
+        self.assertEqual(df["card_masked"].iat[0], "479685******1257")
+        self.assertEqual(df["card_tx_date"].iat[0], "2026-01-03")
+        self.assertEqual(df["card_original_amount"].iat[0], 220000)
+        self.assertEqual(df["card_masked"].iat[1], "")
+        self.assertEqual(
+            CibStatementParser._filler(df["osszeg"]).tolist(), [-220000, -300000, 10]
+        )
+
+
+class CibExtractionMemoryTest(SimpleTestCase):
+    @staticmethod
+    def extraction_peak_kb(extractor, pdf_path):
+        tracemalloc.start()
+        try:
+            pages = sum(1 for _ in extractor.iter_page_lines(pdf_path))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return pages, peak // 1024
+
+    def test_peak_memory_does_not_grow_with_page_count(self):
+        extractor = get_extractor("pdfplumber")
+        with tempfile.TemporaryDirectory() as tmp:
+            small_path = os.path.join(tmp, "small.pdf")
+            large_path = os.path.join(tmp, "large.pdf")
+            write_statement_pdf(small_path, 80)
+            write_statement_pdf(large_path, 240)
+
+            # bemelegítés mindkét fájllal: a lusta importok / font cache-ek
+            # ne a mért futások egyikébe essenek (a suite sorrendjétől függően)
+            self.extraction_peak_kb(extractor, large_path)
+            self.extraction_peak_kb(extractor, small_path)
+            small_pages, small_peak = self.extraction_peak_kb(extractor, small_path)
+            large_pages, large_peak = self.extraction_peak_kb(extractor, large_path)
+
+        self.assertGreater(large_pages, 2 * small_pages)
+        # lezáratlan pdfplumber oldalakkal oldalanként kb. 5 MiB-tal nő a
+        # csúcs, lezárva legfeljebb 1 MiB-tal (a dokumentum szintű cache-ek)
+        per_page_kb = (large_peak - small_peak) / (large_pages - small_pages)
+        self.assertLess(per_page_kb, 2.5 * 1024)
+
+
+def learn_memo_entries(memo_path, worker):
+    """Egy processz 20 külön mentése (a párhuzamos memo írás teszthez)."""
+    version = CibStatementParser().keyword_table_version()
+    for i in range(20):
+        memo = CibCategoryMemo(memo_path).load(version)
+        memo.learn(f"card:worker{worker}-{i}", "food")
+        memo.save()
+
+
+class CibCategoryMemoTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.memo_path = os.path.join(self.tmp.name, "memo.json")
+        self.pdf_path = os.path.join(self.tmp.name, "synthetic.pdf")
+        write_statement_pdf(self.pdf_path, 120, seed=11)
+
+    def test_merchant_key(self):
+        key = CibStatementParser.merchant_key
+        self.assertEqual(
+            key(
+                "BANKKÁRTYA TERHELÉS; AR1MEQGRC 01",
+                "2026.01.05. 4796 8501 0427 1257A20260103 103642; 2200.00 HUF",
+                '5993 560378HU BUDAPEST; NEMZETI DOHA"NYBOL 00071722 9989068',
+            ),
+            'card:nemzeti doha"nybol',
+        )
+        self.assertEqual(
+            key(
+                "Kimenő azonnali utalás; AZKIG30993405730",
+                "2026.02.01. HU94 1040 4089 8676 5051 5788 1003",
+                "Papp Zsolt",
+            ),
+            "account:kimenő azonnali utalás:HU94104040898676505157881003",
+        )
+        self.assertIsNone(
+            key("Jutalék; SNKFSE0000428796", "2026.01.01. TK-Megbízás díja", "")
+        )
+
+    def test_memo_is_learned_and_reused(self):
+        expected = CibStatementParser().parse_pdf_to_dataframe(self.pdf_path)
+        learned = CibStatementParser(category_memo=self.memo_path)
+        pd.testing.assert_frame_equal(
+            learned.parse_pdf_to_dataframe(self.pdf_path), expected
+        )
+        self.assertTrue(CibCategoryMemo(self.memo_path).entries())
+
+        parser = CibStatementParser(category_memo=self.memo_path)
+        with mock.patch.object(
+            parser, "keyword_category", wraps=parser.keyword_category
+        ) as keyword_category:
+            df = parser.parse_pdf_to_dataframe(self.pdf_path)
+
+        # a kategóriák azonosak, csak a forrásuk memo
+        pd.testing.assert_frame_equal(
+            df.drop(columns="category_source"),
+            expected.drop(columns="category_source"),
+        )
+        self.assertIn("memo", set(df["category_source"]))
+        # csak a partner nélküli (jutalék) sorok mennek kulcsszavas kategorizálásra
+        self.assertLess(keyword_category.call_count, len(df) / 4)
+
+    def test_manual_correction_wins_and_changes_cache_key(self):
+        parser = CibStatementParser(category_memo=self.memo_path)
+        version = parser.categorization_version()
+        parser.parse_pdf_to_dataframe(self.pdf_path)
+
+        CibCategoryMemo(self.memo_path).set_manual(
+            "card:nemzeti dohanybolt", "shopping"
+        )
+        parser = CibStatementParser(category_memo=self.memo_path)
+        df = parser.parse_pdf_to_dataframe(self.pdf_path)
+
+        self.assertNotEqual(parser.categorization_version(), version)
+        tobacco = df["extra_sor_2"].str.contains("NEMZETI DOHANYBOLT")
+        self.assertTrue(tobacco.any())
+        self.assertEqual(set(df.loc[tobacco, "category"]), {"shopping"})
+
+    def test_learned_entries_keep_cache_key(self):
+        parser = CibStatementParser(category_memo=self.memo_path)
+        version = parser.categorization_version()
+        parser.parse_pdf_to_dataframe(self.pdf_path)
+        self.assertTrue(CibCategoryMemo(self.memo_path).entries())
+
+        self.assertEqual(parser.categorization_version(), version)
+        fresh = CibStatementParser(category_memo=self.memo_path)
+        self.assertEqual(fresh.categorization_version(), version)
+
+    def test_parallel_saves_do_not_lose_entries(self):
+        CibCategoryMemo(self.memo_path).set_manual("card:kezi", "food")
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(learn_memo_entries, [self.memo_path] * 4, range(4)))
+
+        entries = CibCategoryMemo(self.memo_path).entries()
+        self.assertEqual(len(entries), 1 + 4 * 20)
+        self.assertEqual(entries["card:kezi"], {"category": "food", "source": "manual"})
+
+    def test_learned_entries_are_dropped_when_keywords_change(self):
+        CibStatementParser(category_memo=self.memo_path).parse_pdf_to_dataframe(
+            self.pdf_path
+        )
+        keywords = {**CibStatementParser.CATEGORY_KEYWORDS, "food": ["lidl"]}
+        parser = CibStatementParser(
+            category_keywords=keywords, category_memo=self.memo_path
+        )
+        self.assertEqual(parser.category_memo.learned, {})
+
+
+class CibTableFooterTest(SimpleTestCase):
+    HEADER = "ÉRTÉKNAP JÓVÁÍRÁSOK"
+    FOOTER = [
+        "CIB Bank Zrt. H-1024 Budapest, Petrezselyem utca 2–8., H-1995 Budapest",
+        "Nyilvántartó cégbíróság: Fővárosi Törvényszék Cégbírósága",
+        "957/1997/F, III/41. 044-10/2002. BIC (SWIFT) kód: CIBHHUHB",
+    ]
+
+    def rows(self, pages):
+        return list(CibStatementParser().iter_rows_from_page_lines(pages))
+
+    def test_footer_after_last_row_is_not_continuation(self):
+        rows = self.rows(
+            [
+                [
+                    self.HEADER,
+                    "2026.01.09. Jutalék; SNKFSE0000429975 -512,00 148,96",
+                    "2026.01.09. TK-Megbízás mód./visszavonás díja; CONTKFSE0",
+                    *self.FOOTER,
+                ],
+                [
+                    "SORSZÁM: 21",
+                    self.HEADER,
+                    "2026.01.12. Kimenő azonnali utalás; AZKIG1 -1.500,00 147.460,96",
+                    "11773054-01406007-00000000",
+                    "ÖSSZESEN FORGALOM TERHELÉS: - 2.012,00 JÓVÁÍRÁS: 0,00",
+                    "ZÁRÓ EGYENLEG: 147.460,96",
+                    "Közlemény: nem a tranzakció része",
+                ],
+            ]
+        )
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            (rows[0].extra_sor_2, rows[0].partner, rows[0].other_party_name),
+            ("", "", ""),
+        )
+        self.assertEqual(rows[1].account_number, "11773054-01406007-00000000")
+        self.assertEqual(
+            (rows[1].extra_sor_2, rows[1].other_party_name, rows[1].comment),
+            ("", "", ""),
+        )
+
+    def test_transaction_continues_after_footer_and_next_header(self):
+        rows = self.rows(
+            [
+                [
+                    self.HEADER,
+                    "2026.01.12. Kimenő azonnali utalás; AZKIG1 -1.500,00 147.460,96",
+                    "HU94 1040 4089 8676 5051 5788 1003",
+                    *self.FOOTER,
+                ],
+                ["SORSZÁM: 21", "OLDALSZÁM: 2", self.HEADER, "Papp Zsolt"],
+            ]
+        )
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].iban, "HU94 1040 4089 8676 5051 5788 1003")
+        self.assertEqual(rows[0].partner, "Papp Zsolt")
+
+
+class CibMccCategorizationTest(SimpleTestCase):
+    CARD_LINE = "2026.01.05. 4796 8501 0427 1257A20260103 103642; 2200.00 HUF"
+
+    def test_card_payment_is_categorized_by_mcc(self):
+        parser = CibStatementParser()
+        with mock.patch.object(
+            parser, "keyword_category", wraps=parser.keyword_category
+        ) as keyword_category:
+            rows = list(
+                parser.iter_rows_from_page_lines(
+                    [
+                        [
+                            "2026.01.05. BANKKÁRTYA TERHELÉS; AR1M 01 -2.200,00 9.800,00",
+                            self.CARD_LINE,
+                            "5993 560378HU BUDAPEST; NEMZETI DOHANYBOLT 9989068",
+                            "2026.01.05. BANKKÁRTYA TERHELÉS; AR1M 02 -300,00 9.500,00",
+                            self.CARD_LINE,
+                            "7299 560378HU BUDAPEST; LIDL 9989068",
+                        ]
+                    ]
+                )
+            )
+
+        self.assertEqual(
+            [(row.mcc, row.category, row.category_source) for row in rows],
+            [("5993", "shopping", "mcc"), ("7299", "food", "keyword")],
+        )
+        # csak a táblában nem szereplő MCC megy kulcsszavas kategorizálásra
+        self.assertEqual(keyword_category.call_count, 1)
+
+    def test_summary_reports_category_sources(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            write_statement_pdf(pdf_path, 80, seed=5)
+            summary = CibStatementParser().parse_pdf(pdf_path)
+
+        sources = summary["category_sources"]
+        self.assertEqual(set(sources), {"mcc", "keyword"})
+        self.assertEqual(sum(sources.values()), len(summary["all_transactions"]))
+        card_rows = [row for row in summary["all_transactions"] if row["mcc"]]
+        self.assertEqual(sources["mcc"], len(card_rows))
+
+
+class CibCardLineTest(SimpleTestCase):
+    # a minta kivonatok sorai (értéknap előtag, "2200.00" alakú összegek)
+    PAGE = [
+        "2026.02.02. BANKKÁRTYA TERHELÉS; AR1MEQTQW 01 -2.200,00 102.415,00",
+        "2026.02.02. 4796 8501 0427 1257A20260131 111126; 2200.00 HUF",
+        '5993 432533HU BUDAPEST; NEMZETI DOHA"NYBOL 00071722 0198583',
+        "2026.02.02. BANKKÁRTYA TERHELÉS; AR1LWSFTX 02 -4.500,00 97.915,00",
+        "2026.02.02. 4796 8501 0427 1257 20260129 140127; 4500.00 HUF 4500.00 HUF",
+        "5818 908917IE CORK; APPLE.COM/BILL 3597312",
+        "2026.02.03. KÉSZPÉNZFELVÉTEL; AR1ATM 01 -170.000,00 -72.085,00",
+        "2026.02.03. 4796 8501 0427 1257 20260201 130325; 170000,00 HUF",
+        "6011 845156HU BUDAPEST; CIB BANK ATM651 0000000",
+        "2026.02.04. BANKKÁRTYA TERHELÉS; AR1USD 01 -14.185,87 -86.270,87",
+        "2026.02.04. 4796 8501 0427 1257 20260202 174400; 41.33 USD 41.33 USD",
+        "343.21 5993 394901US 561-9488932; DASH VAPES 77512643 1378313",
+    ]
+    EXPECTED = [
+        (
+            "479685******1257",
+            "2026-01-31",
+            "11:11:26",
+            2200.0,
+            "HUF",
+            "5993",
+            "BUDAPEST",
+            'NEMZETI DOHA"NYBOL 00071722 0198583',
+        ),
+        (
+            "479685******1257",
+            "2026-01-29",
+            "14:01:27",
+            4500.0,
+            "HUF",
+            "5818",
+            "CORK",
+            "APPLE.COM/BILL 3597312",
+        ),
+        (
+            "479685******1257",
+            "2026-02-01",
+            "13:03:25",
+            170000.0,
+            "HUF",
+            "6011",
+            "BUDAPEST",
+            "CIB BANK ATM651 0000000",
+        ),
+        (
+            "479685******1257",
+            "2026-02-02",
+            "17:44:00",
+            41.33,
+            "USD",
+            "5993",
+            "561-9488932",
+            "DASH VAPES 77512643 1378313",
+        ),
+    ]
+    FIELDS = [
+        "card_masked",
+        "card_tx_date",
+        "card_tx_time",
+        "card_original_amount",
+        "card_currency",
+        "mcc",
+        "card_city",
+        "card_merchant",
+    ]
+
+    def test_card_fields_from_real_format_lines(self):
+        parser = CibStatementParser()
+        raw = list(parser.iter_rows_from_page_lines([self.PAGE]))
+
+        rows = [parser.finalize_row(row) for row in raw]
+        self.assertEqual(
+            [tuple(getattr(row, field) for field in self.FIELDS) for row in rows],
+            self.EXPECTED,
+        )
+
+        frame = CibStatementParser.to_output_frame(parser.rows_to_dataframe(raw))
+        self.assertEqual(
+            list(frame[self.FIELDS].astype(object).itertuples(index=False, name=None)),
+            self.EXPECTED,
+        )
+
+    def test_parse_amount_formats(self):
+        parse_amount = CibStatementParser.parse_amount
+        self.assertEqual(parse_amount("2200.00"), 2200.0)
+        self.assertEqual(parse_amount("-41.33"), -41.33)
+        self.assertEqual(parse_amount("-3.000,00"), -3000.0)
+        self.assertEqual(parse_amount("170000,00"), 170000.0)
+
+
+class CibConsolidatedSummaryTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            write_statement_pdf(pdf_path, 60, seed=9)
+            cls.full = CibStatementParser().parse_pdf(pdf_path)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def partial(self, start, stop):
+        return {"all_transactions": self.full["all_transactions"][start:stop]}
+
+    def assert_matches_full(self, result):
+        self.assertEqual(result["transaction_count"], 60)
+        for key in ("daily_spending", "category_totals"):
+            self.assertEqual(result[key].keys(), self.full[key].keys())
+            for name, total in result[key].items():
+                self.assertAlmostEqual(total, self.full[key][name], places=2)
+        self.assertEqual(
+            result["outgoing_by_iban"].keys(), self.full["outgoing_by_iban"].keys()
+        )
+        self.assertEqual(result["category_sources"], self.full["category_sources"])
+
+    def test_overlapping_statements_are_deduplicated(self):
+        consolidated = CibConsolidatedSummary()
+        added = consolidated.add(
+            {
+                "jan": ("k1", self.partial(0, 40)),
+                "year": ("k2", self.full),
+                "broken": ("k3", {"error": "hibás PDF"}),
+            }
+        )
+
+        result = consolidated.as_summary()
+        self.assertEqual(added, 60)
+        self.assertEqual(result["duplicates_dropped"], 40)
+        self.assertEqual(
+            result["statements"]["year"],
+            {
+                "transaction_count": 60,
+                "new_transactions": 20,
+                "duplicates": 40,
+            },
+        )
+        self.assertEqual(result["statements"]["broken"], {"error": "hibás PDF"})
+        self.assert_matches_full(result)
+
+    def test_incremental_add_matches_single_pass(self):
+        path = os.path.join(self.tmp.name, "consolidated.json")
+        first = CibConsolidatedSummary(path)
+        first.add({"a": ("k1", self.partial(0, 25))})
+        first.save()
+
+        second = CibConsolidatedSummary(path).load()
+        self.assertEqual(second.add({"b": ("k2", self.partial(20, 60))}), 35)
+        self.assert_matches_full(second.as_summary())
+
+    def test_update_from_path_parses_only_new_statements(self):
+        pdf_dir = os.path.join(self.tmp.name, "pdf")
+        os.makedirs(pdf_dir)
+        write_statement_pdf(os.path.join(pdf_dir, "a.pdf"), 20, seed=1)
+        parser = CibStatementParser()
+        consolidated = CibConsolidatedSummary().update_from_path(parser, pdf_dir)
+
+        write_statement_pdf(os.path.join(pdf_dir, "b.pdf"), 20, seed=2)
+        with mock.patch.object(
+            parser, "parse_files", wraps=parser.parse_files
+        ) as parse_files:
+            consolidated.update_from_path(parser, pdf_dir)
+
+        self.assertEqual(
+            [len(call.args[0]) for call in parse_files.call_args_list], [1]
+        )
+        self.assertEqual(list(consolidated.statements), ["a", "b"])
+        self.assertEqual(consolidated.as_summary()["transaction_count"], 40)
+
+    def test_update_from_path_with_memo_parses_only_new_statements(self):
+        pdf_dir = os.path.join(self.tmp.name, "pdf")
+        os.makedirs(pdf_dir)
+        write_statement_pdf(os.path.join(pdf_dir, "a.pdf"), 20, seed=1)
+        state_path = os.path.join(self.tmp.name, "consolidated.json")
+        memo_path = os.path.join(self.tmp.name, "memo.json")
+
+        def update():
+            # mint a view: kérésenként új parser és betöltött állapot
+            parser = CibStatementParser(category_memo=memo_path)
+            consolidated = CibConsolidatedSummary(state_path).load()
+            with mock.patch.object(
+                parser, "parse_files", wraps=parser.parse_files
+            ) as parse_files:
+                consolidated.update_from_path(parser, pdf_dir)
+            consolidated.save()
+            return consolidated, [
+                len(call.args[0]) for call in parse_files.call_args_list
+            ]
+
+        self.assertEqual(update()[1], [1])
+        self.assertTrue(CibCategoryMemo(memo_path).entries())
+
+        write_statement_pdf(os.path.join(pdf_dir, "b.pdf"), 20, seed=2)
+        consolidated, parsed = update()
+        self.assertEqual(parsed, [1])
+        self.assertEqual(list(consolidated.statements), ["a", "b"])
+
+        consolidated, parsed = update()
+        self.assertEqual(parsed, [])
+        self.assertEqual(consolidated.as_summary()["transaction_count"], 40)
+
+    def test_update_from_path_hashes_each_statement_once(self):
+        pdf_dir = os.path.join(self.tmp.name, "pdf")
+        os.makedirs(pdf_dir)
+        for seed in (1, 2):
+            write_statement_pdf(os.path.join(pdf_dir, f"{seed}.pdf"), 10, seed=seed)
+        cache = CibParseCache(os.path.join(self.tmp.name, "cache"))
+
+        with mock.patch(
+            "pigapp_app.cib_consolidated.file_sha256", wraps=file_sha256
+        ) as consolidated_sha, mock.patch(
+            "pigapp_app.cib_cache.file_sha256", wraps=file_sha256
+        ) as cache_sha:
+            CibConsolidatedSummary().update_from_path(
+                CibStatementParser(), pdf_dir, cache=cache
+            )
+
+        self.assertEqual(consolidated_sha.call_count + cache_sha.call_count, 2)
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_filtered_summary_keeps_counts(self):
+        consolidated = CibConsolidatedSummary()
+        consolidated.add(
+            {"jan": ("k1", self.partial(0, 40)), "year": ("k2", self.full)}
+        )
+        summary = consolidated.as_summary()
+        query = CibSummaryQuery.from_params(QueryDict("category=transfer"))
+
+        for result in (
+            query.apply(summary),
+            CibSummaryQuery.from_params(
+                QueryDict("category=transfer&summary_only=1")
+            ).apply(summary),
+        ):
+            transfers = [
+                row
+                for row in summary["all_transactions"]
+                if row["category"] == "transfer"
+            ]
+            self.assertEqual(result["transaction_count"], len(transfers))
+            self.assertEqual(result["duplicates_dropped"], 40)
+            self.assertEqual(result["statements"], summary["statements"])
+
+
+class CibPageTextCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = os.path.join(self.tmp.name, "page_text")
+        self.pdf_path = os.path.join(self.tmp.name, "synthetic.pdf")
+        write_statement_pdf(self.pdf_path, 60, seed=4)
+
+    def test_rules_change_reparses_from_cached_text(self):
+        expected = CibStatementParser().parse_pdf_to_dataframe(self.pdf_path)
+        first = CibStatementParser(text_cache=self.cache_dir)
+        pd.testing.assert_frame_equal(
+            first.parse_pdf_to_dataframe(self.pdf_path), expected
+        )
+        self.assertEqual(first.text_cache.stats()["hits"], 0)
+
+        keywords = {**CibStatementParser.CATEGORY_KEYWORDS, "food": ["lidl"]}
+        parser = CibStatementParser(
+            category_keywords=keywords, text_cache=self.cache_dir
+        )
+        with mock.patch.object(parser.extractor, "iter_page_lines") as extractor_lines:
+            df = parser.parse_pdf_to_dataframe(self.pdf_path)
+
+        extractor_lines.assert_not_called()
+        self.assertEqual(parser.text_cache.stats()["misses"], 0)
+        self.assertEqual(len(df), 60)
+        pd.testing.assert_series_equal(df["leiras"], expected["leiras"])
+
+    def test_missing_pages_are_extracted(self):
+        parser = CibStatementParser(text_cache=self.cache_dir)
+        expected = CibStatementParser().extract_page_lines(self.pdf_path)
+        self.assertEqual(parser.extract_page_lines(self.pdf_path, 0, 2), expected[:2])
+
+        parser = CibStatementParser(text_cache=self.cache_dir)
+        self.assertEqual(parser.extract_page_lines(self.pdf_path), expected)
+        self.assertEqual(
+            parser.text_cache.stats(), {"hits": 2, "misses": len(expected) - 2}
+        )
+
+    def test_pdf_is_hashed_once(self):
+        parser = CibStatementParser(text_cache=self.cache_dir)
+        parser.MIN_PAGES_PER_WORKER = 2
+        cache = CibParseCache(os.path.join(self.tmp.name, "cache"))
+
+        # a szeletek szálakon futnak, így a hash hívások itt számolhatók
+        with mock.patch(
+            "pigapp_app.cib_parser.ProcessPoolExecutor", ThreadPoolExecutor
+        ), mock.patch(
+            "pigapp_app.cib_cache.file_sha256", wraps=file_sha256
+        ) as cache_sha, mock.patch(
+            "pigapp_app.cib_text_cache.file_sha256", wraps=file_sha256
+        ) as text_sha:
+            result = parser.parse_path(self.pdf_path, cache=cache, page_workers=3)
+
+        self.assertEqual(len(result["synthetic"]["all_transactions"]), 60)
+        self.assertEqual((cache_sha.call_count, text_sha.call_count), (1, 0))
+        self.assertEqual(parser.text_cache.stats()["misses"], 5)
+
+
+class CibBalanceReconciliationTest(SimpleTestCase):
+    def setUp(self):
+        blocks = synthetic_transactions(50, seed=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            write_statement_pdf(pdf_path, len(blocks), seed=3)
+            self.df = CibStatementParser().parse_pdf_to_dataframe(pdf_path)
+        self.amounts = [CibStatementParser.parse_amount(block[3]) for block in blocks]
+
+    def test_complete_statement_chains(self):
+        check = CibStatementParser.reconcile_balances(self.df)
+        self.assertEqual(check, {"ok": True, "checked": 50, "gaps": []})
+
+    def test_dropped_rows_are_located(self):
+        dropped = self.df.drop(index=[10, 11, 30]).reset_index(drop=True)
+        for df in (dropped, CibStatementParser.to_output_frame(dropped)):
+            check = CibStatementParser.reconcile_balances(df)
+            self.assertFalse(check["ok"])
+            self.assertEqual([gap["position"] for gap in check["gaps"]], [10, 28])
+            self.assertAlmostEqual(
+                check["gaps"][0]["missing_amount"], self.amounts[10] + self.amounts[11]
+            )
+            self.assertAlmostEqual(check["gaps"][1]["missing_amount"], self.amounts[30])
+
+
+class CibSummaryQueryTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            write_statement_pdf(pdf_path, 80, seed=5)
+            cls.summary = CibStatementParser().parse_pdf(pdf_path)
+
+    def query(self, params):
+        return CibSummaryQuery.from_params(QueryDict(params))
+
+    def test_invalid_params_raise(self):
+        for params in ("date_from=2026-13-01", "page=0", "limit=x", "limit=5000"):
+            with self.assertRaises(ValueError):
+                self.query(params)
+
+    def test_summary_only_drops_rows(self):
+        result = self.query("summary_only=1").apply(self.summary)
+        self.assertNotIn("all_transactions", result)
+        self.assertEqual(result["transaction_count"], 80)
+        self.assertEqual(result["category_totals"], self.summary["category_totals"])
+
+    def test_date_and_category_filter_recomputes_totals(self):
+        rows = self.summary["all_transactions"]
+        cutoff = rows[40]["konyvelesi_datum"]
+        result = self.query(
+            f"date_from={cutoff[:10].replace('.', '-')}&category=transfer,food"
+        ).apply(self.summary)
+
+        expected = [
+            row
+            for row in rows
+            if row["konyvelesi_datum"] >= cutoff
+            and row["category"] in ("transfer", "food")
+        ]
+        self.assertEqual(result["all_transactions"], expected)
+        self.assertAlmostEqual(
+            sum(result["category_totals"].values()),
+            sum(row["osszeg"] for row in expected),
+        )
+        self.assertEqual(result["balance_check"], self.summary["balance_check"])
+
+    def test_pagination(self):
+        result = self.query("page=2&limit=30").apply(self.summary)
+        self.assertEqual(
+            result["all_transactions"], self.summary["all_transactions"][30:60]
+        )
+        self.assertEqual(
+            result["pagination"], {"page": 2, "limit": 30, "count": 80, "pages": 3}
+        )
+
+    def test_streamed_json_matches_full_body(self):
+        query = self.query("stream=1")
+        query.STREAM_CHUNK_ROWS = 7
+        summary_dict = {"a": self.summary, "b": {"error": "x"}, "_meta": {}}
+        body = "".join(query.iter_json(summary_dict))
+        self.assertEqual(json.loads(body), json.loads(json.dumps(summary_dict)))
+
+    def test_streamed_json_consumes_summaries_lazily(self):
+        produced = []
+
+        def summaries():
+            for name in ("a", "b"):
+                produced.append(name)
+                yield name, self.summary
+
+        chunks = self.query("stream=1").iter_json(summaries())
+        head = [next(chunks), next(chunks)]
+        self.assertEqual(produced, ["a"])
+        body = "".join(head) + "".join(chunks)
+        self.assertEqual(produced, ["a", "b"])
+        self.assertEqual(
+            json.loads(body),
+            json.loads(json.dumps({"a": self.summary, "b": self.summary})),
+        )
+
+    def test_iter_parse_path_matches_parse_path(self):
+        parser = CibStatementParser()
+        with tempfile.TemporaryDirectory() as tmp:
+            for seed in (1, 2):
+                write_statement_pdf(os.path.join(tmp, f"s{seed}.pdf"), 8, seed=seed)
+            with open(os.path.join(tmp, "broken.pdf"), "wb") as f:
+                f.write(b"nem pdf")
+            summaries = parser.iter_parse_path(tmp)
+            self.assertEqual(dict(summaries), parser.parse_path(tmp))
+
+            with self.assertRaises(ValueError):
+                parser.iter_parse_path(os.path.join(tmp, "nincs.txt"))
+
+
+class CibParseProfileTest(SimpleTestCase):
+    def test_profiler_records_every_stage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = os.path.join(tmp, "synthetic.pdf")
+            pages = write_statement_pdf(pdf_path, 30)
+            profiler = CibParseProfiler()
+            with self.assertLogs("pigapp_app", level="INFO"):
+                result = CibStatementParser().parse_path(pdf_path, profiler=profiler)
+
+        profile = profiler.as_dict()["synthetic.pdf"]
+        self.assertEqual(profile["pages"], pages)
+        self.assertEqual(profile["rows"], 30)
+        self.assertEqual(len(result["synthetic"]["all_transactions"]), 30)
+        self.assertEqual(list(profile["stages"]), list(STAGES))
+        for stage in profile["stages"].values():
+            self.assertGreaterEqual(stage["seconds"], 0)
+        self.assertIn("process_peak_rss_kb", profile["stages"]["summary"])
+
+
+class CibStatementDatasetTest(SimpleTestCase):
+    def test_dataset_round_trip_and_incremental_update(self):
+        parser = CibStatementParser()
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_dir = os.path.join(tmp, "pdf")
+            os.makedirs(pdf_dir)
+            pdf_path = os.path.join(pdf_dir, "synthetic.pdf")
+            write_statement_pdf(pdf_path, 40)
+
+            dataset = CibStatementDataset(os.path.join(tmp, "dataset"))
+            self.assertEqual(len(dataset.update(pdf_dir, parser)["written"]), 1)
+
+            reopened = CibStatementDataset(dataset.root)
+            stats = reopened.update(pdf_dir, parser)
+            self.assertEqual((stats["written"], stats["unchanged"]), ([], 1))
+
+            pd.testing.assert_frame_equal(
+                reopened.read_statement("synthetic"),
+                parser.parse_pdf_to_dataframe(pdf_path),
+            )
+            months = reopened.load_frame(columns=["konyvelesi_datum", "osszeg"])
+            self.assertEqual(
+                list(months.columns), ["konyvelesi_datum", "osszeg", "statement"]
+            )
+            self.assertTrue(reopened.category_totals_by_month())
+            self.assertIsInstance(reopened.top_merchants(3), list)
+
+            write_statement_pdf(os.path.join(pdf_dir, "other.pdf"), 5, seed=1)
+            os.remove(pdf_path)
+            stats = reopened.update(pdf_dir, parser)
+            self.assertEqual((len(stats["written"]), len(stats["removed"])), (1, 1))
+            self.assertEqual(reopened.names(), ["other"])
+            self.assertEqual(len(os.listdir(reopened.root)), 2)  # index + 1 parquet
+
+
+class StatementFormatSniffingTest(SimpleTestCase):
+    def test_non_cib_pdf_is_rejected_before_extraction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cib_path = os.path.join(tmp, "cib.pdf")
+            other_path = os.path.join(tmp, "invoice.pdf")
+            write_statement_pdf(cib_path, 5)
+            with open(other_path, "wb") as f:
+                f.write(render_pdf([[(17, 100, "SZÁMLA 2026.01.02. 1.000,00")]]))
+
+            self.assertEqual(sniff_format(cib_path), "cib")
+            self.assertIsNone(sniff_format(other_path))
+
+            parser = CibStatementParser()
+            with mock.patch.object(parser, "iter_page_lines") as iter_page_lines:
+                result = parser.parse_files([other_path])
+            iter_page_lines.assert_not_called()
+            self.assertIn("UnsupportedStatementFormat", result[other_path]["error"])
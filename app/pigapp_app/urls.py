@@ -200,6 +200,26 @@ urlpatterns = [
         views.CibStatementUploadView.as_view(),
         name="cib-parse",
     ),
+    path(
+        "api/cib-jobs/",
+        views.CibStatementJobUploadView.as_view(),
+        name="cib-job-upload",
+    ),
+    path(
+        "api/cib-jobs/<int:pk>/",
+        views.CibParseJobDetailView.as_view(),
+        name="cib-job-detail",
+    ),
+    path(
+        "api/cib-category-memo/",
+        views.CibCategoryMemoView.as_view(),
+        name="cib-category-memo",
+    ),
+    path(
+        "api/bank-transactions/summary/",
+        views.BankTransactionSummaryView.as_view(),
+        name="bank-transaction-summary",
+    ),
     path(
         "api/upcoming-costs/",
         views.UpcomingCostsView.as_view(),
@@ -8,7 +8,7 @@ from django.core.exceptions import ValidationError
 from django.db import DatabaseError
 from django.db.models import Q, Sum
 from django.db.models.functions import ExtractMonth, ExtractYear
-from django.http import Http404, JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from calendar import monthrange
@@ -37,17 +37,25 @@ from pigapp_app.serializers import (AllInvoicesTotalAmountSerializer,
 from rest_framework import (filters, generics, mixins,
                             permissions, status, viewsets)
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.generics import ListAPIView
+from .cib_cache import CibParseCache
+from .cib_category_memo import CibCategoryMemo
+from .cib_consolidated import CibConsolidatedSummary
+from .cib_jobs import enqueue_parse_job
 from .cib_parser import CibStatementParser
+from .cib_profile import CibParseProfiler
+from .cib_query import CibSummaryQuery
 from .datefu import DateFu
-from .models import (CashFlow, CashFlowGroup, Cost, CostGroup, CostRepeat, Dev,
-                     Invoice)
-from .serializers import (CostRepeatWithCostsSerializeToSum,
+from .models import (BankTransaction, CashFlow, CashFlowGroup, CibParseJob,
+                     Cost, CostGroup, CostRepeat, Dev, Invoice)
+from .serializers import (CibParseJobSerializer,
+                          CostRepeatWithCostsSerializeToSum,
                           MyTokenObtainPairSerializer)
 from rest_framework.renderers import JSONRenderer
 logger = logging.getLogger(__name__)
@@ -449,12 +457,20 @@ class CibStatementUploadView(APIView):
     """
     GET: CIB számlakivonat PDF-ek feldolgozása az app/pdf_uploads könyvtárból.
     (Nincs feltöltés, a PDF-eket kézzel másolod oda.)
+
+    Query paraméterek (lásd CibSummaryQuery): summary_only, date_from,
+    date_to, category, page, limit, stream, consolidated.
     """
 
     def get(self, request, *args, **kwargs):
+        try:
+            query = CibSummaryQuery.from_params(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # app/pdf_uploads mappa
-            folder = settings.BASE_DIR / "pdf_uploads"
+            folder = settings.PDF_UPLOAD_DIR
 
             if not folder.exists():
                 return Response(
@@ -462,11 +478,81 @@ class CibStatementUploadView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            parser = CibStatementParser()
-            summary_dict = parser.parse_path(str(folder))  # több PDF-et feldolgoz
+            parser = CibStatementParser(
+                category_memo=settings.CIB_CATEGORY_MEMO,
+                text_cache=settings.CIB_PAGE_TEXT_CACHE_DIR,
+            )
+            cache = CibParseCache(settings.CIB_PARSE_CACHE_DIR)
+            # ?profile=1: szakaszonkénti idő / memória a _meta blokkban
+            profiler = None
+            if settings.CIB_PARSE_PROFILE or request.query_params.get("profile") in (
+                "1",
+                "true",
+            ):
+                profiler = CibParseProfiler()
+
+            def meta():
+                meta = {"cache": cache.stats()}
+                if profiler is not None:
+                    meta["timings"] = profiler.as_dict()
+                return meta
+
+            if query.stream and not query.consolidated:
+                # ?stream=1: a kivonatok egyenként, a válasz írása közben
+                # kerülnek feldolgozásra; a _meta a végére kerül
+                summaries = parser.iter_parse_path(
+                    str(folder),
+                    cache=cache,
+                    profiler=profiler,
+                    page_workers=settings.CIB_PAGE_WORKERS,
+                )
+
+                def streamed():
+                    for name, summary in summaries:
+                        yield name, query.apply(summary)
+                    yield "_meta", meta()
+
+                return StreamingHttpResponse(
+                    query.iter_json(streamed()), content_type="application/json"
+                )
+
+            if query.consolidated:
+                # ?consolidated=1: egyetlen összevont összesítés; csak az előző
+                # kérés óta új kivonatok kerülnek hozzáadásra
+                consolidated = CibConsolidatedSummary(
+                    settings.CIB_CONSOLIDATED_STATE
+                ).load()
+                consolidated.update_from_path(
+                    parser,
+                    str(folder),
+                    workers=settings.CIB_PARSE_WORKERS,
+                    cache=cache,
+                    profiler=profiler,
+                    page_workers=settings.CIB_PAGE_WORKERS,
+                )
+                consolidated.save()
+                summary_dict = {"consolidated": consolidated.as_summary()}
+            else:
+                # több PDF-et párhuzamosan dolgoz fel, fájlonkénti hibajelzéssel;
+                # a változatlan PDF-ek eredménye a cache-ből jön
+                summary_dict = parser.parse_path(
+                    str(folder),
+                    workers=settings.CIB_PARSE_WORKERS,
+                    cache=cache,
+                    profiler=profiler,
+                    page_workers=settings.CIB_PAGE_WORKERS,
+                )
 
             # Ha több PDF-et adsz meg, parse_path dict-et ad vissza:
-            # { "fajlnev1": {...}, "fajlnev2": {...}, ... }
+            # { "fajlnev1": {...}, "fajlnev2": {...}, ..., "_meta": {...} }
+            summary_dict = query.apply_all(summary_dict)
+            summary_dict["_meta"] = meta()
+
+            if query.stream:
+                # összevont összesítésnél csak a szerializálás darabolt
+                return StreamingHttpResponse(
+                    query.iter_json(summary_dict), content_type="application/json"
+                )
             return Response(summary_dict, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -476,6 +562,143 @@ class CibStatementUploadView(APIView):
             )
 
 
+class CibStatementJobUploadView(APIView):
+    """
+    POST: CIB számlakivonat PDF feltöltése ("file" mező, multipart).
+    A fájl a pdf_uploads könyvtárba kerül, a feldolgozás háttérben fut
+    (cib_parse_worker); a válasz a job, amelynek állapota lekérdezhető.
+    """
+
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        uploaded = request.FILES.get("file")
+        if uploaded is None:
+            return Response(
+                {"detail": "Hiányzik a feltöltött fájl (file)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not uploaded.name.lower().endswith(".pdf"):
+            return Response(
+                {"detail": "Csak PDF fájl tölthető fel."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        job = enqueue_parse_job(request.user, uploaded)
+        return Response(
+            CibParseJobSerializer(job).data, status=status.HTTP_202_ACCEPTED
+        )
+
+
+class CibParseJobDetailView(generics.RetrieveAPIView):
+    """
+    GET: feldolgozási job állapota (pending / running / done / failed);
+    "done" állapotban a result mező a kivonat összesítése.
+    """
+
+    serializer_class = CibParseJobSerializer
+
+    def get_queryset(self):
+        return CibParseJob.objects.filter(user=self.request.user)
+
+
+class CibCategoryMemoView(APIView):
+    """
+    Kereskedő -> kategória memo (CibCategoryMemo).
+    GET: a tanult és a kézi bejegyzések.
+    POST: kézi javítás; {"category": ..., "merchant_key": ...} vagy a kulcs
+    helyett egy tranzakció "leiras", "extra_sor_1", "extra_sor_2" mezői.
+    DELETE: ?merchant_key=... kézi javítás törlése.
+    A javítás a következő feldolgozástól érvényes (a parse cache kulcs része).
+    """
+
+    def get(self, request, *args, **kwargs):
+        memo = CibCategoryMemo(settings.CIB_CATEGORY_MEMO)
+        return Response(memo.entries(), status=status.HTTP_200_OK)
+
+    def post(self, request, *args, **kwargs):
+        category = request.data.get("category")
+        if category not in CibStatementParser.CATEGORY_KEYWORDS:
+            return Response(
+                {"detail": f"Ismeretlen kategória: {category}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = request.data.get("merchant_key") or CibStatementParser.merchant_key(
+            request.data.get("leiras") or "",
+            request.data.get("extra_sor_1") or "",
+            request.data.get("extra_sor_2") or "",
+        )
+        if not key:
+            return Response(
+                {"detail": "A tranzakcióhoz nem tartozik kereskedő / partner kulcs."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        CibCategoryMemo(settings.CIB_CATEGORY_MEMO).set_manual(key, category)
+        return Response(
+            {"merchant_key": key, "category": category}, status=status.HTTP_200_OK
+        )
+
+    def delete(self, request, *args, **kwargs):
+        key = request.query_params.get("merchant_key")
+        if not key:
+            return Response(
+                {"detail": "Hiányzik a merchant_key paraméter."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        CibCategoryMemo(settings.CIB_CATEGORY_MEMO).set_manual(key, None)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BankTransactionSummaryView(APIView):
+    """
+    GET: a tárolt (BankTransaction) tranzakciók összesítése SQL aggregációval,
+    PDF újrafeldolgozás nélkül. Opcionális szűrés: ?date_from=YYYY-MM-DD&date_to=...
+    """
+
+    def get(self, request, *args, **kwargs):
+        queryset = BankTransaction.objects.filter(user=request.user)
+
+        date_from = request.query_params.get("date_from")
+        date_to = request.query_params.get("date_to")
+        try:
+            if date_from:
+                queryset = queryset.filter(booking_date__gte=date_from)
+            if date_to:
+                queryset = queryset.filter(booking_date__lte=date_to)
+            count = queryset.count()
+        except ValidationError:
+            return Response(
+                {"detail": "Hibás dátum formátum (YYYY-MM-DD)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        category_totals = {
+            row["category"]: float(row["total"])
+            for row in queryset.values("category")
+            .annotate(total=Sum("amount"))
+            .order_by("category")
+        }
+        daily_spending = {
+            row["booking_date"].isoformat(): float(row["total"])
+            for row in queryset.filter(amount__lt=0)
+            .values("booking_date")
+            .annotate(total=Sum("amount"))
+            .order_by("booking_date")
+        }
+
+        return Response(
+            {
+                "count": count,
+                "category_totals": category_totals,
+                "daily_spending": daily_spending,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class MonthlyCostForecastAPIView(APIView):
     def get(self, request, *args, **kwargs):
         try:
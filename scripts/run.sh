@@ -3,5 +3,7 @@ set -e
 
 python manage.py collectstatic --noinput
 python manage.py migrate
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+# a feltöltött kivonatokat a háttér worker dolgozza fel, nem a request workerek
+uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi \
+    --attach-daemon "python manage.py cib_parse_worker"
 